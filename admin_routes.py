@@ -1,9 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import PlainTextResponse
 from mysql.connector import Error
 
+from bulkheads import bulkhead_route
+import company_stats
+import invalidation
+import purge
+import query_log
+import upload_storage
+from profiler import PROFILER, ProfilerBusy
+
+# Candidatures visibles : entreprise et compte candidat non supprimés (masqués jusqu'à la purge).
+# `u` est en LEFT JOIN : une candidature sans compte reste visible
+_LIVE_APPLICATIONS = "c.deleted_at IS NULL AND u.deleted_at IS NULL"
+
 
 def create_admin_router(get_db, require_admin, hash_password):
-    router = APIRouter()
+    router = APIRouter(route_class=bulkhead_route("admin"))
 
     @router.get("/api/admin/stats")
     def admin_stats(
@@ -13,14 +26,21 @@ def create_admin_router(get_db, require_admin, hash_password):
         try:
             with db.cursor(dictionary=True) as cur:
                 cur.execute(
-                    """
+                    f"""
                     SELECT
-                      (SELECT COUNT(*) FROM users) AS total_users,
-                      (SELECT COUNT(*) FROM users WHERE role='admin') AS total_admins,
-                      (SELECT COUNT(*) FROM users WHERE role='recruiter') AS total_recruiters,
-                      (SELECT COUNT(*) FROM companies) AS total_companies,
-                      (SELECT COUNT(*) FROM jobs) AS total_jobs,
-                      (SELECT COUNT(*) FROM applications) AS total_applications
+                      (SELECT COUNT(*) FROM users WHERE deleted_at IS NULL) AS total_users,
+                      (SELECT COUNT(*) FROM users WHERE role='admin' AND deleted_at IS NULL) AS total_admins,
+                      (SELECT COUNT(*) FROM users WHERE role='recruiter' AND deleted_at IS NULL) AS total_recruiters,
+                      (SELECT COUNT(*) FROM companies WHERE deleted_at IS NULL) AS total_companies,
+                      (SELECT COUNT(*) FROM job_cards) AS total_jobs,
+                      (SELECT COUNT(*)
+                       FROM applications a
+                       JOIN jobs j ON j.id = a.job_id
+                       JOIN companies c ON c.id = j.company_id
+                       LEFT JOIN users u ON u.id = a.user_id
+                       WHERE {_LIVE_APPLICATIONS}) AS total_applications,
+                      (SELECT COUNT(*) FROM users WHERE deleted_at IS NOT NULL) AS pending_deleted_users,
+                      (SELECT COUNT(*) FROM companies WHERE deleted_at IS NOT NULL) AS pending_deleted_companies
                     """
                 )
                 stats = cur.fetchone() or {}
@@ -30,6 +50,7 @@ def create_admin_router(get_db, require_admin, hash_password):
                     """
                     SELECT id, email, role, created_at
                     FROM users
+                    WHERE deleted_at IS NULL
                     ORDER BY created_at DESC, id DESC
                     LIMIT 5
                     """
@@ -41,6 +62,7 @@ def create_admin_router(get_db, require_admin, hash_password):
                     """
                     SELECT id, name, created_at
                     FROM companies
+                    WHERE deleted_at IS NULL
                     ORDER BY created_at DESC, id DESC
                     LIMIT 5
                     """
@@ -50,10 +72,9 @@ def create_admin_router(get_db, require_admin, hash_password):
             with db.cursor(dictionary=True) as cur:
                 cur.execute(
                     """
-                    SELECT j.id, j.title, j.created_at, c.name AS company_name
-                    FROM jobs j
-                    JOIN companies c ON c.id = j.company_id
-                    ORDER BY j.created_at DESC, j.id DESC
+                    SELECT jc.job_id AS id, jc.title, jc.created_at, jc.company_name
+                    FROM job_cards jc
+                    ORDER BY jc.created_at DESC, jc.job_id DESC
                     LIMIT 5
                     """
                 )
@@ -61,13 +82,15 @@ def create_admin_router(get_db, require_admin, hash_password):
 
             with db.cursor(dictionary=True) as cur:
                 cur.execute(
-                    """
+                    f"""
                     SELECT a.id, a.job_id, a.created_at, a.status,
                            COALESCE(a.email, u.email) AS candidate_email,
                            j.title AS job_title
                     FROM applications a
                     LEFT JOIN users u ON u.id = a.user_id
                     JOIN jobs j ON j.id = a.job_id
+                    JOIN companies c ON c.id = j.company_id
+                    WHERE {_LIVE_APPLICATIONS}
                     ORDER BY a.created_at DESC, a.id DESC
                     LIMIT 5
                     """
@@ -84,6 +107,107 @@ def create_admin_router(get_db, require_admin, hash_password):
         except Error as e:
             raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
+    @router.get("/api/admin/slow-queries")
+    def admin_slow_queries(
+        limit: int = 20,
+        _: dict = Depends(require_admin),
+    ):
+        return query_log.QUERY_LOG.snapshot(limit=max(1, min(100, int(limit))))
+
+    @router.get("/api/admin/profile", response_class=PlainTextResponse)
+    def admin_profile(
+        seconds: float = 10,
+        hz: int = 100,
+        idle: bool = False,
+        _: dict = Depends(require_admin),
+    ):
+        seconds = max(0.1, min(120.0, float(seconds)))
+        hz = max(1, min(1000, int(hz)))
+        try:
+            stacks = PROFILER.sample(seconds, hz=hz, include_idle=idle)
+        except ProfilerBusy:
+            raise HTTPException(status_code=409, detail="Profiling already in progress")
+        return PlainTextResponse(stacks)
+
+    @router.get("/api/admin/purges")
+    def admin_list_purges(
+        status: str | None = None,
+        limit: int = 50,
+        db=Depends(get_db),
+        _: dict = Depends(require_admin),
+    ):
+        where_sql = "WHERE status = %s" if status else ""
+        params = [status] if status else []
+        try:
+            with db.cursor(dictionary=True) as cur:
+                cur.execute(
+                    f"""
+                    SELECT id, entity, entity_id, status, step, deleted_rows, attempts,
+                           last_error, next_attempt_at, created_at, updated_at, finished_at
+                    FROM purge_jobs
+                    {where_sql}
+                    ORDER BY id DESC
+                    LIMIT %s
+                    """,
+                    (*params, max(1, min(500, int(limit)))),
+                )
+                rows = cur.fetchall()
+            return {"items": [purge.status_row(row) for row in rows]}
+        except Error as e:
+            raise HTTPException(status_code=500, detail=f"DB error: {e}")
+
+    @router.get("/api/admin/purges/{purge_id}")
+    def admin_get_purge(
+        purge_id: int,
+        db=Depends(get_db),
+        _: dict = Depends(require_admin),
+    ):
+        with db.cursor(dictionary=True) as cur:
+            cur.execute(
+                """
+                SELECT id, entity, entity_id, status, step, deleted_rows, attempts,
+                       last_error, next_attempt_at, created_at, updated_at, finished_at
+                FROM purge_jobs
+                WHERE id = %s
+                """,
+                (purge_id,),
+            )
+            row = cur.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Purge not found")
+        return purge.status_row(row)
+
+    @router.post("/api/admin/purges/{purge_id}/retry")
+    def admin_retry_purge(
+        purge_id: int,
+        db=Depends(get_db),
+        _: dict = Depends(require_admin),
+    ):
+        # Reprend à l'étape enregistrée
+        with db.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE purge_jobs
+                SET status = 'running', attempts = 0, last_error = NULL, next_attempt_at = NULL, updated_at = NOW()
+                WHERE id = %s AND status = 'failed'
+                """,
+                (purge_id,),
+            )
+            if cur.rowcount == 0:
+                raise HTTPException(status_code=409, detail="Purge not found or not failed")
+        return {"id": purge_id, "status": "running"}
+
+    @router.get("/api/admin/uploads/orphans")
+    def admin_upload_orphans(
+        db=Depends(get_db),
+        _: dict = Depends(require_admin),
+    ):
+        # Rapport seul (dry-run) : rien n'est supprimé
+        try:
+            return upload_storage.GC.run_once(db, dry_run=True)
+        except Error as e:
+            raise HTTPException(status_code=500, detail=f"Query failed: {e}")
+
     @router.get("/api/applications")
     def admin_list_applications(
         q: str | None = None,
@@ -99,7 +223,7 @@ def create_admin_router(get_db, require_admin, hash_password):
             page_size = max(1, min(100, int(page_size)))
             offset = (page - 1) * page_size
 
-            where: list[str] = []
+            where: list[str] = [_LIVE_APPLICATIONS]
             params: list = []
 
             if job_id is not None:
@@ -117,7 +241,7 @@ def create_admin_router(get_db, require_admin, hash_password):
                 )
                 params.extend([like, like, like, like])
 
-            where_sql = "WHERE " + " AND ".join(where) if where else ""
+            where_sql = "WHERE " + " AND ".join(where)
 
             with db.cursor(dictionary=True) as cur:
                 cur.execute(
@@ -174,7 +298,7 @@ def create_admin_router(get_db, require_admin, hash_password):
     ):
         with db.cursor(dictionary=True) as cur:
             cur.execute(
-                """
+                f"""
                 SELECT
                     a.id,
                     a.job_id,
@@ -194,7 +318,7 @@ def create_admin_router(get_db, require_admin, hash_password):
                 JOIN companies c ON c.id = j.company_id
                 LEFT JOIN users u ON u.id = a.user_id
                 LEFT JOIN profiles p ON p.user_id = a.user_id
-                WHERE a.id = %s
+                WHERE a.id = %s AND {_LIVE_APPLICATIONS}
                 """,
                 (application_id,),
             )
@@ -238,6 +362,7 @@ def create_admin_router(get_db, require_admin, hash_password):
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Application not found")
+        invalidation.publish(db, invalidation.APPLICATION_CHANGED, application_id)
 
         return {"id": application_id, **updates}
 
@@ -248,57 +373,32 @@ def create_admin_router(get_db, require_admin, hash_password):
         _: dict = Depends(require_admin),
     ):
         with db.cursor() as cur:
+            cur.execute(
+                "SELECT j.company_id FROM applications a JOIN jobs j ON j.id = a.job_id WHERE a.id=%s",
+                (application_id,),
+            )
+            row = cur.fetchone()
             cur.execute("DELETE FROM applications WHERE id=%s", (application_id,))
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Application not found")
+        company_stats.refresh(db, [row[0]] if row else [])
+        invalidation.publish(db, invalidation.APPLICATION_CHANGED, application_id)
         return Response(status_code=204)
 
-    @router.delete("/api/users/{user_id}", status_code=204)
+    @router.delete("/api/users/{user_id}", status_code=202)
     def delete_user(
         user_id: int,
         db=Depends(get_db),
         _: dict = Depends(require_admin),
     ):
-        # Nettoyage explicite des données liées pour éviter les orphelins visibles côté UI
-        # 1) Notifications liées aux candidatures du user
-        with db.cursor() as cur:
-            cur.execute("SELECT id FROM applications WHERE user_id=%s", (user_id,))
-            # Consommer systématiquement le résultat pour éviter l'erreur
-            # mysql.connector.errors.InternalError: Unread result found
-            app_ids = [row[0] for row in cur.fetchall()]
-            if app_ids:
-                ids_tuple = tuple(app_ids)
-                in_clause = ",".join(["%s"] * len(ids_tuple))
-                cur.execute(f"DELETE FROM notifications WHERE application_id IN ({in_clause})", ids_tuple)
-
-        # 2) Notifications reçues par le user (sera de toute façon supprimé par FK CASCADE, mais explicite)
-        with db.cursor() as cur:
-            cur.execute("DELETE FROM notifications WHERE recipient_user_id=%s", (user_id,))
-
-        # 3) Candidatures du user (sinon FK SET NULL les laisse visibles)
-        with db.cursor() as cur:
-            cur.execute("DELETE FROM applications WHERE user_id=%s", (user_id,))
-
-        # 4) Notifications liées aux jobs appartenant à ses entreprises (si recruteur)
-        with db.cursor() as cur:
-            cur.execute(
-                """
-                DELETE n FROM notifications n
-                WHERE n.job_id IN (
-                    SELECT j.id FROM jobs j
-                    JOIN companies c ON c.id = j.company_id
-                    WHERE c.created_by = %s
-                )
-                """,
-                (user_id,),
-            )
-
-        # 5) Suppression de l'utilisateur (FKs gèrent profiles/companies/jobs/applications restantes)
-        with db.cursor() as cur:
-            cur.execute("DELETE FROM users WHERE id=%s", (user_id,))
-            if cur.rowcount == 0:
-                raise HTTPException(status_code=404, detail="User not found")
-        return Response(status_code=204)
+        # Compte et entreprises masqués tout de suite ; données liées purgées par lots (purge.py)
+        try:
+            purge_id = purge.soft_delete_user(db, user_id)
+        except Error as e:
+            raise HTTPException(status_code=500, detail=f"DB error: {e}")
+        if not purge_id:
+            raise HTTPException(status_code=404, detail="User not found")
+        return {"purge_id": purge_id, "status": "pending"}
 
     @router.patch("/api/users/{user_id}")
     def update_user(
@@ -344,6 +444,7 @@ def create_admin_router(get_db, require_admin, hash_password):
                 )
                 if cur.rowcount == 0:
                     raise HTTPException(status_code=404, detail="User not found")
+            invalidation.publish(db, invalidation.USER_CHANGED, user_id)
             return {"id": user_id, **{k: v for k, v in updates.items() if k != "password_hash"}}
         except HTTPException:
             raise
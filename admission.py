@@ -0,0 +1,212 @@
+"""Limitation de débit par client et délestage adaptatif.
+
+Chaque requête est rangée dans une classe de routes (`classify`) :
+- `auth`   : `POST /auth/login`, `POST /auth/signup` (hachage de mot de passe) ;
+- `search` : `GET /api/jobs?q=` (LIKE + COUNT) ;
+- `public` : autres lectures publiques (offres, entreprises, profils).
+Les autres routes ne sont ni limitées ni délestées.
+
+Limitation : un seau à jetons par (classe, client), le client étant
+l'utilisateur authentifié (jeton valide) ou à défaut l'adresse IP.
+Réponse 429 + `Retry-After` quand le seau est vide.
+
+Délestage : sur une fenêtre glissante, si l'attente de connexion au pool
+ou le p95 de latence dépassent leur seuil, les classes délestables
+(`search`, `public`) sont refusées tout de suite en 503 ; `auth` et les
+routes non classées restent servies avec une latence correcte.
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs
+
+import observability
+
+
+def _parse_rate(raw: str) -> tuple[float, float]:
+    """`"30/10"` = 30 requêtes par 10 s (rafale de 30)."""
+    count, _, seconds = raw.partition("/")
+    count = float(count)
+    return count / float(seconds or 1), count
+
+
+RATE_LIMITS = {
+    "auth": _parse_rate(os.getenv("RATE_LIMIT_AUTH", "10/60")),
+    "search": _parse_rate(os.getenv("RATE_LIMIT_SEARCH", "30/10")),
+    "public": _parse_rate(os.getenv("RATE_LIMIT_PUBLIC", "120/10")),
+}
+SHEDDABLE = {"search", "public"}
+SHED_POOL_WAIT_MS = float(os.getenv("SHED_POOL_WAIT_MS", "100"))
+SHED_P95_MS = float(os.getenv("SHED_P95_MS", "1500"))
+SHED_WINDOW_SECONDS = float(os.getenv("SHED_WINDOW_SECONDS", "10"))
+# En dessous de ce nombre d'échantillons dans la fenêtre, pas de décision
+SHED_MIN_SAMPLES = 20
+
+admission_rejections = observability.REGISTRY.register(
+    observability.Counter(
+        "admission_rejections_total", "Requêtes refusées avant traitement.", ("route_class", "reason")
+    )
+)
+
+_PUBLIC_PREFIXES = ("/api/jobs", "/api/companies", "/api/profiles")
+
+
+def classify(method: str, path: str, query_string: bytes) -> str | None:
+    if method == "POST" and path in ("/auth/login", "/auth/signup"):
+        return "auth"
+    if method != "GET" or not path.startswith(_PUBLIC_PREFIXES):
+        return None
+    if path == "/api/jobs" and query_string and parse_qs(query_string.decode("latin-1")).get("q", [""])[0].strip():
+        return "search"
+    return "public"
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Consomme un jeton ; renvoie 0 si accordé, sinon l'attente en secondes."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Seaux à jetons par (classe, client), en LRU borné."""
+
+    def __init__(self, limits: dict, max_keys: int = 50000):
+        self.limits = limits
+        self.max_keys = max_keys
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, route_class: str, client: str, now: float | None = None) -> float:
+        limit = self.limits.get(route_class)
+        if limit is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        key = (route_class, client)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(limit[0], limit[1], now)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take(now)
+
+
+class LoadMonitor:
+    """Latence et attente de pool des requêtes récentes, sur une fenêtre glissante."""
+
+    def __init__(self, window: float = SHED_WINDOW_SECONDS, max_samples: int = 5000):
+        self.window = window
+        self._samples: deque = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._verdict = (0.0, False, "")
+
+    def observe(self, latency: float, pool_wait: float, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._samples.append((now, latency, pool_wait))
+
+    def overloaded(self, now: float | None = None) -> tuple[bool, str]:
+        """Verdict recalculé au plus une fois par seconde."""
+        now = time.monotonic() if now is None else now
+        computed_at, verdict, reason = self._verdict
+        if now - computed_at < 1.0:
+            return verdict, reason
+        with self._lock:
+            while self._samples and self._samples[0][0] < now - self.window:
+                self._samples.popleft()
+            samples = list(self._samples)
+        verdict, reason = False, ""
+        if len(samples) >= SHED_MIN_SAMPLES:
+            latencies = sorted(s[1] for s in samples)
+            p95 = latencies[math.ceil(len(latencies) * 0.95) - 1]
+            pool_wait = sum(s[2] for s in samples) / len(samples)
+            if pool_wait * 1000 > SHED_POOL_WAIT_MS:
+                verdict, reason = True, "pool_wait"
+            elif p95 * 1000 > SHED_P95_MS:
+                verdict, reason = True, "latency"
+        self._verdict = (now, verdict, reason)
+        return verdict, reason
+
+
+LIMITER = RateLimiter(RATE_LIMITS)
+MONITOR = LoadMonitor()
+
+
+def _client_ip(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "-"
+
+
+async def _reject(send, status: int, retry_after: float, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Refuse tôt (429/503) au lieu de laisser la file du pool s'allonger.
+
+    `identify(scope)` renvoie un identifiant d'utilisateur pour un jeton
+    valide, sinon None (on retombe alors sur l'IP). À placer sous
+    `MetricsMiddleware` pour lire l'attente de pool de la requête.
+    """
+
+    def __init__(self, app, identify=None):
+        self.app = app
+        self.identify = identify
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = classify(scope["method"], scope["path"], scope.get("query_string", b""))
+
+        if route_class in SHEDDABLE:
+            overloaded, reason = MONITOR.overloaded()
+            if overloaded:
+                admission_rejections.inc(route_class, reason)
+                await _reject(send, 503, 1, "Server busy, retry later")
+                return
+
+        if route_class is not None:
+            user = self.identify(scope) if self.identify is not None else None
+            client = f"u:{user}" if user is not None else f"ip:{_client_ip(scope)}"
+            wait = LIMITER.check(route_class, client)
+            if wait > 0:
+                admission_rejections.inc(route_class, "rate_limit")
+                await _reject(send, 429, wait, "Too many requests")
+                return
+
+        # Toutes les requêtes admises alimentent le moniteur, classées ou non
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            stats = observability.current_stats()
+            MONITOR.observe(time.perf_counter() - started, stats.pool_wait if stats is not None else 0.0)
@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
-from mysql.connector import Error, IntegrityError
+from mysql.connector import Error, IntegrityError, errorcode
 from pydantic import BaseModel, Field
 
+from bulkheads import bulkhead_route
+import company_stats
+import invalidation
+import notification_digests
+import query_log
+
 
 def create_applications_router(get_db, require_user):
-    router = APIRouter()
+    router = APIRouter(route_class=bulkhead_route("user"))
 
     class ApplyPayload(BaseModel):
         job_id: int = Field(..., ge=1)
@@ -16,6 +22,8 @@ def create_applications_router(get_db, require_user):
         current_user: dict = Depends(require_user),
         db=Depends(get_db),
     ):
+        # Chemin critique : authentification + 2 allers-retours SQL (contexte, puis écriture groupée)
+        query_log.set_budget(3)
         try:
             with db.cursor(dictionary=True) as cur:
                 cur.execute(
@@ -23,119 +31,96 @@ def create_applications_router(get_db, require_user):
                     SELECT
                         j.id,
                         j.title,
+                        j.location,
                         j.company_id,
                         c.name AS company_name,
-                        c.created_by AS company_owner_id
+                        c.created_by AS company_owner_id,
+                        p.user_id AS profile_user_id,
+                        p.first_name,
+                        p.last_name,
+                        p.contact_email,
+                        p.phone,
+                        p.cv_url,
+                        NOW() AS now
                     FROM jobs j
                     JOIN companies c ON c.id = j.company_id
-                    WHERE j.id = %s
+                    LEFT JOIN profiles p ON p.user_id = %s
+                    WHERE j.id = %s AND c.deleted_at IS NULL
                     """,
-                    (payload.job_id,),
+                    (current_user["id"], payload.job_id),
                 )
-                job = cur.fetchone()
-            if not job:
+                ctx = cur.fetchone()
+            if not ctx:
                 raise HTTPException(status_code=404, detail="Job not found")
-
-            with db.cursor(dictionary=True) as cur:
-                cur.execute(
-                    """
-                    SELECT id FROM applications
-                    WHERE job_id = %s AND user_id = %s
-                    LIMIT 1
-                    """,
-                    (job["id"], current_user["id"]),
-                )
-                if cur.fetchone():
-                    raise HTTPException(status_code=409, detail="Application already exists")
-
-            with db.cursor(dictionary=True) as cur:
-                cur.execute(
-                    """
-                    SELECT
-                        first_name,
-                        last_name,
-                        contact_email,
-                        phone,
-                        cv_url
-                    FROM profiles
-                    WHERE user_id = %s
-                    """,
-                    (current_user["id"],),
-                )
-                profile = cur.fetchone()
-            if not profile:
+            if ctx["profile_user_id"] is None:
                 raise HTTPException(status_code=400, detail="Profile required before applying")
-            if not profile.get("contact_email") or not profile.get("cv_url"):
+            if not ctx.get("contact_email") or not ctx.get("cv_url"):
                 raise HTTPException(
                     status_code=400,
                     detail="Profile must include contact email and CV before applying",
                 )
 
-            candidate_name = f"{profile.get('first_name', '').strip()} {profile.get('last_name', '').strip()}".strip()
+            candidate_name = f"{(ctx.get('first_name') or '').strip()} {(ctx.get('last_name') or '').strip()}".strip()
             message = (payload.message or "").strip() or None
 
-            with db.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO applications
-                        (job_id, user_id, name, email, phone, message, cv_url, status, matched_at, created_at)
-                    VALUES
-                        (%s, %s, %s, %s, %s, %s, %s, 'new', NULL, NOW())
-                    """,
-                    (
-                        job["id"],
-                        current_user["id"],
-                        candidate_name or None,
-                        profile.get("contact_email"),
-                        profile.get("phone"),
-                        message,
-                        profile.get("cv_url"),
-                    ),
+            # Doublon : détecté par la clé unique uniq_applications_job_user, pas par un SELECT préalable.
+            # Candidature, notification, compteur de l'entreprise et événement d'invalidation partent en un seul lot.
+            statements = [
+                """
+                INSERT INTO applications
+                    (job_id, user_id, name, email, phone, message, cv_url, status, matched_at, created_at)
+                VALUES
+                    (%s, %s, %s, %s, %s, %s, %s, 'new', NULL, %s)
+                """,
+                "SET @application_id = LAST_INSERT_ID()",
+            ]
+            params = [
+                ctx["id"],
+                current_user["id"],
+                candidate_name or None,
+                ctx["contact_email"],
+                ctx.get("phone"),
+                message,
+                ctx["cv_url"],
+                ctx["now"],
+            ]
+            if ctx.get("company_owner_id"):
+                # Regroupée avec les candidatures non lues de la même offre (notification_digests.py)
+                statements.append(notification_digests.APPLICATION_SQL)
+                params += notification_digests.application_params(
+                    ctx["company_owner_id"],
+                    ctx["id"],
+                    ctx["title"],
+                    candidate_name or ctx["contact_email"],
+                    ctx["now"],
                 )
-                application_id = cur.lastrowid
+            statements.append(company_stats.BUMP_SQL)
+            params += company_stats.bump_params(ctx["company_id"], applications=1)
+            statements.append("INSERT INTO cache_invalidations (kind, entity_id) VALUES (%s, @application_id)")
+            params.append(invalidation.APPLICATION_CHANGED)
 
-            if job.get("company_owner_id"):
-                notif_message = f"{candidate_name or profile['contact_email']} a postulé à {job['title']}."
-                with db.cursor() as cur:
-                    cur.execute(
-                        """
-                        INSERT INTO notifications
-                            (recipient_user_id, type, message, job_id, application_id, created_at)
-                        VALUES
-                            (%s, %s, %s, %s, %s, NOW())
-                        """,
-                        (
-                            job["company_owner_id"],
-                            "application:new",
-                            notif_message,
-                            job["id"],
-                            application_id,
-                        ),
-                    )
+            with db.cursor() as cur:
+                cur.execute(";".join(statements), params)
+                application_id = cur.lastrowid
+                while cur.nextset():
+                    pass
+            invalidation.published(db, invalidation.APPLICATION_CHANGED, application_id)
 
-            with db.cursor(dictionary=True) as cur:
-                cur.execute(
-                    """
-                    SELECT
-                        a.id,
-                        a.job_id,
-                        a.status,
-                        a.matched_at,
-                        a.created_at,
-                        j.title AS job_title,
-                        j.location AS job_location,
-                        c.name AS company_name
-                    FROM applications a
-                    JOIN jobs j ON j.id = a.job_id
-                    JOIN companies c ON c.id = j.company_id
-                    WHERE a.id = %s
-                    """,
-                    (application_id,),
-                )
-                created = cur.fetchone()
-            return created
-        except IntegrityError:
-            raise HTTPException(status_code=409, detail="Application already exists")
+            return {
+                "id": application_id,
+                "job_id": ctx["id"],
+                "status": "new",
+                "matched_at": None,
+                "created_at": ctx["now"],
+                "job_title": ctx["title"],
+                "job_location": ctx["location"],
+                "company_name": ctx["company_name"],
+            }
+        except IntegrityError as e:
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                raise HTTPException(status_code=409, detail="Application already exists")
+            # Clé étrangère : l'offre a été supprimée entre la lecture et l'insertion
+            raise HTTPException(status_code=404, detail="Job not found")
         except Error as e:
             raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
@@ -154,13 +139,12 @@ def create_applications_router(get_db, require_user):
                         a.status,
                         a.matched_at,
                         a.created_at,
-                        j.title AS job_title,
-                        j.location AS job_location,
-                        j.contract_type,
-                        c.name AS company_name
+                        jc.title AS job_title,
+                        jc.location AS job_location,
+                        jc.contract_type,
+                        jc.company_name
                     FROM applications a
-                    JOIN jobs j ON j.id = a.job_id
-                    JOIN companies c ON c.id = j.company_id
+                    JOIN job_cards jc ON jc.job_id = a.job_id
                     WHERE a.user_id = %s
                     ORDER BY a.created_at DESC, a.id DESC
                     """,
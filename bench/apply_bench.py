@@ -0,0 +1,184 @@
+"""Candidatures simultanées sur une même offre + contrôle du budget SQL de `POST /api/applications`.
+
+1. Choisit en base une offre et N candidats au profil complet (email de
+   contact + CV) n'ayant pas encore postulé à cette offre ; les jetons
+   sont signés avec `JWT_SECRET` (pas de passage par `/auth/login`).
+2. Envoie les N candidatures en parallèle (`--concurrency`) et affiche
+   candidatures/s et p50/p95/p99.
+3. Rejoue les mêmes candidatures : toutes doivent répondre 409.
+4. Vérifie via `/metrics` que chaque requête est restée dans le budget
+   de requêtes SQL (`--max-queries`, authentification comprise).
+5. Supprime les candidatures créées (sauf `--keep`).
+
+Code de sortie 1 si le budget est dépassé ou si un statut est inattendu.
+Au-delà de la cloison `user` (concurrence + file, cf. `BULKHEAD_USER`),
+les requêtes en trop reçoivent 503 : l'ajuster avant d'augmenter
+`--concurrency`.
+
+Exemple:
+    python bench/generate_data.py --jobs 200 --applications 0 --candidates 2000
+    python bench/apply_bench.py --applicants 1000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from db import pool_from_env  # noqa: E402
+from loadtest import percentile  # noqa: E402
+from thundering_herd import metric, scrape  # noqa: E402
+
+ROUTE = "/api/applications"
+
+
+def pick(pool, job_id: int | None, applicants: int) -> tuple[int, list[tuple[int, str]]]:
+    conn = pool.acquire()
+    try:
+        with conn.cursor() as cur:
+            if job_id is None:
+                cur.execute("SELECT id FROM jobs ORDER BY id DESC LIMIT 1")
+                row = cur.fetchone()
+                if row is None:
+                    raise SystemExit("Aucune offre en base")
+                job_id = row[0]
+            cur.execute(
+                """
+                SELECT u.id, u.email
+                FROM users u
+                JOIN profiles p ON p.user_id = u.id
+                WHERE u.role = 'user'
+                  AND p.contact_email IS NOT NULL AND p.contact_email <> ''
+                  AND p.cv_url IS NOT NULL AND p.cv_url <> ''
+                  AND NOT EXISTS (SELECT 1 FROM applications a WHERE a.job_id = %s AND a.user_id = u.id)
+                ORDER BY u.id
+                LIMIT %s
+                """,
+                (job_id, applicants),
+            )
+            users = cur.fetchall()
+        conn.commit()
+    finally:
+        pool.release(conn)
+    return job_id, users
+
+
+def cleanup(pool, job_id: int, user_ids: list[int]):
+    conn = pool.acquire()
+    try:
+        with conn.cursor() as cur:
+            for i in range(0, len(user_ids), 500):
+                chunk = user_ids[i:i + 500]
+                cur.execute(
+                    f"DELETE FROM applications WHERE job_id = %s AND user_id IN ({','.join(['%s'] * len(chunk))})",
+                    (job_id, *chunk),
+                )
+        conn.commit()
+    finally:
+        pool.release(conn)
+
+
+def token_for(email: str) -> str:
+    expire = datetime.utcnow() + timedelta(minutes=30)
+    return jwt.encode(
+        {"sub": email, "exp": expire},
+        os.getenv("JWT_SECRET", "dev-secret"),
+        algorithm=os.getenv("JWT_ALGO", "HS256"),
+    )
+
+
+async def wave(client, job_id: int, tokens: list[str], concurrency: int) -> tuple[list[float], dict, float]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: dict = {}
+
+    async def one(token):
+        async with sem:
+            started = time.perf_counter()
+            try:
+                r = await client.post(ROUTE, json={"job_id": job_id}, headers={"Authorization": f"Bearer {token}"})
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+            except httpx.HTTPError:
+                statuses["error"] = statuses.get("error", 0) + 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(t) for t in tokens))
+    return sorted(latencies), statuses, time.perf_counter() - started
+
+
+def report(label: str, latencies: list[float], statuses: dict, elapsed: float):
+    print(
+        f"{label:<10} n={len(latencies):>5} status={statuses} rate={len(latencies) / elapsed:.1f}/s "
+        f"p50={percentile(latencies, 50) * 1000:.1f}ms p95={percentile(latencies, 95) * 1000:.1f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.1f}ms"
+    )
+
+
+async def run(args, job_id: int, users: list) -> int:
+    tokens = [token_for(email) for _, email in users]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        before = scrape((await client.get("/metrics")).text)
+        applied = await wave(client, job_id, tokens, args.concurrency)
+        duplicates = await wave(client, job_id, tokens, args.concurrency)
+        after = scrape((await client.get("/metrics")).text)
+
+    print(f"job={job_id} applicants={len(users)} concurrency={args.concurrency}")
+    report("apply", *applied)
+    report("duplicate", *duplicates)
+
+    def delta(name, **labels):
+        return metric(after, name, route=ROUTE, **labels) - metric(before, name, route=ROUTE, **labels)
+
+    requests = delta("db_queries_per_request_count")
+    within = delta("db_queries_per_request_bucket", le=str(args.max_queries))
+    print(f"sql: {delta('db_queries_per_request_sum') / max(1, requests):.2f} requêtes/req, "
+          f"{within:.0f}/{requests:.0f} dans le budget ({args.max_queries})")
+
+    failures = []
+    if within < requests:
+        failures.append(f"{requests - within:.0f} requêtes au-delà de {args.max_queries} requêtes SQL")
+    if applied[1] != {201: len(users)}:
+        failures.append(f"candidatures: statuts inattendus {applied[1]}")
+    if duplicates[1] != {409: len(users)}:
+        failures.append(f"doublons: statuts inattendus {duplicates[1]}")
+    for line in failures:
+        print(f"FAIL {line}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--job-id", type=int, help="offre ciblée (défaut: la plus récente)")
+    parser.add_argument("--applicants", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-queries", type=int, default=3, help="budget SQL par candidature, auth comprise")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--keep", action="store_true", help="ne supprime pas les candidatures créées")
+    args = parser.parse_args(argv)
+
+    pool = pool_from_env("bench")
+    job_id, users = pick(pool, args.job_id, args.applicants)
+    if not users:
+        print("Aucun candidat disponible (profil complet, pas encore candidat)", file=sys.stderr)
+        return 1
+    try:
+        return asyncio.run(run(args, job_id, users))
+    finally:
+        if not args.keep:
+            cleanup(pool, job_id, [uid for uid, _ in users])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
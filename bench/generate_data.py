@@ -0,0 +1,427 @@
+"""Générateur de données synthétiques pour tester l'API à l'échelle.
+
+Produit des candidats, recruteurs, entreprises, offres, candidatures et
+notifications réalistes puis les charge en masse (LOAD DATA LOCAL INFILE
+ou INSERT multi-lignes) à la suite des données déjà présentes. Les
+projections que l'API tient à jour (`job_cards`, `company_stats`) sont
+ensuite remplies pour les offres et entreprises chargées.
+
+Exemple:
+    python bench/generate_data.py --applications 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mysql.connector  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+
+import company_stats  # noqa: E402
+import job_cards  # noqa: E402
+
+# Même hash que data/jobboard_demo.sql : tous les comptes ont le mot de passe "test"
+PWD_TEST = "$pbkdf2-sha256$29000$kvLe27u3lnIOYey9d44Rgg$vVjF6wLUEeGH7POw6ucdInshJOzjG7Tqh9InAlO8MrA"
+
+FIRST_NAMES = [
+    "Alex", "Bruno", "Chloé", "Diane", "Evan", "Fiona", "Gaspard", "Hannah", "Inès",
+    "Jules", "Karim", "Léa", "Malik", "Nina", "Oscar", "Paul", "Quentin", "Rania",
+    "Sarah", "Théo", "Ugo", "Victor", "Wassim", "Yasmine", "Zoé",
+]
+LAST_NAMES = [
+    "Martin", "Durand", "Bernard", "Petit", "Roche", "Lemaire", "Morel", "Leclerc",
+    "Garcia", "Fournier", "Girard", "Bonnet", "Dupont", "Lambert", "Fontaine",
+    "Rousseau", "Vincent", "Muller", "Lefevre", "Faure",
+]
+CITIES = [
+    "Paris", "Lyon", "Marseille", "Nantes", "Bordeaux", "Toulouse", "Lille",
+    "Rennes", "Nice", "Strasbourg", "Montpellier", "Grenoble",
+]
+SECTORS = ["SaaS", "Fintech", "E-commerce", "Santé", "Mobilité", "Cybersécurité", "Data", "Industrie"]
+HEADCOUNTS = ["1-10", "11-50", "51-200", "201-500", "500+"]
+CONTRACTS = ["CDI", "CDI", "CDI", "CDD", "Stage", "Alternance", "Freelance"]
+WORK_MODES = ["hybride", "remote", "site"]
+STATUSES = ["new", "new", "new", "review", "review", "matched", "rejected"]
+JOB_TITLES = [
+    ("Développeur Front React", "Construire UI SaaS", "react,ts,frontend"),
+    ("Développeur Backend Python", "API et traitements async", "python,fastapi,sql"),
+    ("DevOps Cloud", "CI/CD & IaC", "k8s,terraform,sre"),
+    ("Data Analyst", "Tableaux de bord métier", "sql,powerbi,python"),
+    ("Data Scientist", "Modèles de scoring", "python,ml,scikit"),
+    ("QA Engineer", "Automatiser les tests", "qa,tests,playwright"),
+    ("Développeur Node", "API headless", "node,sql,api"),
+    ("Android Engineer", "App mobilité", "android,kotlin,ble"),
+    ("Analyste SOC", "Surveillance et réponse", "siem,edr,soc"),
+    ("UX Designer", "Parcours et prototypes", "figma,ux,research"),
+    ("Ingénieur Java", "Plateforme de paiement", "java,spring,kafka"),
+    ("Product Owner", "Backlog et discovery", "agile,produit,scrum"),
+]
+SKILLS = [
+    "JS, React, TS", "Java, Spring, SQL", "Python, SQL, PowerBI", "PHP, MySQL, Laravel",
+    "Figma, React", "SIEM, EDR", "Python, scikit", "Go, Kubernetes", "Kotlin, Android",
+]
+
+NULL = None
+# Offres par requête de remplissage de job_cards
+DERIVED_BATCH = 1000
+
+
+def db_config() -> dict:
+    return {
+        "host": os.getenv("DB_HOST", "127.0.0.1"),
+        "port": int(os.getenv("DB_PORT", "3306")),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASS"),
+        "database": os.getenv("DB_NAME", "jobboard"),
+        "charset": "utf8mb4",
+        "autocommit": False,
+        "allow_local_infile": True,
+    }
+
+
+def _tsv_field(value) -> str:
+    if value is None:
+        return "\\N"
+    text = str(value)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class TableLoader:
+    """Accumule les lignes d'une table et les envoie par lots."""
+
+    def __init__(self, conn, table: str, columns: list[str], method: str, batch_size: int, tmpdir: Path):
+        self.conn = conn
+        self.table = table
+        self.columns = columns
+        self.method = method
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch: list[tuple] = []
+        self._path = tmpdir / f"{table}.tsv"
+        self._file = open(self._path, "w", encoding="utf-8") if method == "load-data" else None
+
+    def add(self, row: tuple):
+        self.count += 1
+        if self._file is not None:
+            self._file.write("\t".join(_tsv_field(v) for v in row))
+            self._file.write("\n")
+            return
+        self._batch.append(row)
+        if len(self._batch) >= self.batch_size:
+            self._flush_batch()
+
+    def _flush_batch(self):
+        if not self._batch:
+            return
+        cols = ", ".join(self.columns)
+        placeholders = ", ".join(["%s"] * len(self.columns))
+        with self.conn.cursor() as cur:
+            # executemany réécrit l'INSERT en une seule requête multi-lignes
+            cur.executemany(
+                f"INSERT INTO {self.table} ({cols}) VALUES ({placeholders})",
+                self._batch,
+            )
+        self.conn.commit()
+        self._batch = []
+
+    def finish(self):
+        if self._file is None:
+            self._flush_batch()
+            return
+        self._file.close()
+        cols = ", ".join(self.columns)
+        with self.conn.cursor() as cur:
+            cur.execute(
+                f"""
+                LOAD DATA LOCAL INFILE %s
+                INTO TABLE {self.table}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                LINES TERMINATED BY '\\n'
+                ({cols})
+                """,
+                (str(self._path),),
+            )
+        self.conn.commit()
+        self._path.unlink(missing_ok=True)
+
+
+def _max_id(conn, table: str) -> int:
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        return int(cur.fetchone()[0])
+
+
+def _fill_derived(conn, job_ids: range, company_ids: range) -> dict:
+    """Remplit `job_cards` (remplissage de la migration 005) et `company_stats` pour les lignes chargées."""
+    for start in range(0, len(job_ids), DERIVED_BATCH):
+        job_cards.sync_jobs(conn, job_ids[start:start + DERIVED_BATCH])
+        conn.commit()
+    refreshed = 0
+    for start in range(0, len(company_ids), company_stats.BATCH_SIZE):
+        refreshed += company_stats.refresh(conn, company_ids[start:start + company_stats.BATCH_SIZE])
+        conn.commit()
+    return {"job_cards": len(job_ids), "company_stats": refreshed}
+
+
+def _skewed_index(rng: random.Random, n: int, skew: float) -> int:
+    # Loi de puissance simple : les premiers index (offres « populaires ») sortent plus souvent
+    return min(n - 1, int(n * (rng.random() ** skew)))
+
+
+def _random_datetime(rng: random.Random, now: datetime, max_days: int) -> datetime:
+    return now - timedelta(seconds=rng.randint(0, max_days * 86400))
+
+
+def generate(args) -> dict:
+    rng = random.Random(args.seed)
+    now = datetime.now().replace(microsecond=0)
+
+    n_apps = args.applications
+    n_candidates = args.candidates or max(100, n_apps // 8)
+    n_companies = args.companies or max(10, n_apps // 400)
+    n_jobs = args.jobs or max(20, n_apps // 40)
+    n_notifications = args.notifications if args.notifications is not None else int(n_apps * 1.2)
+
+    conn = mysql.connector.connect(**db_config())
+    counts: dict[str, int] = {}
+    started = time.perf_counter()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET SESSION foreign_key_checks = 0")
+            cur.execute("SET SESSION unique_checks = 0")
+
+        user_base = _max_id(conn, "users")
+        profile_base = _max_id(conn, "profiles")
+        company_base = _max_id(conn, "companies")
+        job_base = _max_id(conn, "jobs")
+        app_base = _max_id(conn, "applications")
+        notif_base = _max_id(conn, "notifications")
+
+        tmp = Path(tempfile.mkdtemp(prefix="jobboard_gen_"))
+
+        def loader(table, columns):
+            return TableLoader(conn, table, columns, args.method, args.batch_size, tmp)
+
+        # Utilisateurs : candidats puis un recruteur par entreprise
+        users = loader("users", ["id", "email", "password_hash", "role", "created_at"])
+        for i in range(n_candidates):
+            uid = user_base + 1 + i
+            users.add((uid, f"bench.candidat{uid}@load.test", PWD_TEST, "user", _random_datetime(rng, now, 900)))
+        recruiter_base = user_base + n_candidates
+        for i in range(n_companies):
+            uid = recruiter_base + 1 + i
+            users.add((uid, f"bench.recruteur{uid}@load.test", PWD_TEST, "recruiter", _random_datetime(rng, now, 900)))
+        users.finish()
+        counts["users"] = users.count
+
+        profiles = loader(
+            "profiles",
+            [
+                "id", "user_id", "first_name", "last_name", "date_birth", "city", "phone",
+                "contact_email", "skills", "languages", "job_target", "motivation",
+                "cv_url", "avatar_url", "created_at", "updated_at",
+            ],
+        )
+        for i in range(n_candidates):
+            uid = user_base + 1 + i
+            created = _random_datetime(rng, now, 900)
+            title = rng.choice(JOB_TITLES)[0]
+            profiles.add((
+                profile_base + 1 + i,
+                uid,
+                rng.choice(FIRST_NAMES),
+                rng.choice(LAST_NAMES),
+                f"{rng.randint(1975, 2004)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                rng.choice(CITIES),
+                f"+33 6 {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+                f"bench.candidat{uid}@load.test",
+                rng.choice(SKILLS),
+                "FR,EN",
+                title,
+                "Motivé·e et curieux·se",
+                f"https://cv.example/bench{uid}",
+                NULL,
+                created,
+                created,
+            ))
+        profiles.finish()
+        counts["profiles"] = profiles.count
+
+        companies = loader(
+            "companies",
+            ["id", "created_by", "name", "hq_city", "sector", "description", "website", "headcount", "created_at"],
+        )
+        for i in range(n_companies):
+            cid = company_base + 1 + i
+            companies.add((
+                cid,
+                recruiter_base + 1 + i,
+                f"Bench Corp {cid}",
+                rng.choice(CITIES),
+                rng.choice(SECTORS),
+                "Entreprise générée pour les tests de charge.",
+                f"https://bench{cid}.example",
+                rng.choice(HEADCOUNTS),
+                _random_datetime(rng, now, 900),
+            ))
+        companies.finish()
+        counts["companies"] = companies.count
+
+        jobs = loader(
+            "jobs",
+            [
+                "id", "company_id", "title", "short_desc", "full_desc", "location", "contract_type",
+                "work_mode", "salary_min", "salary_max", "currency", "tags", "created_at",
+            ],
+        )
+        job_company: list[int] = []
+        for i in range(n_jobs):
+            # Les grosses entreprises publient plus d'offres
+            company_id = company_base + 1 + _skewed_index(rng, n_companies, 1.5)
+            job_company.append(company_id)
+            title, short_desc, tags = rng.choice(JOB_TITLES)
+            salary_min = rng.randrange(30000, 60000, 1000)
+            jobs.add((
+                job_base + 1 + i,
+                company_id,
+                title,
+                short_desc,
+                f"{title} : mission détaillée, stack {tags.replace(',', ', ')}.",
+                rng.choice(CITIES),
+                rng.choice(CONTRACTS),
+                rng.choice(WORK_MODES),
+                salary_min,
+                salary_min + rng.randrange(5000, 20000, 1000),
+                "EUR",
+                tags,
+                _random_datetime(rng, now, 365),
+            ))
+        jobs.finish()
+        counts["jobs"] = jobs.count
+
+        applications = loader(
+            "applications",
+            ["id", "job_id", "user_id", "message", "cv_url", "status", "matched_at", "created_at"],
+        )
+        app_rows: list[tuple[int, int, int, str]] = []  # (id, job_id, user_id, status)
+        seen_pairs: set[int] = set()  # uniq_applications_job_user, même si on reboucle sur les candidats
+        per_candidate = max(1, n_apps // n_candidates)
+        app_id = app_base
+        candidate = 0
+        while applications.count < n_apps and candidate < n_candidates * 50:
+            uid = user_base + 1 + (candidate % n_candidates)
+            candidate += 1
+            wanted = min(n_jobs, rng.randint(1, per_candidate * 2 - 1), n_apps - applications.count)
+            chosen: set[int] = set()
+            attempts = 0
+            while len(chosen) < wanted and attempts < wanted * 4:
+                job_idx = _skewed_index(rng, n_jobs, args.skew)
+                pair = job_idx * (n_candidates + n_companies + 1) + uid
+                if pair not in seen_pairs:
+                    seen_pairs.add(pair)
+                    chosen.add(job_idx)
+                attempts += 1
+            for job_idx in chosen:
+                app_id += 1
+                status = rng.choice(STATUSES)
+                created = _random_datetime(rng, now, 720)
+                applications.add((
+                    app_id,
+                    job_base + 1 + job_idx,
+                    uid,
+                    "Candidature générée",
+                    f"https://cv.example/bench{uid}",
+                    status,
+                    created if status == "matched" else NULL,
+                    created,
+                ))
+                app_rows.append((app_id, job_base + 1 + job_idx, uid, status))
+        applications.finish()
+        counts["applications"] = applications.count
+
+        notifications = loader(
+            "notifications",
+            ["id", "recipient_user_id", "type", "message", "job_id", "application_id", "is_read", "read_at", "created_at"],
+        )
+        notif_id = notif_base
+        while notifications.count < n_notifications and app_rows:
+            app_row_id, job_id, uid, status = app_rows[notifications.count % len(app_rows)]
+            owner = recruiter_base + 1 + (job_company[job_id - job_base - 1] - company_base - 1)
+            if status == "matched" and rng.random() < 0.5:
+                recipient, kind, msg = uid, "application:matched", "Votre candidature a été acceptée."
+            else:
+                recipient, kind, msg = owner, "application:new", "Nouvelle candidature reçue."
+            is_read = 1 if rng.random() < 0.7 else 0
+            created = _random_datetime(rng, now, 720)
+            notif_id += 1
+            notifications.add((
+                notif_id,
+                recipient,
+                kind,
+                msg,
+                job_id,
+                app_row_id,
+                is_read,
+                created if is_read else NULL,
+                created,
+            ))
+        notifications.finish()
+        counts["notifications"] = notifications.count
+
+        counts.update(_fill_derived(
+            conn,
+            range(job_base + 1, job_base + 1 + n_jobs),
+            range(company_base + 1, company_base + 1 + n_companies),
+        ))
+
+        try:
+            tmp.rmdir()
+        except OSError:
+            pass
+    finally:
+        conn.close()
+
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    return counts
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Charge un jeu de données synthétique dans la base jobboard.")
+    parser.add_argument("--applications", type=int, default=100_000, help="nombre de candidatures (défaut: 100000)")
+    parser.add_argument("--candidates", type=int, help="nombre de candidats (défaut: applications/8)")
+    parser.add_argument("--companies", type=int, help="nombre d'entreprises (défaut: applications/400)")
+    parser.add_argument("--jobs", type=int, help="nombre d'offres (défaut: applications/40)")
+    parser.add_argument("--notifications", type=int, help="nombre de notifications (défaut: 1.2 x applications)")
+    parser.add_argument("--skew", type=float, default=2.0, help="concentration des candidatures sur les offres populaires")
+    parser.add_argument("--method", choices=["load-data", "insert"], default="load-data")
+    parser.add_argument("--batch-size", type=int, default=5000, help="lignes par INSERT (méthode insert)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    try:
+        counts = generate(args)
+    except mysql.connector.Error as e:
+        print(f"DB error: {e}", file=sys.stderr)
+        if args.method == "load-data":
+            print("Astuce: activer local_infile côté serveur ou relancer avec --method insert", file=sys.stderr)
+        return 1
+    for table, count in counts.items():
+        print(f"{table:>14}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
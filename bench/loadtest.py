@@ -0,0 +1,242 @@
+"""Injecteur de charge HTTP asynchrone pour l'API jobboard.
+
+Rejoue un mélange pondéré des appels faits par les pages `js/` (liste et
+détail des offres, recherche, entreprises, profils, widgets connectés...),
+puis affiche p50/p95/p99 et débit par route. Les résultats peuvent être
+enregistrés comme référence et comparés aux exécutions suivantes.
+
+Exemples:
+    python bench/loadtest.py --duration 60 --concurrency 64 --save-baseline bench/baseline.json
+    python bench/loadtest.py --duration 60 --concurrency 64 --baseline bench/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+SEARCH_TERMS = ["react", "python", "data", "devops", "java", "ux", "node", "qa", "android", "soc"]
+
+
+class Scenario:
+    """Route nommée + fabrique de requête (méthode, chemin, kwargs httpx)."""
+
+    def __init__(self, name: str, weight: int, build, auth: bool = False):
+        self.name = name
+        self.weight = weight
+        self.build = build
+        self.auth = auth
+
+
+class Context:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.job_ids: list[int] = []
+        self.profile_ids: list[int] = []
+        self.tokens: list[str] = []
+        self.credentials: list[tuple[str, str]] = []
+
+    def pick(self, values: list[int], fallback: int = 1) -> int:
+        return self.rng.choice(values) if values else fallback
+
+
+def build_scenarios() -> list[Scenario]:
+    return [
+        # nolog_jobs_display.js / jobs_service.js
+        Scenario("GET /api/jobs", 30, lambda c: ("GET", "/api/jobs", {"params": {"page": c.rng.randint(1, 5), "page_size": 12}})),
+        # filter.js (suggestions + recherche complète)
+        Scenario("GET /api/jobs?q", 10, lambda c: ("GET", "/api/jobs", {"params": {"q": c.rng.choice(SEARCH_TERMS), "page_size": 5}})),
+        Scenario("GET /api/jobs/{id}", 20, lambda c: ("GET", f"/api/jobs/{c.pick(c.job_ids)}", {})),
+        # nolog_companies_display.js
+        Scenario("GET /api/companies", 8, lambda c: ("GET", "/api/companies", {})),
+        # user_display.js
+        Scenario("GET /api/profiles", 8, lambda c: ("GET", "/api/profiles", {"params": {"page": c.rng.randint(1, 5), "page_size": 12}})),
+        Scenario("GET /api/profiles/{id}", 6, lambda c: ("GET", f"/api/profiles/{c.pick(c.profile_ids)}", {})),
+        # ping.js
+        Scenario("GET /health", 2, lambda c: ("GET", "/health", {})),
+        # login.js / profile.js / notifications_widget.js / jobs_apply.js
+        Scenario("GET /auth/me", 6, lambda c: ("GET", "/auth/me", {}), auth=True),
+        Scenario("GET /api/me/notifications", 6, lambda c: ("GET", "/api/me/notifications", {}), auth=True),
+        Scenario("GET /api/me/applications", 4, lambda c: ("GET", "/api/me/applications", {}), auth=True),
+        Scenario(
+            "POST /auth/login",
+            2,
+            lambda c: ("POST", "/auth/login", {"json": dict(zip(("email", "password"), c.rng.choice(c.credentials)))}),
+            auth=True,
+        ),
+    ]
+
+
+async def prepare(client: httpx.AsyncClient, ctx: Context, args):
+    """Récupère des ids réels et des jetons pour les scénarios connectés."""
+    for page in range(1, 4):
+        r = await client.get("/api/jobs", params={"page": page, "page_size": 100})
+        if r.status_code == 200:
+            ctx.job_ids += [item["id"] for item in r.json().get("items", [])]
+        r = await client.get("/api/profiles", params={"page": page, "page_size": 100})
+        if r.status_code == 200:
+            ctx.profile_ids += [item["id"] for item in r.json().get("items", [])]
+
+    for i in range(1, args.users + 1):
+        email = args.email_pattern.format(i=i)
+        r = await client.post("/auth/login", json={"email": email, "password": args.password})
+        if r.status_code == 200:
+            ctx.credentials.append((email, args.password))
+            ctx.tokens.append(r.json()["access_token"])
+
+
+async def worker(client, ctx: Context, scenarios, weights, deadline: float, samples: dict):
+    while time.perf_counter() < deadline:
+        scenario = ctx.rng.choices(scenarios, weights=weights)[0]
+        method, path, kwargs = scenario.build(ctx)
+        if scenario.auth and scenario.name != "POST /auth/login":
+            kwargs = {**kwargs, "headers": {"Authorization": f"Bearer {ctx.rng.choice(ctx.tokens)}"}}
+        started = time.perf_counter()
+        try:
+            r = await client.request(method, path, **kwargs)
+            ok = r.status_code < 500 and r.status_code not in (401, 403)
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - started
+        bucket = samples.setdefault(scenario.name, {"latencies": [], "errors": 0})
+        bucket["latencies"].append(elapsed)
+        if not ok:
+            bucket["errors"] += 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # rang le plus proche
+    k = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(samples: dict, duration: float) -> dict:
+    report = {}
+    for name, bucket in sorted(samples.items()):
+        lat = sorted(bucket["latencies"])
+        report[name] = {
+            "count": len(lat),
+            "errors": bucket["errors"],
+            "rps": round(len(lat) / duration, 2),
+            "p50_ms": round(percentile(lat, 50) * 1000, 2),
+            "p95_ms": round(percentile(lat, 95) * 1000, 2),
+            "p99_ms": round(percentile(lat, 99) * 1000, 2),
+        }
+    total = sum(r["count"] for r in report.values())
+    report["_total"] = {
+        "count": total,
+        "errors": sum(r["errors"] for r in report.values()),
+        "rps": round(total / duration, 2),
+    }
+    return report
+
+
+def print_report(report: dict, baseline: dict | None):
+    header = f"{'route':<30} {'count':>8} {'err':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    if baseline:
+        header += f" {'Δp95':>8} {'Δrps':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, row in report.items():
+        if name.startswith("_"):
+            continue
+        line = (
+            f"{name:<30} {row['count']:>8} {row['errors']:>6} {row['rps']:>9} "
+            f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}"
+        )
+        ref = (baseline or {}).get(name)
+        if ref:
+            line += f" {_delta(row['p95_ms'], ref['p95_ms']):>8} {_delta(row['rps'], ref['rps']):>8}"
+        print(line)
+    total = report["_total"]
+    print("-" * len(header))
+    print(f"{'total':<30} {total['count']:>8} {total['errors']:>6} {total['rps']:>9}")
+
+
+def _delta(current: float, reference: float) -> str:
+    if not reference:
+        return "n/a"
+    return f"{(current - reference) / reference * 100:+.0f}%"
+
+
+def regressions(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    failed = []
+    for name, row in report.items():
+        ref = baseline.get(name)
+        if name.startswith("_") or not ref or not ref.get("p95_ms"):
+            continue
+        if row["p95_ms"] > ref["p95_ms"] * (1 + max_regression):
+            failed.append(f"{name}: p95 {ref['p95_ms']}ms -> {row['p95_ms']}ms")
+    return failed
+
+
+async def run(args) -> dict:
+    ctx = Context(random.Random(args.seed))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        await prepare(client, ctx, args)
+        scenarios = [s for s in build_scenarios() if not s.auth or ctx.tokens]
+        if len(scenarios) < len(build_scenarios()):
+            print("Aucun compte connecté: scénarios authentifiés ignorés", file=sys.stderr)
+        weights = [s.weight for s in scenarios]
+
+        if args.warmup > 0:
+            await asyncio.gather(*[
+                worker(client, ctx, scenarios, weights, time.perf_counter() + args.warmup, {})
+                for _ in range(args.concurrency)
+            ])
+
+        samples: dict = {}
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*[
+            worker(client, ctx, scenarios, weights, deadline, samples)
+            for _ in range(args.concurrency)
+        ])
+        return summarize(samples, time.perf_counter() - started)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge HTTP de l'API jobboard.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=30.0, help="durée mesurée en secondes")
+    parser.add_argument("--warmup", type=float, default=5.0, help="durée de chauffe non mesurée")
+    parser.add_argument("--concurrency", type=int, default=32, help="clients simultanés")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=15, help="nombre de comptes à connecter")
+    parser.add_argument("--email-pattern", default="candidat{i}@test.com")
+    parser.add_argument("--password", default="test")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", type=Path, help="enregistre le rapport comme référence")
+    parser.add_argument("--baseline", type=Path, help="compare le rapport à une référence")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="hausse de p95 tolérée (0.2 = +20%%)")
+    parser.add_argument("--json", action="store_true", help="affiche le rapport brut en JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, baseline)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+    if baseline:
+        failed = regressions(report, baseline, args.max_regression)
+        for line in failed:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""Requêtes chaudes : instructions préparées en cache contre requêtes texte.
+
+Pour chaque forme de requête chaude (utilisateur du jeton, détail d'offre,
+page d'offres et son total, notifications), exécute `--iterations` fois
+la même forme avec des paramètres tirés de la base, d'abord en texte puis
+via `cursor(prepared=True)` (cache d'instructions de la connexion), et
+affiche par requête :
+
+- le temps écoulé (p50/p95) et le CPU client (`time.process_time`) ;
+- le CPU et le temps serveur de la session, lus par une seconde connexion
+  dans `performance_schema.events_statements_summary_by_thread_by_event_name`
+  (`SUM_CPU_TIME` à partir de MySQL 8.0.28, sinon le temps seul) ;
+- les compteurs `Com_stmt_*` de la session (préchauffage compris) : une
+  seule préparation par forme en mode préparé, et aucun `reset` : une
+  instruction déjà préparée est réexécutée sans COM_STMT_RESET.
+
+Sans accès à performance_schema, seuls les chiffres client sont affichés.
+Les formes SQL sont celles des routes (`get_current_user`, `get_job`,
+`list_jobs`, `GET /api/me/notifications`).
+
+Exemple:
+    python bench/generate_data.py --applications 100000
+    python bench/prepared_bench.py --iterations 5000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv  # noqa: E402
+from mysql.connector import Error  # noqa: E402
+
+from db import InstrumentedConnection, pool_from_env, statement_cache  # noqa: E402
+from loadtest import percentile  # noqa: E402
+
+WARMUP = 100
+
+JOB_SQL = """
+    SELECT j.id, j.company_id, j.title, j.short_desc, j.full_desc, j.location, j.profile_sought,
+           j.contract_type, j.work_mode, j.salary_min, j.salary_max, j.currency, j.tags, j.created_at,
+           c.name AS company_name, c.website AS company_website, c.banner_url AS company_banner_url
+    FROM jobs j
+    JOIN companies c ON c.id = j.company_id
+    WHERE j.id = %s AND c.deleted_at IS NULL
+"""
+
+NOTIFICATIONS_SQL = """
+    SELECT n.id, n.type, n.message, n.job_id, n.application_id, n.is_read, n.event_count AS count,
+           n.created_at,
+           CASE WHEN n.type = 'application:matched' AND n.recipient_user_id = a.user_id THEN uc.email
+                WHEN n.type = 'application:matched' AND n.recipient_user_id = c.created_by THEN p.contact_email
+                ELSE NULL END AS contact_email
+    FROM notifications n
+    LEFT JOIN applications a ON a.id = n.application_id
+    LEFT JOIN profiles p ON p.user_id = a.user_id
+    LEFT JOIN jobs j ON j.id = a.job_id
+    LEFT JOIN companies c ON c.id = j.company_id
+    LEFT JOIN users uc ON uc.id = c.created_by
+    WHERE n.recipient_user_id = %s
+    ORDER BY n.created_at DESC, n.id DESC
+    LIMIT %s
+"""
+
+SHAPES = {
+    "current_user": (
+        "SELECT id, email, role FROM users WHERE email=%s AND deleted_at IS NULL",
+        lambda rng, data: (rng.choice(data["emails"]),),
+    ),
+    "get_job": (JOB_SQL, lambda rng, data: (rng.choice(data["job_ids"]),)),
+    "list_jobs_total": ("SELECT COUNT(*) AS total FROM job_cards jc", lambda rng, data: ()),
+    "list_jobs": (
+        """
+        SELECT jc.job_id AS id, jc.company_id, jc.title, jc.short_desc, jc.location,
+               jc.contract_type, jc.work_mode, jc.company_name, jc.company_banner_url
+        FROM job_cards jc
+        ORDER BY jc.created_at DESC, jc.job_id DESC
+        LIMIT %s OFFSET %s
+        """,
+        lambda rng, data: (10, 10 * rng.randrange(20)),
+    ),
+    "notifications": (NOTIFICATIONS_SQL, lambda rng, data: (rng.choice(data["recipients"]), 20)),
+}
+
+
+def sample(conn) -> dict:
+    with conn.cursor() as cur:
+        cur.execute("SELECT email FROM users WHERE deleted_at IS NULL ORDER BY id LIMIT 1000")
+        emails = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT job_id FROM job_cards ORDER BY job_id DESC LIMIT 1000")
+        job_ids = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT DISTINCT recipient_user_id FROM notifications LIMIT 1000")
+        recipients = [row[0] for row in cur.fetchall()] or [0]
+    conn.commit()
+    if not emails or not job_ids:
+        raise SystemExit("Il faut des utilisateurs et des offres en base (bench/generate_data.py)")
+    return {"emails": emails, "job_ids": job_ids, "recipients": recipients}
+
+
+class ServerStats:
+    """Temps et CPU serveur cumulés d'une session, lus depuis une autre connexion."""
+
+    def __init__(self, monitor, conn):
+        self.monitor = monitor
+        self.cpu = True
+        with conn.cursor() as cur:
+            cur.execute("SELECT THREAD_ID FROM performance_schema.threads WHERE PROCESSLIST_ID = CONNECTION_ID()")
+            (self.thread_id,) = cur.fetchone()
+        conn.commit()
+
+    def snapshot(self) -> tuple[int, int | None]:
+        """(temps, CPU) en picosecondes ; CPU None si le serveur ne le mesure pas."""
+        columns = "SUM(SUM_TIMER_WAIT), SUM(SUM_CPU_TIME)" if self.cpu else "SUM(SUM_TIMER_WAIT), NULL"
+        try:
+            with self.monitor.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT {columns}
+                    FROM performance_schema.events_statements_summary_by_thread_by_event_name
+                    WHERE THREAD_ID = %s
+                    """,
+                    (self.thread_id,),
+                )
+                wait, cpu = cur.fetchone()
+        except Error:
+            if not self.cpu:
+                raise
+            # SUM_CPU_TIME n'existe qu'à partir de MySQL 8.0.28
+            self.cpu = False
+            return self.snapshot()
+        finally:
+            self.monitor.commit()
+        return int(wait or 0), None if cpu is None else int(cpu)
+
+
+def stmt_counters(conn) -> dict:
+    with conn.cursor() as cur:
+        cur.execute("SHOW SESSION STATUS LIKE 'Com_stmt_%'")
+        rows = cur.fetchall()
+    return {name[len("Com_stmt_"):]: int(value) for name, value in rows}
+
+
+def measure(conn, server, sql: str, params, iterations: int, prepared: bool, rng: random.Random, data: dict) -> dict:
+    db = InstrumentedConnection(conn)
+
+    def once():
+        with db.cursor(dictionary=True, prepared=prepared) as cur:
+            cur.execute(sql, params(rng, data))
+            cur.fetchall()
+
+    counters = stmt_counters(conn)
+    for _ in range(WARMUP):
+        once()
+    conn.commit()
+    before = server.snapshot() if server else None
+    latencies = []
+    cpu_started = time.process_time()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        once()
+        latencies.append((time.perf_counter() - started) * 1000)
+    client_cpu = time.process_time() - cpu_started
+    after = server.snapshot() if server else None
+    conn.commit()
+    counters = {k: v - counters.get(k, 0) for k, v in stmt_counters(conn).items()}
+    latencies.sort()
+    result = {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "client_cpu_us": client_cpu / iterations * 1e6,
+        "prepares": counters.get("prepare", 0),
+        "executes": counters.get("execute", 0),
+        "resets": counters.get("reset", 0),
+    }
+    if before and after:
+        result["server_us"] = (after[0] - before[0]) / iterations / 1e6
+        if after[1] is not None and before[1] is not None:
+            result["server_cpu_us"] = (after[1] - before[1]) / iterations / 1e6
+    return result
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="formes mesurées, séparées par des virgules")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    pool = pool_from_env("bench")
+    conn = pool.acquire()
+    monitor = pool.acquire()
+    try:
+        data = sample(conn)
+        try:
+            server = ServerStats(monitor, conn)
+            server.snapshot()
+        except Error as e:
+            print(f"performance_schema indisponible ({e}) : chiffres client seulement")
+            server = None
+        print(
+            f"{'requête':<16} {'mode':<9} {'p50 ms':>8} {'p95 ms':>8} {'CPU client µs':>14} "
+            f"{'CPU serveur µs':>15} {'temps serveur µs':>17} {'prepare':>8} {'execute':>8} {'reset':>6}"
+        )
+        for name in args.shapes.split(","):
+            sql, params = SHAPES[name]
+            for prepared in (False, True):
+                rng = random.Random(args.seed)
+                r = measure(conn, server, sql, params, args.iterations, prepared, rng, data)
+                print(
+                    f"{name:<16} {'préparé' if prepared else 'texte':<9} {r['p50']:8.3f} {r['p95']:8.3f} "
+                    f"{r['client_cpu_us']:14.1f} {r.get('server_cpu_us', float('nan')):15.1f} "
+                    f"{r.get('server_us', float('nan')):17.1f} {r['prepares']:8d} {r['executes']:8d} {r['resets']:6d}"
+                )
+        print(f"instructions en cache sur la connexion : {len(statement_cache(conn))}")
+    finally:
+        statement_cache(conn).clear()
+        pool.release(monitor)
+        pool.release(conn)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
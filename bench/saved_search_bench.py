@@ -0,0 +1,181 @@
+"""Alertes sur nouvelles offres avec un grand nombre de recherches enregistrées.
+
+1. Enregistre `--searches` recherches (100 000 par défaut) réparties sur
+   les candidats existants : mots des intitulés de `generate_data.py`,
+   mêlés de mots rares pour que la plupart ne correspondent pas.
+2. Pour `--jobs` offres, insère l'offre puis mesure l'index inverse
+   (`saved_searches.find_matches`) et l'envoi groupé des notifications
+   (`saved_searches.notify`) ; chaque offre est annulée (rollback).
+3. Compare, sur `--scan-jobs` offres, avec un parcours de toutes les
+   recherches enregistrées (lecture complète + vérification en Python).
+4. Supprime les recherches créées (sauf `--keep`).
+
+Exemple:
+    python bench/generate_data.py --jobs 200 --applications 0 --candidates 2000
+    python bench/saved_search_bench.py --searches 100000 --jobs 50
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv  # noqa: E402
+
+import saved_searches  # noqa: E402
+from db import pool_from_env  # noqa: E402
+from generate_data import JOB_TITLES  # noqa: E402
+from loadtest import percentile  # noqa: E402
+
+MARKER = "bench:saved-search"
+INSERT_BATCH = 1000
+
+
+def vocabulary() -> list[str]:
+    return sorted({w for title, desc, tags in JOB_TITLES for w in saved_searches.words(f"{title} {desc} {tags}")})
+
+
+def rare_word(rng: random.Random) -> str:
+    return "".join(rng.choice("bcdfghjklmnpqrstvwxz") + rng.choice("aeiouy") for _ in range(rng.randint(3, 5)))
+
+
+def random_search(rng: random.Random, vocab: list[str], company_ids: list[int]) -> tuple:
+    roll = rng.random()
+    company_id = rng.choice(company_ids) if roll < 0.1 else None
+    if roll < 0.05:
+        q = None
+    elif roll < 0.3:
+        q = rng.choice(vocab)
+    elif roll < 0.5:
+        q = f"{rng.choice(vocab)} {rng.choice(vocab)}"
+    else:
+        q = f"{rng.choice(vocab)} {rare_word(rng)}"
+    return q, company_id
+
+
+def populate(conn, count: int, rng: random.Random) -> None:
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM users WHERE role = 'user' AND deleted_at IS NULL ORDER BY id")
+        user_ids = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT id FROM companies WHERE deleted_at IS NULL ORDER BY id")
+        company_ids = [row[0] for row in cur.fetchall()]
+    if not user_ids or not company_ids:
+        raise SystemExit("Il faut des candidats et des entreprises en base (bench/generate_data.py)")
+    vocab = vocabulary()
+    started = time.perf_counter()
+    for start in range(0, count, INSERT_BATCH):
+        rows = []
+        for _ in range(min(INSERT_BATCH, count - start)):
+            q, company_id = random_search(rng, vocab, company_ids)
+            rows.append((rng.choice(user_ids), MARKER, q, company_id, saved_searches.anchor(q, company_id)))
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                INSERT INTO saved_searches (user_id, name, q, company_id, anchor)
+                VALUES {",".join(["(%s, %s, %s, %s, %s)"] * len(rows))}
+                """,
+                [value for row in rows for value in row],
+            )
+        conn.commit()
+    print(f"{count} recherches enregistrées en {time.perf_counter() - started:.1f}s")
+
+
+def scan(conn, job: dict) -> int:
+    """Référence sans index : toutes les recherches lues et vérifiées."""
+    with conn.cursor(dictionary=True) as cur:
+        cur.execute("SELECT id, user_id, name, q, company_id FROM saved_searches")
+        rows = cur.fetchall()
+    job_words = saved_searches.words(f"{job['title']} {job['short_desc']}")
+    return sum(1 for s in rows if saved_searches.matches(s, job, job_words))
+
+
+def run(conn, args, rng: random.Random) -> None:
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM companies WHERE deleted_at IS NULL ORDER BY id")
+        company_ids = [row[0] for row in cur.fetchall()]
+    match_ms, notify_ms, scan_ms = [], [], []
+    candidates_total = matched_total = notified_total = 0
+    for i in range(args.jobs):
+        title, desc, _ = rng.choice(JOB_TITLES)
+        job = {"company_id": rng.choice(company_ids), "title": title, "short_desc": desc}
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO jobs (company_id, title, short_desc, created_at) VALUES (%s, %s, %s, NOW())",
+                    (job["company_id"], title, desc),
+                )
+                job["id"] = cur.lastrowid
+            started = time.perf_counter()
+            candidates, found = saved_searches.find_matches(conn, job)
+            match_ms.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            notified = saved_searches.notify(conn, job, found)
+            notify_ms.append((time.perf_counter() - started) * 1000)
+            candidates_total += candidates
+            matched_total += len(found)
+            notified_total += notified
+            if i < args.scan_jobs:
+                started = time.perf_counter()
+                scanned = scan(conn, job)
+                scan_ms.append((time.perf_counter() - started) * 1000)
+                if scanned != len(found):
+                    print(f"  écart offre {job['id']}: index={len(found)} parcours={scanned}")
+        finally:
+            conn.rollback()
+
+    def line(label: str, values: list[float]) -> str:
+        values = sorted(values)
+        return f"{label:<22} p50={percentile(values, 50):8.2f}ms  p95={percentile(values, 95):8.2f}ms"
+
+    print(f"{args.jobs} offres, {args.searches} recherches enregistrées")
+    print(f"  candidates/offre  {candidates_total / args.jobs:10.1f}")
+    print(f"  correspondances   {matched_total / args.jobs:10.1f}")
+    print(f"  notifications     {notified_total / args.jobs:10.1f}")
+    print("  " + line("index inverse", match_ms))
+    print("  " + line("notifications groupées", notify_ms))
+    if scan_ms:
+        print("  " + line("parcours complet", scan_ms))
+
+
+def cleanup(conn) -> None:
+    deleted = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM saved_searches WHERE name = %s LIMIT 5000", (MARKER,))
+            count = cur.rowcount
+        conn.commit()
+        deleted += count
+        if count == 0:
+            break
+    print(f"{deleted} recherches supprimées")
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--searches", type=int, default=100_000)
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--scan-jobs", type=int, default=5, help="offres également mesurées sans index")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="conserver les recherches créées")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    pool = pool_from_env("bench")
+    conn = pool.acquire()
+    try:
+        populate(conn, args.searches, rng)
+        try:
+            run(conn, args, rng)
+        finally:
+            if not args.keep:
+                cleanup(conn)
+    finally:
+        pool.release(conn)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Scénario « thundering herd » : N clients demandent la même ressource au même instant.
+
+Chaque vague envoie `--herd` requêtes identiques simultanées (détail
+d'une offre populaire, première page des offres), puis on compare, via
+`/metrics`, le nombre de requêtes HTTP au nombre d'exécutions réelles
+(requêtes meneuses du single-flight) et de requêtes SQL.
+
+Pour comparer avec/sans coalescence, lancer l'API deux fois, avec
+`SINGLEFLIGHT_ENABLED=1` puis `0`. Relever aussi la limite de débit
+publique, sinon les vagues venant d'une seule IP finissent en 429:
+    RATE_LIMIT_PUBLIC=1000000/1 uvicorn main:app
+
+Exemple:
+    python bench/thundering_herd.py --herd 200 --rounds 10
+"""
+import argparse
+import asyncio
+import re
+import sys
+import time
+
+import httpx
+
+from loadtest import percentile
+
+_SAMPLE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+
+def scrape(text: str) -> dict:
+    values: dict = {}
+    for line in text.splitlines():
+        m = _SAMPLE.match(line)
+        if m:
+            values[(m.group(1), m.group(2))] = float(m.group(3))
+    return values
+
+
+def metric(values: dict, name: str, **labels) -> float:
+    wanted = [f'{k}="{v}"' for k, v in labels.items()]
+    return sum(v for (n, l), v in values.items() if n == name and all(w in l for w in wanted))
+
+
+async def herd(client: httpx.AsyncClient, path: str, size: int, latencies: list, statuses: dict):
+    async def one():
+        started = time.perf_counter()
+        try:
+            r = await client.get(path)
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+        except httpx.HTTPError:
+            statuses["error"] = statuses.get("error", 0) + 1
+        latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(size)))
+
+
+async def run(args) -> int:
+    limits = httpx.Limits(max_connections=args.herd, max_keepalive_connections=args.herd)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        r = await client.get("/api/jobs", params={"page": 1, "page_size": 1})
+        items = r.json().get("items", []) if r.status_code == 200 else []
+        job_id = items[0]["id"] if items else 1
+        targets = {
+            "/api/jobs/{job_id}": f"/api/jobs/{job_id}",
+            "/api/jobs": "/api/jobs?page=1&page_size=12",
+        }
+
+        before = scrape((await client.get("/metrics")).text)
+        results = {}
+        for route, path in targets.items():
+            latencies: list[float] = []
+            statuses: dict = {}
+            for _ in range(args.rounds):
+                await herd(client, path, args.herd, latencies, statuses)
+                await asyncio.sleep(args.pause)
+            results[route] = (sorted(latencies), statuses)
+        after = scrape((await client.get("/metrics")).text)
+
+    def delta(name, **labels):
+        return metric(after, name, **labels) - metric(before, name, **labels)
+
+    print(f"herd={args.herd} rounds={args.rounds}")
+    for route, (lat, statuses) in results.items():
+        queries = delta("db_queries_per_request_sum", route=route)
+        print(
+            f"{route:<22} requests={len(lat):>6} status={statuses} "
+            f"p50={percentile(lat, 50) * 1000:.1f}ms p95={percentile(lat, 95) * 1000:.1f}ms "
+            f"p99={percentile(lat, 99) * 1000:.1f}ms sql={queries:.0f} ({queries / max(1, len(lat)):.2f}/req)"
+        )
+    leaders = delta("singleflight_requests_total", role="leader")
+    followers = delta("singleflight_requests_total", role="follower")
+    total = leaders + followers
+    print(f"single-flight: {leaders:.0f} executions, {followers:.0f} coalesced ({followers / max(1, total):.0%})")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--herd", type=int, default=100, help="requêtes identiques simultanées par vague")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--pause", type=float, default=0.2, help="pause entre deux vagues (s)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
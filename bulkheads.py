@@ -0,0 +1,149 @@
+"""Cloisons (bulkheads) : limites de concurrence par classe de routes.
+
+Tous les handlers sont des `def` synchrones qui partagent le pool de
+threads d'AnyIO. Chaque routeur déclare sa cloison
+(`APIRouter(route_class=bulkhead_route("admin"))`) : une requête attend
+une place dans sa cloison avant la résolution des dépendances (connexion
+DB comprise) et la garde jusqu'à l'envoi de la réponse et la sortie des
+dépendances `yield` (commit, retour de la connexion au pool, qui passent
+eux aussi par le pool de threads) ; la file d'attente est bornée et
+l'attente mesurée. Le pool
+de threads est dimensionné à la somme des limites (`size_threadpool`) :
+une classe saturée ne consomme jamais les threads des autres.
+
+Limites: `BULKHEAD_<NOM>=<concurrence>:<file>` (ex. `BULKHEAD_ADMIN=3:6`).
+"""
+import asyncio
+import os
+import time
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+
+import observability
+
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("BULKHEAD_QUEUE_TIMEOUT", "5"))
+# Threads hors cloisons (santé, métriques, sorties de dépendances `yield`)
+THREADPOOL_HEADROOM = 8
+
+DEFAULTS = {
+    "public-read": "16:64",
+    "auth": "8:32",
+    "user": "8:32",
+    "recruiter": "6:24",
+    "admin": "3:6",
+    "uploads": "4:8",
+}
+
+bulkhead_queue_seconds = observability.REGISTRY.register(
+    observability.Histogram(
+        "bulkhead_queue_seconds", "Attente d'une place dans la cloison.", ("bulkhead",)
+    )
+)
+bulkhead_rejections = observability.REGISTRY.register(
+    observability.Counter(
+        "bulkhead_rejections_total", "Requêtes refusées (file pleine ou attente trop longue).", ("bulkhead", "reason")
+    )
+)
+
+
+class Bulkhead:
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self._loop = None
+        self._sem: asyncio.Semaphore | None = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Un sémaphore asyncio est lié à sa boucle : un par boucle (une seule en prod)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self.limit)
+            self.in_flight = self.queued = 0
+        return self._sem
+
+    def _reject(self, reason: str):
+        bulkhead_rejections.inc(self.name, reason)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server busy ({self.name}), retry later",
+            headers={"Retry-After": "1"},
+        )
+
+    async def acquire(self):
+        sem = self._semaphore()
+        if sem.locked() and self.queued >= self.max_queue:
+            self._reject("queue_full")
+        self.queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(sem.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject("timeout")
+        finally:
+            self.queued -= 1
+            bulkhead_queue_seconds.observe(time.perf_counter() - started, self.name)
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._sem.release()
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight, "queued": self.queued}
+
+
+def _from_env(name: str, default: str) -> Bulkhead:
+    raw = os.getenv("BULKHEAD_" + name.upper().replace("-", "_"), default)
+    limit, _, queue = raw.partition(":")
+    return Bulkhead(name, int(limit), int(queue or limit))
+
+
+BULKHEADS: dict[str, Bulkhead] = {name: _from_env(name, raw) for name, raw in DEFAULTS.items()}
+
+observability.REGISTRY.register(
+    observability.Gauge(
+        "bulkhead_slots",
+        "Places des cloisons par état.",
+        ("bulkhead", "state"),
+        lambda: [((b.name, state), value) for b in BULKHEADS.values() for state, value in b.stats().items()],
+    )
+)
+
+
+def bulkhead_route(name: str) -> type[APIRoute]:
+    """Classe de route à passer à `APIRouter(route_class=...)`."""
+    bulkhead = BULKHEADS[name]
+
+    class BulkheadRoute(APIRoute):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # Application ASGI de la route entière, pas seulement le handler : FastAPI ferme
+            # les dépendances `yield` après avoir envoyé la réponse
+            route_app = self.app
+
+            async def gated_app(scope, receive, send):
+                await bulkhead.acquire()
+                try:
+                    await route_app(scope, receive, send)
+                finally:
+                    bulkhead.release()
+
+            self.app = gated_app
+
+    BulkheadRoute.__name__ = BulkheadRoute.__qualname__ = f"BulkheadRoute[{name}]"
+    return BulkheadRoute
+
+
+def size_threadpool():
+    """Pool de threads AnyIO = somme des cloisons + marge (à appeler dans la boucle)."""
+    from anyio.to_thread import current_default_thread_limiter
+
+    total = sum(b.limit for b in BULKHEADS.values()) + THREADPOOL_HEADROOM
+    current_default_thread_limiter().total_tokens = total
+    return total
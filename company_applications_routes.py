@@ -1,21 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from mysql.connector import Error
 
+from bulkheads import bulkhead_route
+import invalidation
+from ownership import OWNERSHIP
+
 
 def create_company_applications_router(get_db, require_admin_or_recruiter):
-    router = APIRouter()
+    router = APIRouter(route_class=bulkhead_route("recruiter"))
 
     def _ensure_company_access(db, current_user_id: int, company_id: int):
-        with db.cursor() as cur:
-            cur.execute(
-                """
-                SELECT COUNT(*) FROM companies
-                WHERE id = %s AND created_by = %s
-                """,
-                (company_id, current_user_id),
-            )
-            exists = cur.fetchone()[0]
-        if not exists:
+        if OWNERSHIP.company_owner(db, company_id) != current_user_id:
             raise HTTPException(status_code=403, detail="You cannot access this company data")
 
     @router.get("/api/company/applications")
@@ -25,7 +20,7 @@ def create_company_applications_router(get_db, require_admin_or_recruiter):
         db=Depends(get_db),
     ):
         try:
-            where = ["c.created_by = %s"]
+            where = ["c.created_by = %s", "c.deleted_at IS NULL"]
             params = [current_user["id"]]
             if job_id:
                 where.append("j.id = %s")
@@ -95,7 +90,7 @@ def create_company_applications_router(get_db, require_admin_or_recruiter):
                     FROM applications a
                     JOIN jobs j ON j.id = a.job_id
                     JOIN companies c ON c.id = j.company_id
-                    WHERE a.id = %s
+                    WHERE a.id = %s AND c.deleted_at IS NULL
                     """,
                     (application_id,),
                 )
@@ -117,6 +112,7 @@ def create_company_applications_router(get_db, require_admin_or_recruiter):
                     """,
                     (application_id,),
                 )
+            invalidation.publish(db, invalidation.APPLICATION_CHANGED, application_id)
 
             if application["user_id"]:
                 with db.cursor(dictionary=True) as cur:
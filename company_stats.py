@@ -0,0 +1,144 @@
+"""Compteurs par entreprise (offres, candidatures) pour l'annuaire.
+
+`company_stats` est tenu à jour dans la transaction de chaque écriture de
+l'API : `bump` pour un +1 (offre créée, candidature reçue), `refresh` pour
+recalculer une entreprise après une suppression en cascade. Un thread
+recalcule en plus toutes les entreprises par lots toutes les
+`COMPANY_STATS_REFRESH_SECONDS`, pour rattraper les chemins sans compteur
+(purge, archivage, SQL manuel) ; un verrou nommé MySQL évite que chaque
+worker refasse le même passage. L'annuaire lit ces compteurs au lieu d'un
+GROUP BY sur `jobs`/`applications` à chaque appel.
+"""
+import logging
+import os
+import threading
+
+from mysql.connector import Error
+
+REFRESH_SECONDS = float(os.getenv("COMPANY_STATS_REFRESH_SECONDS", "900"))
+BATCH_SIZE = int(os.getenv("COMPANY_STATS_BATCH_SIZE", "200"))
+LOCK_NAME = "jobboard.company_stats"
+
+# Utilisable tel quel dans un lot SQL groupé (cf. apply_to_job)
+BUMP_SQL = """
+    INSERT INTO company_stats (company_id, open_jobs, applications, updated_at)
+    VALUES (%s, %s, %s, NOW())
+    ON DUPLICATE KEY UPDATE
+        open_jobs = open_jobs + %s,
+        applications = applications + %s,
+        updated_at = NOW()
+"""
+
+log = logging.getLogger("jobboard.company_stats")
+
+
+def bump_params(company_id: int, open_jobs: int = 0, applications: int = 0) -> tuple:
+    return (company_id, open_jobs, applications, open_jobs, applications)
+
+
+def bump(db, company_id: int, open_jobs: int = 0, applications: int = 0):
+    with db.cursor() as cur:
+        cur.execute(BUMP_SQL, bump_params(company_id, open_jobs, applications))
+
+
+def refresh(db, company_ids) -> int:
+    """Recalcule les compteurs des entreprises données ; renvoie le nombre d'entreprises mises à jour."""
+    company_ids = [i for i in dict.fromkeys(company_ids) if i is not None]
+    if not company_ids:
+        return 0
+    in_sql = ",".join(["%s"] * len(company_ids))
+    with db.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT c.id,
+                   (SELECT COUNT(*) FROM jobs j WHERE j.company_id = c.id),
+                   (SELECT COUNT(*) FROM applications a JOIN jobs j ON j.id = a.job_id WHERE j.company_id = c.id)
+            FROM companies c
+            WHERE c.id IN ({in_sql})
+            """,
+            company_ids,
+        )
+        rows = cur.fetchall()
+        if not rows:
+            return 0
+        # Alias de ligne (MySQL 8.0.19+) plutôt que VALUES(), déprécié et signalé en warning
+        cur.execute(
+            f"""
+            INSERT INTO company_stats (company_id, open_jobs, applications, updated_at)
+            VALUES {",".join(["(%s, %s, %s, NOW())"] * len(rows))} AS fresh
+            ON DUPLICATE KEY UPDATE
+                open_jobs = fresh.open_jobs,
+                applications = fresh.applications,
+                updated_at = NOW()
+            """,
+            [value for row in rows for value in row],
+        )
+    return len(rows)
+
+
+class StatsRefresher:
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, pool):
+        if self._thread is not None or REFRESH_SECONDS <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(pool,), name="company-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, pool):
+        while not self._stop.is_set():
+            try:
+                conn = pool.acquire()
+            except Error as e:
+                log.warning("company stats: no connection (%s)", e)
+                self._stop.wait(REFRESH_SECONDS)
+                continue
+            broken = False
+            try:
+                self.run_once(conn)
+            except Exception as e:
+                broken = True
+                log.warning("company stats refresh failed: %s", e)
+            finally:
+                pool.release(conn, discard=broken)
+            self._stop.wait(REFRESH_SECONDS)
+
+    def run_once(self, conn) -> int:
+        """Recalcule toutes les entreprises par lots ; 0 si un autre worker s'en charge déjà."""
+        with conn.cursor() as cur:
+            cur.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+            (locked,) = cur.fetchone()
+        if not locked:
+            conn.commit()
+            return 0
+        refreshed = 0
+        last_id = 0
+        try:
+            while not self._stop.is_set():
+                with conn.cursor() as cur:
+                    cur.execute("SELECT id FROM companies WHERE id > %s ORDER BY id LIMIT %s", (last_id, self.batch_size))
+                    ids = [row[0] for row in cur.fetchall()]
+                if not ids:
+                    break
+                refreshed += refresh(conn, ids)
+                conn.commit()
+                last_id = ids[-1]
+        finally:
+            with conn.cursor() as cur:
+                cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cur.fetchone()
+            conn.commit()
+        return refreshed
+
+
+REFRESHER = StatsRefresher()
@@ -0,0 +1,259 @@
+"""Téléversement reprenable des CV (PDF) par morceaux.
+
+Protocole : création d'une session (taille annoncée), envoi des morceaux
+par `PUT` avec `Content-Range` et l'empreinte SHA-256 du morceau, puis
+finalisation. Un envoi interrompu reprend en demandant l'état de la
+session (morceaux reçus) et en renvoyant les manquants.
+
+Tout l'état est sur disque, sous `CV_UPLOAD_TMP_DIR/<user>/<session>/` :
+`meta.json` (écrit une fois), `data` (fichier final, pré-dimensionné,
+chaque morceau écrit à son offset) et un marqueur vide par morceau
+vérifié. N'importe quel worker peut donc recevoir n'importe quel morceau,
+sans verrou partagé, et la mémoire par envoi reste bornée à un tampon de
+lecture. Seule la création d'une session verrouille (`flock`) le dossier
+de l'utilisateur, le temps de compter ses sessions. Les sessions sans
+activité depuis `CV_UPLOAD_TTL_SECONDS` sont supprimées.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import observability
+import upload_storage
+
+TMP_DIR = Path(os.getenv("CV_UPLOAD_TMP_DIR", "uploads_tmp/cv"))
+MAX_BYTES = int(os.getenv("CV_MAX_BYTES", str(10 * 1024 * 1024)))
+CHUNK_BYTES = int(os.getenv("CV_UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+MAX_SESSIONS = int(os.getenv("CV_UPLOAD_MAX_SESSIONS", "3"))
+TTL_SECONDS = float(os.getenv("CV_UPLOAD_TTL_SECONDS", "86400"))
+SWEEP_EVERY_SECONDS = 60.0
+READ_BYTES = 64 * 1024
+
+_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+chunks_received = observability.REGISTRY.register(
+    observability.Counter("cv_upload_chunks_total", "Morceaux de CV reçus, par résultat.", ("result",))
+)
+
+
+class UploadError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class Session:
+    def __init__(self, path: Path, meta: dict):
+        self.path = path
+        self.meta = meta
+
+    @property
+    def chunk_count(self) -> int:
+        return max(1, -(-self.meta["size"] // self.meta["chunk_size"]))
+
+    def chunk_range(self, index: int) -> tuple[int, int]:
+        start = index * self.meta["chunk_size"]
+        return start, min(start + self.meta["chunk_size"], self.meta["size"])
+
+    def received(self) -> list[int]:
+        return sorted(int(p.name[6:]) for p in self.path.glob("chunk.*"))
+
+    def touch(self):
+        os.utime(self.path)
+
+    def status(self) -> dict:
+        received = self.received()
+        return {
+            "id": self.path.name,
+            "size": self.meta["size"],
+            "chunk_size": self.meta["chunk_size"],
+            "chunks": self.chunk_count,
+            "received": received,
+            "missing": sorted(set(range(self.chunk_count)) - set(received)),
+            "expires_in": max(0, int(self.path.stat().st_mtime + TTL_SECONDS - time.time())),
+        }
+
+
+# --------------------------------------------------------------------
+# Sessions
+# --------------------------------------------------------------------
+def _user_dir(user_id: int) -> Path:
+    return TMP_DIR / str(int(user_id))
+
+
+def _expired(path: Path, now: float) -> bool:
+    try:
+        return path.stat().st_mtime + TTL_SECONDS < now
+    except FileNotFoundError:
+        return True
+
+
+def create(user_id: int, size: int, sha256: str | None = None) -> Session:
+    sweep()
+    if size <= 0:
+        raise UploadError(400, "size must be positive")
+    if size > MAX_BYTES:
+        raise UploadError(413, f"File too large (max {MAX_BYTES // (1024 * 1024)}MB)")
+    if sha256 is not None and not re.fullmatch(r"[0-9a-f]{64}", sha256):
+        raise UploadError(400, "sha256 must be 64 hex characters")
+    user_dir = _user_dir(user_id)
+    user_dir.mkdir(parents=True, exist_ok=True)
+    # Compte et création sous verrou : deux workers ne passent pas la limite ensemble
+    lock_fd = os.open(user_dir, os.O_RDONLY)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        now = time.time()
+        active = [p for p in user_dir.iterdir() if not _expired(p, now)]
+        if len(active) >= MAX_SESSIONS:
+            raise UploadError(429, f"Too many uploads in progress ({MAX_SESSIONS} max)")
+        path = user_dir / secrets.token_hex(16)
+        path.mkdir()
+    finally:
+        os.close(lock_fd)
+    meta = {"user_id": int(user_id), "size": size, "chunk_size": CHUNK_BYTES, "sha256": sha256, "created_at": now}
+    with open(path / "data", "wb") as f:
+        f.truncate(size)
+    with open(path / "meta.json", "w") as f:
+        json.dump(meta, f)
+    return Session(path, meta)
+
+
+def load(user_id: int, session_id: str) -> Session:
+    if not _SESSION_ID.match(session_id):
+        raise UploadError(404, "Upload session not found")
+    path = _user_dir(user_id) / session_id
+    try:
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        raise UploadError(404, "Upload session not found")
+    if _expired(path, time.time()):
+        shutil.rmtree(path, ignore_errors=True)
+        raise UploadError(404, "Upload session expired")
+    return Session(path, meta)
+
+
+def abort(session: Session):
+    shutil.rmtree(session.path, ignore_errors=True)
+
+
+# --------------------------------------------------------------------
+# Morceaux
+# --------------------------------------------------------------------
+def parse_range(session: Session, header: str | None) -> int:
+    """Index du morceau désigné par `Content-Range: bytes début-fin/total` (bornes alignées sur chunk_size)."""
+    m = _RANGE.match(header or "")
+    if not m:
+        raise UploadError(400, "Content-Range must be 'bytes start-end/total'")
+    start, end, total = (int(g) for g in m.groups())
+    if total != session.meta["size"] or start % session.meta["chunk_size"]:
+        raise UploadError(416, "Range does not match the upload session")
+    index = start // session.meta["chunk_size"]
+    if index >= session.chunk_count or (start, end + 1) != session.chunk_range(index):
+        raise UploadError(416, "Range does not match the upload session")
+    return index
+
+
+class ChunkWriter:
+    """Écrit un morceau à son offset en calculant son empreinte au fil de l'eau."""
+
+    def __init__(self, session: Session, index: int):
+        self.session = session
+        self.index = index
+        self.start, self.end = session.chunk_range(index)
+        self.offset = self.start
+        self.digest = hashlib.sha256()
+        # Un morceau réécrit n'est plus considéré comme reçu tant qu'il n'est pas vérifié
+        (session.path / f"chunk.{index}").unlink(missing_ok=True)
+        self._fd = os.open(session.path / "data", os.O_WRONLY)
+
+    def write(self, data: bytes):
+        if self.offset + len(data) > self.end:
+            raise UploadError(400, "Chunk is larger than its Content-Range")
+        os.pwrite(self._fd, data, self.offset)
+        self.digest.update(data)
+        self.offset += len(data)
+
+    def close(self, sha256: str | None):
+        self.discard()
+        if self.offset != self.end:
+            chunks_received.inc("incomplete")
+            raise UploadError(400, "Chunk is shorter than its Content-Range")
+        if (sha256 or "").lower() != self.digest.hexdigest():
+            chunks_received.inc("checksum_mismatch")
+            raise UploadError(422, "Chunk checksum mismatch")
+        (self.session.path / f"chunk.{self.index}").touch()
+        self.session.touch()
+        chunks_received.inc("ok")
+
+    def discard(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+# --------------------------------------------------------------------
+# Finalisation
+# --------------------------------------------------------------------
+def finalize(session: Session, dest_dir: Path, prefix: str) -> str:
+    """Vérifie le fichier assemblé et le range dans `dest_dir` ; renvoie son URL publique."""
+    missing = session.status()["missing"]
+    if missing:
+        raise UploadError(409, f"Missing chunks: {', '.join(map(str, missing[:20]))}")
+    data = session.path / "data"
+    digest = hashlib.sha256()
+    with open(data, "rb") as f:
+        if f.read(5) != b"%PDF-":
+            abort(session)
+            raise UploadError(400, "Unsupported document (PDF only)")
+        f.seek(0)
+        while block := f.read(READ_BYTES):
+            digest.update(block)
+    if session.meta.get("sha256") and digest.hexdigest() != session.meta["sha256"]:
+        abort(session)
+        raise UploadError(422, "File checksum mismatch")
+    dest, url = upload_storage.target(f"{prefix}_{secrets.token_hex(8)}.pdf", dest_dir)
+    try:
+        os.replace(data, dest)
+    except FileNotFoundError:
+        # Finalisation concurrente de la même session
+        raise UploadError(409, "Upload already finalized")
+    except OSError:
+        shutil.move(str(data), str(dest))
+    abort(session)
+    return url
+
+
+# --------------------------------------------------------------------
+# Expiration
+# --------------------------------------------------------------------
+_sweep_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def sweep(force: bool = False) -> int:
+    """Supprime les sessions sans activité depuis TTL_SECONDS (au plus une passe par minute)."""
+    global _last_sweep
+    now = time.time()
+    with _sweep_lock:
+        if not force and now - _last_sweep < SWEEP_EVERY_SECONDS:
+            return 0
+        _last_sweep = now
+    removed = 0
+    if not TMP_DIR.exists():
+        return 0
+    for user_dir in TMP_DIR.iterdir():
+        for path in list(user_dir.iterdir()):
+            if _expired(path, now):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+    return removed
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from bulkheads import bulkhead_route
+import cv_uploads
+
+
+def create_cv_uploads_router(require_user, upload_dir: Path):
+    router = APIRouter(route_class=bulkhead_route("uploads"))
+
+    def _load(current_user: dict, session_id: str) -> cv_uploads.Session:
+        try:
+            return cv_uploads.load(current_user["id"], session_id)
+        except cv_uploads.UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    @router.post("/upload/cv/sessions", status_code=201)
+    def create_cv_upload(payload: dict, current_user: dict = Depends(require_user)):
+        try:
+            size = int(payload.get("size") or 0)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="size must be an integer")
+        try:
+            session = cv_uploads.create(current_user["id"], size, payload.get("sha256"))
+        except cv_uploads.UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        return session.status()
+
+    @router.get("/upload/cv/sessions/{session_id}")
+    def get_cv_upload(session_id: str, current_user: dict = Depends(require_user)):
+        return _load(current_user, session_id).status()
+
+    @router.put("/upload/cv/sessions/{session_id}")
+    async def put_cv_chunk(session_id: str, request: Request, current_user: dict = Depends(require_user)):
+        session = await run_in_threadpool(_load, current_user, session_id)
+        try:
+            index = cv_uploads.parse_range(session, request.headers.get("content-range"))
+            writer = await run_in_threadpool(cv_uploads.ChunkWriter, session, index)
+        except cv_uploads.UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        try:
+            # Le corps est lu et écrit au fil de l'eau : mémoire bornée quelle que soit la taille du morceau
+            async for data in request.stream():
+                if data:
+                    await run_in_threadpool(writer.write, data)
+            await run_in_threadpool(writer.close, request.headers.get("x-chunk-sha256"))
+        except cv_uploads.UploadError as e:
+            writer.discard()
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        except BaseException:
+            writer.discard()
+            raise
+        return {"index": index, "received": True}
+
+    @router.post("/upload/cv/sessions/{session_id}/finalize", status_code=201)
+    def finalize_cv_upload(session_id: str, current_user: dict = Depends(require_user)):
+        session = _load(current_user, session_id)
+        try:
+            url = cv_uploads.finalize(session, upload_dir, prefix=f"cv_{current_user['id']}")
+        except cv_uploads.UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        return {"url": url}
+
+    @router.delete("/upload/cv/sessions/{session_id}", status_code=204)
+    def abort_cv_upload(session_id: str, current_user: dict = Depends(require_user)):
+        cv_uploads.abort(_load(current_user, session_id))
+        return Response(status_code=204)
+
+    return router
@@ -20,7 +20,9 @@ CREATE TABLE users (
   email VARCHAR(255) NOT NULL UNIQUE,
   password_hash VARCHAR(255) NOT NULL,
   role VARCHAR(50) NOT NULL DEFAULT 'user',
-  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  deleted_at DATETIME NULL,
+  INDEX idx_users_deleted_at (deleted_at)
 ) ENGINE=InnoDB;
 
 CREATE TABLE profiles (
@@ -61,6 +63,10 @@ CREATE TABLE companies (
   headcount VARCHAR(50) NULL,
   banner_url VARCHAR(512) NULL,
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  deleted_at DATETIME NULL,
+  INDEX idx_companies_deleted_at (deleted_at),
+  INDEX idx_companies_sector (sector, id),
+  INDEX idx_companies_hq_city (hq_city, id),
   CONSTRAINT fk_companies_created_by FOREIGN KEY (created_by)
     REFERENCES users (id) ON DELETE CASCADE ON UPDATE CASCADE
 ) ENGINE=InnoDB;
@@ -103,7 +109,8 @@ CREATE TABLE applications (
   UNIQUE KEY uniq_applications_job_user (job_id, user_id),
   INDEX idx_applications_status (status),
   INDEX idx_applications_job_id (job_id),
-  INDEX idx_applications_user_id (user_id)
+  INDEX idx_applications_user_id (user_id),
+  INDEX idx_applications_created_at (created_at)
 ) ENGINE=InnoDB;
 
 CREATE TABLE notifications (
@@ -113,19 +120,123 @@ CREATE TABLE notifications (
   message TEXT NOT NULL,
   job_id INT NULL,
   application_id INT NULL,
+  group_key VARCHAR(120) NULL,
+  event_count INT NOT NULL DEFAULT 1,
   is_read TINYINT(1) NOT NULL DEFAULT 0,
   read_at DATETIME NULL,
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  open_group_key VARCHAR(120) AS (IF(is_read = 0, group_key, NULL)) STORED,
   CONSTRAINT fk_notifications_recipient_user_id FOREIGN KEY (recipient_user_id)
     REFERENCES users (id) ON DELETE CASCADE ON UPDATE CASCADE,
   CONSTRAINT fk_notifications_job_id FOREIGN KEY (job_id)
     REFERENCES jobs (id) ON DELETE CASCADE ON UPDATE CASCADE,
   CONSTRAINT fk_notifications_application_id FOREIGN KEY (application_id)
     REFERENCES applications (id) ON DELETE CASCADE ON UPDATE CASCADE,
+  UNIQUE KEY uniq_notifications_open_group (recipient_user_id, open_group_key),
   INDEX idx_notifications_recipient_read (recipient_user_id, is_read),
   INDEX idx_notifications_created_at (created_at)
 ) ENGINE=InnoDB;
 
+CREATE TABLE cache_invalidations (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  kind VARCHAR(50) NOT NULL,
+  entity_id INT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_cache_invalidations_created_at (created_at)
+) ENGINE=InnoDB;
+
+CREATE TABLE purge_jobs (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  entity VARCHAR(20) NOT NULL,
+  entity_id INT NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  step VARCHAR(50) NULL,
+  deleted_rows INT NOT NULL DEFAULT 0,
+  attempts INT NOT NULL DEFAULT 0,
+  last_error TEXT NULL,
+  next_attempt_at DATETIME NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  finished_at DATETIME NULL,
+  UNIQUE KEY uniq_purge_jobs_entity (entity, entity_id),
+  INDEX idx_purge_jobs_status (status, id)
+) ENGINE=InnoDB;
+
+CREATE TABLE applications_archive (
+  id INT PRIMARY KEY,
+  job_id  INT NOT NULL,
+  user_id INT NULL,
+  name  VARCHAR(255) NULL,
+  email VARCHAR(255) NULL,
+  phone VARCHAR(50)  NULL,
+  message TEXT NULL,
+  cv_url  VARCHAR(512) NULL,
+  status  VARCHAR(30) NOT NULL,
+  matched_at DATETIME NULL,
+  created_at DATETIME NOT NULL,
+  archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_applications_archive_job_id (job_id),
+  INDEX idx_applications_archive_user_id (user_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE notifications_archive (
+  id INT PRIMARY KEY,
+  recipient_user_id INT NOT NULL,
+  type VARCHAR(50) NOT NULL,
+  message TEXT NOT NULL,
+  job_id INT NULL,
+  application_id INT NULL,
+  event_count INT NOT NULL DEFAULT 1,
+  is_read TINYINT(1) NOT NULL,
+  read_at DATETIME NULL,
+  created_at DATETIME NOT NULL,
+  archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_notifications_archive_recipient (recipient_user_id, created_at),
+  INDEX idx_notifications_archive_job_id (job_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE company_stats (
+  company_id INT PRIMARY KEY,
+  open_jobs INT NOT NULL DEFAULT 0,
+  applications INT NOT NULL DEFAULT 0,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT fk_company_stats_company_id FOREIGN KEY (company_id)
+    REFERENCES companies (id) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE job_cards (
+  job_id INT PRIMARY KEY,
+  company_id INT NOT NULL,
+  title VARCHAR(255) NOT NULL,
+  short_desc TEXT NULL,
+  location VARCHAR(100) NULL,
+  contract_type VARCHAR(50) NULL,
+  work_mode VARCHAR(50) NULL,
+  created_at DATETIME NOT NULL,
+  company_name VARCHAR(255) NOT NULL,
+  company_banner_url VARCHAR(512) NULL,
+  INDEX idx_job_cards_created_at (created_at, job_id),
+  INDEX idx_job_cards_company (company_id, created_at, job_id),
+  CONSTRAINT fk_job_cards_job_id FOREIGN KEY (job_id)
+    REFERENCES jobs (id) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE saved_searches (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  user_id INT NOT NULL,
+  name VARCHAR(100) NULL,
+  q VARCHAR(255) NULL,
+  company_id INT NULL,
+  anchor VARCHAR(64) NOT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_saved_searches_anchor (anchor),
+  INDEX idx_saved_searches_user_id (user_id, id),
+  CONSTRAINT fk_saved_searches_user_id FOREIGN KEY (user_id)
+    REFERENCES users (id) ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT fk_saved_searches_company_id FOREIGN KEY (company_id)
+    REFERENCES companies (id) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
 -- =========================================================
 -- DONNEES DE TEST ETENDUES (images aléatoires)
 -- =========================================================
@@ -347,3 +458,24 @@ LEFT JOIN users u ON a.user_id = u.id;
 UPDATE companies
 SET banner_url = '../site/assets/logo-data-pulse.png'
 WHERE name = 'DataPulse';
+
+-- Cartes d'offres (ensuite tenues à jour par l'API)
+INSERT INTO job_cards
+  (job_id, company_id, title, short_desc, location, contract_type, work_mode,
+   created_at, company_name, company_banner_url)
+SELECT j.id, j.company_id, j.title, j.short_desc, j.location, j.contract_type, j.work_mode,
+       j.created_at, c.name, c.banner_url
+FROM jobs j
+JOIN companies c ON c.id = j.company_id
+WHERE c.deleted_at IS NULL
+ON DUPLICATE KEY UPDATE job_id = job_id;
+
+-- Remplissage initial (ensuite tenu à jour par l'API et recalculé périodiquement)
+INSERT INTO company_stats (company_id, open_jobs, applications)
+SELECT * FROM (
+  SELECT c.id AS company_id,
+         (SELECT COUNT(*) FROM jobs j WHERE j.company_id = c.id) AS open_jobs,
+         (SELECT COUNT(*) FROM applications a JOIN jobs j ON j.id = a.job_id WHERE j.company_id = c.id) AS applications
+  FROM companies c
+) AS s
+ON DUPLICATE KEY UPDATE open_jobs = s.open_jobs, applications = s.applications;
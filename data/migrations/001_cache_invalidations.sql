@@ -0,0 +1,10 @@
+-- Bus d'invalidation de caches entre workers (invalidation.py)
+USE jobboard;
+
+CREATE TABLE IF NOT EXISTS cache_invalidations (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  kind VARCHAR(50) NOT NULL,
+  entity_id INT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_cache_invalidations_created_at (created_at)
+) ENGINE=InnoDB;
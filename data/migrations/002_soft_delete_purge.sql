@@ -0,0 +1,26 @@
+-- Suppression en deux temps : masquage immédiat puis purge par lots (purge.py)
+USE jobboard;
+
+ALTER TABLE users
+  ADD COLUMN deleted_at DATETIME NULL,
+  ADD INDEX idx_users_deleted_at (deleted_at);
+
+ALTER TABLE companies
+  ADD COLUMN deleted_at DATETIME NULL,
+  ADD INDEX idx_companies_deleted_at (deleted_at);
+
+CREATE TABLE IF NOT EXISTS purge_jobs (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  entity VARCHAR(20) NOT NULL,
+  entity_id INT NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  step VARCHAR(50) NULL,
+  deleted_rows INT NOT NULL DEFAULT 0,
+  attempts INT NOT NULL DEFAULT 0,
+  last_error TEXT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  finished_at DATETIME NULL,
+  UNIQUE KEY uniq_purge_jobs_entity (entity, entity_id),
+  INDEX idx_purge_jobs_status (status, id)
+) ENGINE=InnoDB;
@@ -0,0 +1,37 @@
+-- Rétention : notifications lues et vieilles candidatures déplacées vers des tables d'archive (retention.py)
+USE jobboard;
+
+ALTER TABLE applications
+  ADD INDEX idx_applications_created_at (created_at);
+
+CREATE TABLE IF NOT EXISTS applications_archive (
+  id INT PRIMARY KEY,
+  job_id  INT NOT NULL,
+  user_id INT NULL,
+  name  VARCHAR(255) NULL,
+  email VARCHAR(255) NULL,
+  phone VARCHAR(50)  NULL,
+  message TEXT NULL,
+  cv_url  VARCHAR(512) NULL,
+  status  VARCHAR(30) NOT NULL,
+  matched_at DATETIME NULL,
+  created_at DATETIME NOT NULL,
+  archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_applications_archive_job_id (job_id),
+  INDEX idx_applications_archive_user_id (user_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS notifications_archive (
+  id INT PRIMARY KEY,
+  recipient_user_id INT NOT NULL,
+  type VARCHAR(50) NOT NULL,
+  message TEXT NOT NULL,
+  job_id INT NULL,
+  application_id INT NULL,
+  is_read TINYINT(1) NOT NULL,
+  read_at DATETIME NULL,
+  created_at DATETIME NOT NULL,
+  archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_notifications_archive_recipient (recipient_user_id, created_at),
+  INDEX idx_notifications_archive_job_id (job_id)
+) ENGINE=InnoDB;
@@ -0,0 +1,25 @@
+-- Compteurs par entreprise pour l'annuaire paginé (company_stats.py)
+USE jobboard;
+
+CREATE TABLE IF NOT EXISTS company_stats (
+  company_id INT PRIMARY KEY,
+  open_jobs INT NOT NULL DEFAULT 0,
+  applications INT NOT NULL DEFAULT 0,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT fk_company_stats_company_id FOREIGN KEY (company_id)
+    REFERENCES companies (id) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+ALTER TABLE companies
+  ADD INDEX idx_companies_sector (sector, id),
+  ADD INDEX idx_companies_hq_city (hq_city, id);
+
+-- Remplissage initial (ensuite tenu à jour par l'API et recalculé périodiquement)
+INSERT INTO company_stats (company_id, open_jobs, applications)
+SELECT * FROM (
+  SELECT c.id AS company_id,
+         (SELECT COUNT(*) FROM jobs j WHERE j.company_id = c.id) AS open_jobs,
+         (SELECT COUNT(*) FROM applications a JOIN jobs j ON j.id = a.job_id WHERE j.company_id = c.id) AS applications
+  FROM companies c
+) AS s
+ON DUPLICATE KEY UPDATE open_jobs = s.open_jobs, applications = s.applications;
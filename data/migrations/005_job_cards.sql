@@ -0,0 +1,30 @@
+-- Projection des cartes d'offres pour les listes (job_cards.py)
+USE jobboard;
+
+CREATE TABLE IF NOT EXISTS job_cards (
+  job_id INT PRIMARY KEY,
+  company_id INT NOT NULL,
+  title VARCHAR(255) NOT NULL,
+  short_desc TEXT NULL,
+  location VARCHAR(100) NULL,
+  contract_type VARCHAR(50) NULL,
+  work_mode VARCHAR(50) NULL,
+  created_at DATETIME NOT NULL,
+  company_name VARCHAR(255) NOT NULL,
+  company_banner_url VARCHAR(512) NULL,
+  INDEX idx_job_cards_created_at (created_at, job_id),
+  INDEX idx_job_cards_company (company_id, created_at, job_id),
+  CONSTRAINT fk_job_cards_job_id FOREIGN KEY (job_id)
+    REFERENCES jobs (id) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+-- Remplissage initial (ensuite tenu à jour par l'API)
+INSERT INTO job_cards
+  (job_id, company_id, title, short_desc, location, contract_type, work_mode,
+   created_at, company_name, company_banner_url)
+SELECT j.id, j.company_id, j.title, j.short_desc, j.location, j.contract_type, j.work_mode,
+       j.created_at, c.name, c.banner_url
+FROM jobs j
+JOIN companies c ON c.id = j.company_id
+WHERE c.deleted_at IS NULL
+ON DUPLICATE KEY UPDATE job_id = job_id;
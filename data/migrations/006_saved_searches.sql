@@ -0,0 +1,18 @@
+-- Recherches enregistrées et alertes sur les nouvelles offres (saved_searches.py)
+USE jobboard;
+
+CREATE TABLE IF NOT EXISTS saved_searches (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  user_id INT NOT NULL,
+  name VARCHAR(100) NULL,
+  q VARCHAR(255) NULL,
+  company_id INT NULL,
+  anchor VARCHAR(64) NOT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_saved_searches_anchor (anchor),
+  INDEX idx_saved_searches_user_id (user_id, id),
+  CONSTRAINT fk_saved_searches_user_id FOREIGN KEY (user_id)
+    REFERENCES users (id) ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT fk_saved_searches_company_id FOREIGN KEY (company_id)
+    REFERENCES companies (id) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
@@ -0,0 +1,12 @@
+-- Notifications groupées : un compteur par (destinataire, type, offre, fenêtre) tant qu'elles sont non lues
+-- (notification_digests.py)
+USE jobboard;
+
+ALTER TABLE notifications
+  ADD COLUMN group_key VARCHAR(120) NULL AFTER application_id,
+  ADD COLUMN event_count INT NOT NULL DEFAULT 1 AFTER group_key,
+  ADD COLUMN open_group_key VARCHAR(120) AS (IF(is_read = 0, group_key, NULL)) STORED,
+  ADD UNIQUE KEY uniq_notifications_open_group (recipient_user_id, open_group_key);
+
+ALTER TABLE notifications_archive
+  ADD COLUMN event_count INT NOT NULL DEFAULT 1 AFTER application_id;
@@ -0,0 +1,5 @@
+-- Notifications groupées : plus de lien vers une candidature particulière, le résumé ne doit pas
+-- disparaître avec elle (ON DELETE CASCADE) ; le contexte reste job_id (notification_digests.py)
+USE jobboard;
+
+UPDATE notifications SET application_id = NULL WHERE group_key IS NOT NULL;
@@ -0,0 +1,5 @@
+-- Purge : une tâche en échec attend next_attempt_at (attente exponentielle) avant d'être reprise (purge.py)
+USE jobboard;
+
+ALTER TABLE purge_jobs
+  ADD COLUMN next_attempt_at DATETIME NULL AFTER last_error;
@@ -0,0 +1,521 @@
+"""Pool de connexions MySQL et curseur instrumenté.
+
+Les connexions sont ouvertes à la demande (jamais à l'import) et rendues
+au pool après commit/rollback. Chaque curseur remis aux routes mesure le
+temps SQL, le nombre de requêtes et de lignes pour `observability`.
+
+`db.cursor(prepared=True)` exécute la requête comme instruction préparée
+côté serveur, préparée une fois par connexion du pool puis réutilisée
+(cache LRU de `DB_STATEMENT_CACHE_SIZE` instructions par connexion,
+0 = désactivé : requête texte ordinaire).
+"""
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import mysql.connector
+from mysql.connector import Error, errorcode
+from mysql.connector.constants import ClientFlag
+from mysql.connector.cursor import MySQLCursorPrepared, MySQLCursorPreparedDict
+from mysql.connector.errors import PoolError, ProgrammingError
+
+try:
+    from mysql.connector.connection_cext import CMySQLConnection
+    from mysql.connector.cursor_cext import CMySQLCursorPrepared, CMySQLCursorPreparedDict
+except ImportError:
+    # Connecteur installé sans son extension C : seule l'implémentation Python existe
+    CMySQLConnection = None
+
+import observability
+import query_log
+
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "32"))
+
+prepared_statements = observability.REGISTRY.register(
+    observability.Counter(
+        "db_prepared_statements_total",
+        "Instructions préparées : réutilisées (hit), préparées, repréparées, évincées ou repli texte.",
+        ("result",),
+    )
+)
+
+
+def _env(prefix: str, key: str, default=None):
+    # Une réplique (DB_REPLICA_*) reprend les valeurs du primaire (DB_*) non renseignées
+    return os.getenv(f"{prefix}{key}", os.getenv(f"DB_{key}", default))
+
+
+def db_config_from_env(prefix: str = "DB_") -> dict:
+    return {
+        "host": _env(prefix, "HOST", "127.0.0.1"),
+        "port": int(_env(prefix, "PORT", "3306")),
+        "user": _env(prefix, "USER"),
+        "password": _env(prefix, "PASS"),
+        "database": _env(prefix, "NAME", "jobboard"),
+        "charset": "utf8mb4",
+        "autocommit": False,
+        "raise_on_warnings": True,
+        "connection_timeout": 5,
+        # Lots "a; b; c" en un aller-retour (POST /api/applications) : ne pas dépendre des drapeaux par défaut du connecteur
+        "client_flags": [ClientFlag.MULTI_STATEMENTS],
+    }
+
+
+class ConnectionPool:
+    """Pool borné : au plus `size` connexions prêtées, attente mesurée."""
+
+    def __init__(self, name: str, config: dict, size: int = 10, timeout: float = 5.0, ping_after: float = 30.0):
+        self.name = name
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._in_use = 0
+
+    def acquire(self, timeout: float | None = None):
+        """Prête une connexion ; `timeout=0` échoue tout de suite si le pool est épuisé."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=timeout):
+            observability.record_pool_wait(self.name, time.perf_counter() - started)
+            raise PoolError(f"no connection available in pool '{self.name}' after {timeout}s")
+        observability.record_pool_wait(self.name, time.perf_counter() - started)
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+    def _checkout(self):
+        try:
+            conn, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            conn = mysql.connector.connect(**self.config)
+            conn.ping(reconnect=True, attempts=1, delay=0)
+            return conn
+        if time.monotonic() - last_used > self.ping_after:
+            # Connexion restée inactive : on vérifie qu'elle n'a pas été coupée
+            conn.ping(reconnect=True, attempts=1, delay=0)
+        return conn
+
+    def release(self, conn, discard: bool = False):
+        with self._lock:
+            self._in_use -= 1
+        try:
+            if discard:
+                _statement_caches.pop(conn, None)
+                conn.close()
+            else:
+                self._idle.put((conn, time.monotonic()))
+        except Error:
+            pass
+        finally:
+            self._slots.release()
+
+    def prewarm(self, count: int) -> int:
+        """Ouvre jusqu'à `count` connexions et les laisse inactives dans le pool ; renvoie leur nombre."""
+        conns = []
+        try:
+            for _ in range(min(count, self.size)):
+                conns.append(self.acquire())
+        finally:
+            for conn in conns:
+                self.release(conn)
+        return len(conns)
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_use = self._in_use
+        return {"in_use": in_use, "idle": self._idle.qsize(), "size": self.size}
+
+
+def pool_from_env(name: str, prefix: str = "DB_") -> ConnectionPool:
+    return ConnectionPool(
+        name,
+        db_config_from_env(prefix),
+        size=int(_env(prefix, "POOL_SIZE", "10")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+        ping_after=float(os.getenv("DB_POOL_PING_AFTER", "30")),
+    )
+
+
+def replica_pool_from_env() -> ConnectionPool | None:
+    """Pool de la réplique de lecture, ou None si `DB_REPLICA_HOST` n'est pas défini."""
+    if not os.getenv("DB_REPLICA_HOST"):
+        return None
+    return pool_from_env("replica", prefix="DB_REPLICA_")
+
+
+# --------------------------------------------------------------------
+# Instructions préparées
+# --------------------------------------------------------------------
+class _ReuseWithoutReset:
+    """Réexécute une instruction déjà préparée sans COM_STMT_RESET.
+
+    mysql-connector envoie COM_STMT_RESET avant chaque exécution d'un
+    curseur préparé, soit un aller-retour de plus par requête. Le reset ne
+    sert qu'à vider des paramètres envoyés en morceaux (long data) ou un
+    résultat non lu : PreparedCursor lit toujours le résultat, et un
+    paramètre fichier repasse par le chemin du connecteur.
+    """
+
+    def execute(self, operation, params=None, map_results=False):
+        params = tuple(params or ())
+        if (
+            map_results
+            or operation is not self._executed
+            or not self._ready()
+            or any(hasattr(p, "read") for p in params)
+        ):
+            return super().execute(operation, params, map_results)
+        if self._param_count() != len(params):
+            raise ProgrammingError(errno=1210, msg="Incorrect number of arguments executing prepared statement")
+        self._execute_prepared(params)
+
+
+class _PyReusedPrepared(_ReuseWithoutReset):
+    def _ready(self) -> bool:
+        return self._prepared is not None
+
+    def _param_count(self) -> int:
+        return len(self._prepared["parameters"])
+
+    def _execute_prepared(self, params):
+        self._handle_result(
+            self._connection.cmd_stmt_execute(
+                self._prepared["statement_id"],
+                data=params,
+                parameters=self._prepared["parameters"],
+                read_timeout=self._read_timeout,
+                write_timeout=self._write_timeout,
+            )
+        )
+
+
+class ReusedPreparedCursor(_PyReusedPrepared, MySQLCursorPrepared):
+    pass
+
+
+class ReusedPreparedDictCursor(_PyReusedPrepared, MySQLCursorPreparedDict):
+    pass
+
+
+if CMySQLConnection is not None:
+
+    # Attributs internes de l'extension C (`_stmt`, `handle_unread_result`) : connecteur figé dans requirements.txt
+    class _CReusedPrepared(_ReuseWithoutReset):
+        def _ready(self) -> bool:
+            return self._stmt is not None
+
+        def _param_count(self) -> int:
+            return self._stmt.param_count
+
+        def _execute_prepared(self, params):
+            self._connection.handle_unread_result(prepared=True)
+            result = self._connection.cmd_stmt_execute(self._stmt, *params)
+            if result:
+                self._handle_result(result)
+
+    class CReusedPreparedCursor(_CReusedPrepared, CMySQLCursorPrepared):
+        pass
+
+    class CReusedPreparedDictCursor(_CReusedPrepared, CMySQLCursorPreparedDict):
+        pass
+
+
+def _prepared_cursor(conn, dictionary: bool):
+    if CMySQLConnection is not None and isinstance(conn, CMySQLConnection):
+        return conn.cursor(cursor_class=CReusedPreparedDictCursor if dictionary else CReusedPreparedCursor)
+    return conn.cursor(cursor_class=ReusedPreparedDictCursor if dictionary else ReusedPreparedCursor)
+
+
+# Erreurs après lesquelles l'instruction est repréparée une fois (reconnexion, DDL sur une table lue)
+_REPREPARE = {errorcode.ER_UNKNOWN_STMT_HANDLER, errorcode.ER_NEED_REPREPARE}
+
+
+class StatementCache:
+    """Curseurs préparés d'une connexion, par texte SQL ; LRU bornée à `size`.
+
+    Le total serveur (taille × connexions de tous les pools et workers) doit
+    rester sous `max_prepared_stmt_count` ; au-delà, le serveur refuse de
+    préparer et la requête repasse en texte.
+    """
+
+    def __init__(self, size: int = STATEMENT_CACHE_SIZE):
+        self.size = size
+        # Une reconnexion (ping du pool) change l'id de session et perd les instructions du serveur
+        self.connection_id = None
+        # (sql, dictionary) -> (sql, curseur) : le connecteur ne réutilise l'instruction
+        # que si on lui repasse le même objet chaîne que lors de la préparation
+        self._cursors: OrderedDict = OrderedDict()
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def execute(self, conn, operation: str, params, dictionary: bool):
+        """Exécute `operation` ; renvoie (curseur, possédé) — un curseur possédé est à fermer par l'appelant."""
+        session = conn.connection_id
+        if session != self.connection_id:
+            # Instructions mortes avec l'ancienne session : rien à fermer côté serveur
+            self._cursors.clear()
+            self.connection_id = session
+        key = (operation, dictionary)
+        for attempt in (0, 1):
+            entry = self._cursors.get(key)
+            if entry is not None:
+                self._cursors.move_to_end(key)
+                sql, cur = entry
+                try:
+                    cur.execute(sql, params)
+                except Error as e:
+                    self.drop(key)
+                    if attempt or e.errno not in _REPREPARE:
+                        raise
+                    prepared_statements.inc("reprepared")
+                    continue
+                prepared_statements.inc("hit")
+                return cur, False
+            while len(self._cursors) >= self.size:
+                _, (_, old) = self._cursors.popitem(last=False)
+                _close(old)
+                prepared_statements.inc("evicted")
+            cur = _prepared_cursor(conn, dictionary)
+            try:
+                cur.execute(operation, params)
+            except Error as e:
+                _close(cur)
+                if e.errno != errorcode.ER_MAX_PREPARED_STMT_COUNT_REACHED:
+                    raise
+                # Limite du serveur atteinte : requête texte, sans cache
+                prepared_statements.inc("fallback")
+                cur = conn.cursor(dictionary=dictionary)
+                cur.execute(operation, params)
+                return cur, True
+            prepared_statements.inc("prepared")
+            self._cursors[key] = (operation, cur)
+            return cur, False
+
+    def drop(self, key):
+        entry = self._cursors.pop(key, None)
+        if entry is not None:
+            _close(entry[1])
+
+    def clear(self):
+        for _, cur in self._cursors.values():
+            _close(cur)
+        self._cursors.clear()
+
+
+def _close(cur):
+    try:
+        cur.close()
+    except Error:
+        pass
+
+
+# Cache par connexion brute ; disparaît avec elle
+_statement_caches: "weakref.WeakKeyDictionary[object, StatementCache]" = weakref.WeakKeyDictionary()
+
+
+def statement_cache(conn) -> StatementCache:
+    cache = _statement_caches.get(conn)
+    if cache is None:
+        cache = _statement_caches[conn] = StatementCache()
+    return cache
+
+
+class PreparedCursor:
+    """Curseur de `cursor(prepared=True)` : l'instruction vient du cache de la connexion et y reste après `close`."""
+
+    def __init__(self, conn, dictionary: bool):
+        self._conn = conn
+        self._dictionary = dictionary
+        self._cur = None
+        self._owned = False
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+    @property
+    def with_rows(self) -> bool:
+        return self._cur is not None and self._cur.with_rows
+
+    @property
+    def rowcount(self) -> int:
+        return -1 if self._cur is None else self._cur.rowcount
+
+    def execute(self, operation, params=None):
+        self._release()
+        self._cur, self._owned = statement_cache(self._conn).execute(
+            self._conn, operation, tuple(params or ()), self._dictionary
+        )
+
+    def executemany(self, operation, seq_params):
+        # Pas de cache pour les lots : curseur texte ordinaire, fermé avec celui-ci
+        self._release()
+        self._cur, self._owned = self._conn.cursor(dictionary=self._dictionary), True
+        return self._cur.executemany(operation, seq_params)
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchmany(self, size: int = 1):
+        return self._cur.fetchmany(size)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def _release(self):
+        cur, self._cur = self._cur, None
+        if cur is None:
+            return
+        if self._owned:
+            cur.close()
+            return
+        try:
+            # Lignes non lues : à consommer avant toute autre commande sur la connexion
+            if cur.with_rows:
+                cur.fetchall()
+        except Error:
+            statement_cache(self._conn).clear()
+
+    def close(self):
+        self._release()
+
+
+# --------------------------------------------------------------------
+# Connexion / curseur instrumentés
+# --------------------------------------------------------------------
+class InstrumentedCursor:
+    """Enveloppe un curseur mysql-connector et compte temps, requêtes et lignes.
+
+    Avec `QUERY_LOG_ROWS_EXAMINED=1`, les lignes examinées sont relevées sur
+    `conn` à la fermeture du curseur ou avant sa requête suivante : tous les
+    résultats (lot multi-requêtes compris) sont lus à ce moment-là.
+    """
+
+    __slots__ = ("_cur", "_conn", "_entry", "_unexamined")
+
+    def __init__(self, cur, conn=None):
+        self._cur = cur
+        self._conn = conn
+        self._entry = None
+        self._unexamined = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        self._cur.close()
+        self._examine()
+
+    def _examine(self):
+        if self._unexamined:
+            self._unexamined = False
+            if query_log.ROWS_EXAMINED:
+                query_log.examine(self._conn, self._entry)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def execute(self, operation, params=None, **kwargs):
+        self._examine()
+        started = time.perf_counter()
+        try:
+            return self._cur.execute(operation, params, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            rows = 0 if self._cur.with_rows else max(self._cur.rowcount, 0)
+            observability.record_query(elapsed, rows)
+            self._entry = query_log.record(operation, elapsed, rows)
+            self._unexamined = self._conn is not None
+
+    def executemany(self, operation, seq_params):
+        self._examine()
+        started = time.perf_counter()
+        try:
+            return self._cur.executemany(operation, seq_params)
+        finally:
+            elapsed = time.perf_counter() - started
+            rows = max(self._cur.rowcount, 0)
+            observability.record_query(elapsed, rows)
+            self._entry = query_log.record(operation, elapsed, rows)
+            self._unexamined = self._conn is not None
+
+    def _fetched(self, started: float, rows: int):
+        elapsed = time.perf_counter() - started
+        observability.record_db_time(elapsed, rows)
+        if self._entry is not None:
+            self._entry.seconds += elapsed
+            self._entry.rows += rows
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cur.fetchone()
+        self._fetched(started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size: int = 1):
+        started = time.perf_counter()
+        rows = self._cur.fetchmany(size)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cur.fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+
+class InstrumentedConnection:
+    """Connexion remise aux routes par `get_db` : mêmes méthodes, curseurs instrumentés."""
+
+    __slots__ = ("_conn", "after_commit")
+
+    def __init__(self, conn):
+        self._conn = conn
+        # Rappels exécutés par la session une fois la transaction validée (cf. invalidation.publish)
+        self.after_commit: list = []
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    @property
+    def raw(self):
+        return self._conn
+
+    def cursor(self, *args, prepared: bool = False, **kwargs):
+        if prepared and STATEMENT_CACHE_SIZE > 0:
+            return InstrumentedCursor(PreparedCursor(self._conn, kwargs.get("dictionary", False)), self._conn)
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._conn)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            self._conn.commit()
+        finally:
+            observability.record_db_time(time.perf_counter() - started)
+
+    def rollback(self):
+        started = time.perf_counter()
+        try:
+            self._conn.rollback()
+        finally:
+            observability.record_db_time(time.perf_counter() - started)
@@ -0,0 +1,154 @@
+"""Routage lecture réplique / écriture primaire avec lecture de ses propres écritures.
+
+Après une écriture réussie (méthode non sûre, statut < 400), `get_db` lit
+`@@GLOBAL.gtid_executed` sur le primaire juste après le commit et la
+réponse emporte ce jeu de GTID dans le cookie `jb_gtid` pendant
+`DB_STICKY_SECONDS`. Les lectures suivantes de ce client, quel que soit le
+worker qui les reçoit, attendent sur la réplique que ces transactions soient
+appliquées (`WAIT_FOR_EXECUTED_GTID_SET`, au plus `DB_GTID_WAIT_SECONDS`),
+sinon elles passent sur le primaire.
+
+Sans GTID côté serveur (`gtid_mode=OFF`), le cookie `jb_primary_until`
+épingle le client au primaire pendant la même durée.
+
+Tout l'état vit dans les cookies du client : un client qui ne les renvoie
+pas (script sans jar de cookies, `fetch` cross-origin sans
+`credentials: "include"`) lit la réplique, avec son retard éventuel.
+"""
+import os
+import time
+from contextvars import ContextVar
+from urllib.parse import quote, unquote
+
+from mysql.connector import Error
+from starlette.datastructures import MutableHeaders
+
+STICKY_SECONDS = float(os.getenv("DB_STICKY_SECONDS", "5"))
+GTID_WAIT_SECONDS = float(os.getenv("DB_GTID_WAIT_SECONDS", "1"))
+COOKIE_NAME = "jb_primary_until"
+GTID_COOKIE_NAME = "jb_gtid"
+# Au-delà, le jeu de GTID ne tient plus raisonnablement dans un cookie : épinglage au primaire
+MAX_GTID_LENGTH = 2048
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class RequestRouting:
+    """État de routage d'une requête HTTP ; `written_gtid` est rempli par `get_db` après le commit."""
+
+    __slots__ = ("pinned", "gtid", "is_write", "written_gtid")
+
+    def __init__(self, pinned: bool = False, gtid: str | None = None, is_write: bool = False):
+        self.pinned = pinned
+        self.gtid = gtid
+        self.is_write = is_write
+        self.written_gtid: str | None = None
+
+
+_routing: ContextVar[RequestRouting | None] = ContextVar("db_routing", default=None)
+
+
+def pinned_to_primary() -> bool:
+    routing = _routing.get()
+    return routing is not None and routing.pinned
+
+
+def read_after_gtid() -> str | None:
+    """Jeu de GTID que la réplique doit avoir appliqué avant de servir ce client."""
+    routing = _routing.get()
+    return routing.gtid if routing is not None else None
+
+
+def reads_own_writes() -> bool:
+    """Le client vient d'écrire : sa lecture ne peut pas être partagée avec d'autres."""
+    routing = _routing.get()
+    return routing is not None and (routing.pinned or routing.gtid is not None)
+
+
+def capture_write_gtid(db):
+    """Après le commit d'une écriture : mémorise les GTID exécutés par le primaire pour la réponse."""
+    routing = _routing.get()
+    if routing is None or not routing.is_write:
+        return
+    try:
+        with db.cursor() as cur:
+            cur.execute("SELECT @@GLOBAL.gtid_executed")
+            (gtid,) = cur.fetchone()
+    except Error:
+        return
+    # Vide si gtid_mode=OFF ; le serveur sépare les UUID par ",\n"
+    routing.written_gtid = "".join((gtid or "").split()) or None
+
+
+def wait_for_gtid(conn, gtid: str) -> bool:
+    """Attend que la réplique ait appliqué `gtid` ; False au bout de `GTID_WAIT_SECONDS` ou en cas d'erreur."""
+    try:
+        # Sans table lue, pas encore de vue de lecture InnoDB : la requête suivante verra ces transactions
+        with conn.cursor() as cur:
+            cur.execute("SELECT WAIT_FOR_EXECUTED_GTID_SET(%s, %s)", (gtid, GTID_WAIT_SECONDS))
+            (timed_out,) = cur.fetchone()
+    except Error:
+        return False
+    return timed_out == 0
+
+
+def _cookies(scope) -> dict:
+    cookies = {}
+    for name, value in scope.get("headers", ()):
+        if name != b"cookie":
+            continue
+        for part in value.decode("latin-1").split(";"):
+            key, _, raw = part.strip().partition("=")
+            cookies[key] = raw
+    return cookies
+
+
+def _routing_from(scope, now: float) -> RequestRouting:
+    cookies = _cookies(scope)
+    try:
+        pinned = float(cookies.get(COOKIE_NAME, "0")) > now
+    except ValueError:
+        pinned = False
+    gtid = unquote(cookies.get(GTID_COOKIE_NAME, "")) or None
+    return RequestRouting(pinned, gtid, scope["method"] not in SAFE_METHODS)
+
+
+def _set_cookie(message, name: str, value: str):
+    MutableHeaders(scope=message).append(
+        "Set-Cookie",
+        f"{name}={value}; Max-Age={int(STICKY_SECONDS)}; Path=/; HttpOnly; SameSite=Lax",
+    )
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        routing = _routing_from(scope, time.time())
+        token = _routing.set(routing)
+        try:
+            if not routing.is_write:
+                await self.app(scope, receive, send)
+                return
+            # Le commit de get_db (sortie de dépendance) suit l'envoi de la réponse :
+            # on la retient jusque-là pour y joindre les GTID de l'écriture
+            messages = []
+
+            async def hold(message):
+                messages.append(message)
+
+            await self.app(scope, receive, hold)
+            for message in messages:
+                if message["type"] == "http.response.start" and message["status"] < 400:
+                    gtid = routing.written_gtid
+                    if gtid and len(gtid) <= MAX_GTID_LENGTH:
+                        _set_cookie(message, GTID_COOKIE_NAME, quote(gtid, safe=""))
+                    else:
+                        _set_cookie(message, COOKIE_NAME, f"{time.time() + STICKY_SECONDS:.0f}")
+                await send(message)
+        finally:
+            _routing.reset(token)
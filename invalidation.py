@@ -0,0 +1,179 @@
+"""Bus d'invalidation de caches entre workers, adossé à une table MySQL.
+
+Les écritures publient un événement typé (`publish(db, COMPANY_CHANGED, id)`)
+dans la table `cache_invalidations`, dans la même transaction que
+l'écriture elle-même : pas d'événement pour une écriture annulée. Le worker
+qui écrit s'applique l'événement juste après le commit de la session. Chaque
+worker lit la table toutes les `INVALIDATION_POLL_MS` et applique les
+événements aux caches abonnés, ce qui borne le délai de propagation.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+
+from mysql.connector import Error
+
+COMPANY_CHANGED = "company:changed"
+COMPANY_DELETED = "company:deleted"
+JOB_CHANGED = "job:changed"
+JOB_DELETED = "job:deleted"
+PROFILE_CHANGED = "profile:changed"
+PROFILE_DELETED = "profile:deleted"
+USER_CHANGED = "user:changed"
+USER_DELETED = "user:deleted"
+APPLICATION_CHANGED = "application:changed"
+
+POLL_SECONDS = float(os.getenv("INVALIDATION_POLL_MS", "500")) / 1000
+RETENTION_MINUTES = int(os.getenv("INVALIDATION_RETENTION_MIN", "60"))
+# Les AUTO_INCREMENT peuvent être validés dans le désordre : on relit une fenêtre derrière le curseur
+LOOKBACK_IDS = 500
+
+INSERT_SQL = "INSERT INTO cache_invalidations (kind, entity_id) VALUES (%s, %s)"
+
+log = logging.getLogger("jobboard.invalidation")
+
+
+@dataclass(frozen=True)
+class Invalidation:
+    kind: str
+    entity_id: int | None = None
+
+
+class InvalidationBus:
+    def __init__(self):
+        self._handlers: dict[str, list] = {}
+        self._last_id = 0
+        self._seen: deque = deque(maxlen=5000)
+        self._seen_set: set = set()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, kind: str, handler):
+        """Abonne `handler(Invalidation)` à un type d'événement (`"*"` pour tous)."""
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def dispatch(self, event: Invalidation):
+        for handler in self._handlers.get(event.kind, []) + self._handlers.get("*", []):
+            try:
+                handler(event)
+            except Exception:
+                log.exception("invalidation handler failed for %s", event)
+
+    def publish(self, db, kind: str, entity_id: int | None = None):
+        with db.cursor() as cur:
+            cur.execute(INSERT_SQL, (kind, entity_id))
+        self.published(db, Invalidation(kind, entity_id))
+
+    def published(self, db, event: Invalidation):
+        """Applique `event` localement après le commit de la session de `db`, les autres workers au prochain poll."""
+        after_commit = getattr(db, "after_commit", None)
+        if after_commit is None:
+            # Connexion brute (scripts) : l'appelant valide lui-même
+            self.dispatch(event)
+        else:
+            after_commit.append(partial(self.dispatch, event))
+
+    # ----------------------------------------------------------------
+    # Poller
+    # ----------------------------------------------------------------
+    def start(self, pool):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(pool,), name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, pool):
+        last_cleanup = time.monotonic()
+        started = False
+        while not self._stop.is_set():
+            try:
+                conn = pool.acquire()
+            except Error as e:
+                log.warning("invalidation poll: no connection (%s)", e)
+                self._stop.wait(POLL_SECONDS)
+                continue
+            broken = False
+            try:
+                if not started:
+                    self._last_id = self._max_id(conn)
+                    started = True
+                self.poll(conn)
+                if time.monotonic() - last_cleanup > 60:
+                    self._cleanup(conn)
+                    last_cleanup = time.monotonic()
+            except Exception as e:
+                broken = True
+                log.warning("invalidation poll failed: %s", e)
+            finally:
+                pool.release(conn, discard=broken)
+            self._stop.wait(POLL_SECONDS)
+
+    def _max_id(self, conn) -> int:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM cache_invalidations")
+            (max_id,) = cur.fetchone()
+        conn.commit()
+        return int(max_id)
+
+    def poll(self, conn) -> int:
+        """Applique les événements publiés depuis le dernier passage ; renvoie leur nombre."""
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT id, kind, entity_id
+                FROM cache_invalidations
+                WHERE id > %s
+                ORDER BY id
+                LIMIT 1000
+                """,
+                (max(0, self._last_id - LOOKBACK_IDS),),
+            )
+            rows = cur.fetchall()
+        # Nouvel instantané à chaque passage (REPEATABLE READ)
+        conn.commit()
+        applied = 0
+        for event_id, kind, entity_id in rows:
+            if event_id in self._seen_set:
+                continue
+            self._remember(event_id)
+            self._last_id = max(self._last_id, event_id)
+            self.dispatch(Invalidation(kind, entity_id))
+            applied += 1
+        return applied
+
+    def _remember(self, event_id: int):
+        if len(self._seen) == self._seen.maxlen:
+            self._seen_set.discard(self._seen[0])
+        self._seen.append(event_id)
+        self._seen_set.add(event_id)
+
+    def _cleanup(self, conn):
+        with conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM cache_invalidations WHERE created_at < NOW() - INTERVAL %s MINUTE LIMIT 5000",
+                (RETENTION_MINUTES,),
+            )
+        conn.commit()
+
+
+BUS = InvalidationBus()
+
+
+def publish(db, kind: str, entity_id: int | None = None):
+    BUS.publish(db, kind, entity_id)
+
+
+def published(db, kind: str, entity_id: int | None = None):
+    """Événement déjà inséré par l'appelant (lot SQL groupé) : appliqué localement après le commit."""
+    BUS.published(db, Invalidation(kind, entity_id))
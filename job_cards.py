@@ -0,0 +1,102 @@
+"""Projection `job_cards` : les champs d'une carte d'offre, entreprise comprise.
+
+Les listes (offres, candidatures d'un candidat, tableau de bord, stats
+admin) lisent cette table étroite au lieu de joindre `jobs` et
+`companies` à chaque appel. Elle ne contient que les offres visibles :
+la suppression (logique) d'une entreprise ou d'un compte retire ses
+cartes, la suppression d'une offre les retire par cascade.
+
+Tenue à jour dans la transaction des écritures de l'API : `sync_jobs`
+après création/modification d'offre, `sync_company` (une seule requête
+pour toutes les offres) quand le nom ou la bannière d'une entreprise
+change.
+"""
+
+# Champs de la carte -> colonne de job_cards (l'API expose `id`, la table `job_id`)
+FIELDS = {
+    "id": "jc.job_id",
+    "company_id": "jc.company_id",
+    "title": "jc.title",
+    "short_desc": "jc.short_desc",
+    "location": "jc.location",
+    "contract_type": "jc.contract_type",
+    "work_mode": "jc.work_mode",
+    "created_at": "jc.created_at",
+    "company_name": "jc.company_name",
+    "company_banner_url": "jc.company_banner_url",
+}
+
+# Même sélection que la migration 005 (remplissage initial)
+_SOURCE = """
+    SELECT j.id AS job_id, j.company_id, j.title, j.short_desc, j.location,
+           j.contract_type, j.work_mode, j.created_at,
+           c.name AS company_name, c.banner_url AS company_banner_url
+    FROM jobs j
+    JOIN companies c ON c.id = j.company_id
+    WHERE c.deleted_at IS NULL AND {where}
+"""
+
+_UPSERT = """
+    INSERT INTO job_cards
+        (job_id, company_id, title, short_desc, location, contract_type, work_mode,
+         created_at, company_name, company_banner_url)
+    SELECT * FROM ({source}) AS s
+    ON DUPLICATE KEY UPDATE
+        company_id = s.company_id,
+        title = s.title,
+        short_desc = s.short_desc,
+        location = s.location,
+        contract_type = s.contract_type,
+        work_mode = s.work_mode,
+        created_at = s.created_at,
+        company_name = s.company_name,
+        company_banner_url = s.company_banner_url
+"""
+
+
+def sync_jobs(db, job_ids):
+    """(Re)construit les cartes des offres données à partir de `jobs`/`companies`."""
+    job_ids = [i for i in dict.fromkeys(job_ids) if i is not None]
+    if not job_ids:
+        return
+    in_sql = ",".join(["%s"] * len(job_ids))
+    with db.cursor() as cur:
+        cur.execute(_UPSERT.format(source=_SOURCE.format(where=f"j.id IN ({in_sql})")), job_ids)
+        # Offre déplacée vers une entreprise supprimée : plus de carte
+        cur.execute(
+            f"""
+            DELETE jc FROM job_cards jc
+            JOIN jobs j ON j.id = jc.job_id
+            JOIN companies c ON c.id = j.company_id
+            WHERE jc.job_id IN ({in_sql}) AND c.deleted_at IS NOT NULL
+            """,
+            job_ids,
+        )
+
+
+def sync_company(db, company_id: int) -> int:
+    """Recopie nom et bannière de l'entreprise sur toutes ses cartes ; renvoie le nombre de cartes modifiées."""
+    with db.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE job_cards jc
+            JOIN companies c ON c.id = jc.company_id
+            SET jc.company_name = c.name, jc.company_banner_url = c.banner_url
+            WHERE jc.company_id = %s
+            """,
+            (company_id,),
+        )
+        return cur.rowcount
+
+
+def drop_company(db, company_id: int):
+    with db.cursor() as cur:
+        cur.execute("DELETE FROM job_cards WHERE company_id = %s", (company_id,))
+
+
+def drop_owner(db, user_id: int):
+    with db.cursor() as cur:
+        cur.execute(
+            "DELETE FROM job_cards WHERE company_id IN (SELECT id FROM companies WHERE created_by = %s)",
+            (user_id,),
+        )
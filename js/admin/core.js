@@ -38,7 +38,7 @@ export async function api(path, { method = "GET", body = null } = {}) {
     payload = JSON.stringify(body);
   }
 
-  const res = await fetch(`${API}${path}`, { method, headers, body: payload });
+  const res = await fetch(`${API}${path}`, { credentials: "include", method, headers, body: payload });
   if (res.status === 401 || res.status === 403) {
     localStorage.removeItem(TOKEN_KEY);
     localStorage.removeItem(ROLE_KEY);
@@ -11,6 +11,8 @@ function renderStats(stats) {
     ["total_companies", "Entreprises"],
     ["total_jobs", "Offres"],
     ["total_applications", "Candidatures"],
+    ["pending_deleted_users", "Comptes en cours de suppression"],
+    ["pending_deleted_companies", "Entreprises en cours de suppression"],
   ];
   const tpl = $("#adminStatTpl");
   mapping.forEach(([key, label]) => {
@@ -41,6 +41,7 @@ async function fetchApplicants() {
 
   try {
     const res = await fetch(`${API}/api/company/applications`, {
+      credentials: "include",
       headers: authHeaders(),
     });
 
@@ -71,6 +72,7 @@ async function fetchApplicants() {
 async function match(applicationId) {
   try {
     const res = await fetch(`${API}/api/company/applications/${applicationId}/match`, {
+      credentials: "include",
       method: "POST",
       headers: authHeaders(),
     });
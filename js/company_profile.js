@@ -51,6 +51,7 @@ function setStatus(logged){
 
 async function api(path, {method="GET", body=null, headers={}} = {}) {
   const res = await fetch(`${API}${path}`, {
+    credentials: "include",
     method,
     headers: { "Content-Type": "application/json", ...headers },
     body: body ? JSON.stringify(body) : null
@@ -146,7 +147,7 @@ async function uploadBanner() {
   if(!f) return alert("Choisis une image.");
   const fd = new FormData(); fd.append("file", f);
   try {
-    const res = await fetch(`${API}/upload/image`, { method:"POST", headers:authHeader(), body:fd });
+    const res = await fetch(`${API}/upload/image`, { credentials: "include", method:"POST", headers:authHeader(), body:fd });
     const data = await res.json();
     if (!res.ok) throw data;
 
@@ -18,7 +18,7 @@ async function fetchSuggestions(query) {
   }
 
   try {
-    const res = await fetch(`${API_BASE}/api/jobs?q=${encodeURIComponent(query)}&page_size=5`);
+    const res = await fetch(`${API_BASE}/api/jobs?q=${encodeURIComponent(query)}&page_size=5`, { credentials: "include" });
     const data = await res.json();
 
     suggestionBox.innerHTML = "";
@@ -50,7 +50,7 @@ async function filterJobs() {
 
   jobsSection.innerHTML = "<p>Chargement...</p>";
   try {
-    const res = await fetch(`${API_BASE}/api/jobs?q=${encodeURIComponent(query)}`);
+    const res = await fetch(`${API_BASE}/api/jobs?q=${encodeURIComponent(query)}`, { credentials: "include" });
     const data = await res.json();
 
     jobsSection.innerHTML = "";
@@ -80,6 +80,7 @@ export async function hydrateAppliedJobs() {
 
   try {
     const res = await fetch(`${state.apiBase}/api/me/applications`, {
+      credentials: "include",
       headers: { Authorization: `Bearer ${getToken()}` },
     });
     if (!res.ok) throw new Error(`HTTP ${res.status}`);
@@ -132,6 +133,7 @@ export async function applyToJob(jobId) {
 
   try {
     const res = await fetch(`${state.apiBase}/api/applications`, {
+      credentials: "include",
       method: "POST",
       headers: {
         "Content-Type": "application/json",
@@ -18,7 +18,7 @@
   async function request(path, { method = "GET", body = null, token = null, baseUrl = DEFAULT_BASE, isJSON = true } = {}) {
     const headers = buildHeaders(token, {}, isJSON);
     const payload = body && isJSON ? JSON.stringify(body) : body;
-    const res = await fetch(`${baseUrl}${path}`, { method, headers, body: payload });
+    const res = await fetch(`${baseUrl}${path}`, { credentials: "include", method, headers, body: payload });
     let data = {};
     try {
       // Certaines routes (DELETE) renvoient 204 → pas de JSON
@@ -117,7 +117,7 @@ async function api(path, { method = "GET", body = null, auth = false, isJSON = t
   const headers = {};
   if (isJSON) headers["Content-Type"] = "application/json";
   if (auth && token()) headers["Authorization"] = `Bearer ${token()}`;
-  const res = await fetch(`${API}${path}`, { method, headers, body: body && isJSON ? JSON.stringify(body) : body });
+  const res = await fetch(`${API}${path}`, { credentials: "include", method, headers, body: body && isJSON ? JSON.stringify(body) : body });
   const data = await res.json().catch(() => ({}));
   if (!res.ok) throw data;
   return data;
@@ -1,6 +1,14 @@
 const API_BASE = "http://127.0.0.1:8000";
 const grid = document.querySelector(".entreprises");
 const companiesById = new Map();
+const PAGE_SIZE = 24;
+let nextCursor = null;
+
+const moreCompanies = document.createElement("button");
+moreCompanies.className = "companies-more";
+moreCompanies.textContent = "Voir plus d'entreprises";
+moreCompanies.style.display = "none";
+grid.after(moreCompanies);
 
 const companyPopup = document.getElementById("companyPopup");
 const pName = document.getElementById("companyPopupName");
@@ -31,6 +39,7 @@ function companyToCard(c) {
         <div class="carte-contenu">
             <h3>${esc(c.name || "")}</h3>
             <p class="entreprise">${esc(c.hq_city || "")}</p>
+            <p class="offres-count">${esc(c.open_jobs ?? 0)} offre(s) · ${esc(c.applications ?? 0)} candidature(s)</p>
             <p class="description">${esc(c.description) || ""}</p>
             <a class="link" href="${esc(c.website)}">site web</a> 
             <button class="company-more" data-id="${esc(c.id)}">En savoir plus</button>
@@ -40,20 +49,35 @@ function companyToCard(c) {
     `
 }
 
-async function loadCompanies() {
-    const res = await fetch(`${API_BASE}/api/companies`);
+async function loadCompanies(cursor = null) {
+    const qs = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (cursor) qs.set("cursor", cursor);
+    const res = await fetch(`${API_BASE}/api/companies?${qs}`, { credentials: "include" });
     if (!res.ok) throw new Error (await res.text());
     const data = await res.json();
     for (const company of data.items) {
         companiesById.set(String(company.id), company);
     }
-    grid.innerHTML = data.items.map(companyToCard).join("") || "<p>Aucune entreprise</p>";
+    const cards = data.items.map(companyToCard).join("");
+    if (cursor) {
+        grid.insertAdjacentHTML("beforeend", cards);
+    } else {
+        grid.innerHTML = cards || "<p>Aucune entreprise</p>";
+    }
+    nextCursor = data.next_cursor;
+    moreCompanies.style.display = nextCursor ? "" : "none";
 }
 
 loadCompanies().catch(err => {
     grid.innerHTML = `<p style="color:red">Erreur chargement : ${esc(err.message)}</p>`;
 });
 
+moreCompanies.addEventListener("click", () => {
+    loadCompanies(nextCursor).catch(err => {
+        grid.insertAdjacentHTML("beforeend", `<p style="color:red">Erreur chargement : ${esc(err.message)}</p>`);
+    });
+});
+
 function openCompanyPopup(id) {
     const company = companiesById.get(String(id));
     if (!company || !companyPopup) return ;
@@ -107,7 +107,7 @@ function renderPagination() {
 
 async function loadJobs(page = 1, pageSize = PAGE_SIZE, q = "") {
     const qs = new URLSearchParams({page, page_size: pageSize, q});
-    const res = await fetch(`${API_BASE}/api/jobs?${qs}`);
+    const res = await fetch(`${API_BASE}/api/jobs?${qs}`, { credentials: "include" });
     if (!res.ok) throw new Error(await res.text());
     const data = await res.json();
     if (!data.items.length && page > 1 && !data.total) {
@@ -152,7 +152,7 @@ function nl2p(text="") {
 
 async function openJobPopup(jobId) {
     try {
-        const res = await fetch(`${API_BASE}/api/jobs/${jobId}`);
+        const res = await fetch(`${API_BASE}/api/jobs/${jobId}`, { credentials: "include" });
         if(!res.ok) throw new Error(await res.text());
         const j = await res.json();
 
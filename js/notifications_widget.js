@@ -51,6 +51,7 @@ async function ensureNotifications(force = false) {
   if (!force && Date.now() - lastFetched < 20_000 && cachedNotifications.length) return;
   try {
     const res = await fetch(`${API}/api/me/notifications`, {
+      credentials: "include",
       headers: { Authorization: `Bearer ${localStorage.getItem(TOKEN_KEY)}` },
     });
     if (!res.ok) throw new Error(`HTTP ${res.status}`);
@@ -122,6 +123,7 @@ function renderItem(item) {
   const unreadClass = item.is_read ? "" : "unread";
   const time = formatDate(item.created_at);
   const message = escapeHtml(item.message || "Nouvelle notification");
+  const countBadge = item.count > 1 ? `<span class="notif-count">${Number(item.count)}</span>` : "";
   const canContact = item.type === "application:matched" && item.contact_email;
   let contactBlock = "";
   if (canContact) {
@@ -133,7 +135,7 @@ function renderItem(item) {
   }
   return `
     <article class="notif-item ${unreadClass}" data-id="${item.id}">
-      <div class="notif-message">${message}</div>
+      <div class="notif-message">${countBadge}${message}</div>
       <time>${escapeHtml(time)}</time>
       ${contactBlock}
     </article>
@@ -154,6 +156,7 @@ async function markAllRead(callApi = false) {
   if (callApi) {
     try {
       await fetch(`${API}/api/me/notifications/read-all`, {
+        credentials: "include",
         method: "POST",
         headers: { Authorization: `Bearer ${localStorage.getItem(TOKEN_KEY)}` },
       });
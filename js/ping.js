@@ -6,6 +6,7 @@ pingBtn.addEventListener("click", async () => {
   out.textContent = "Appel en cours...";
   try {
     const res = await fetch(`${API_BASE}/health`, {
+      credentials: "include",
       headers: { "Content-Type": "application/json" }
     });
     const data = await res.json();
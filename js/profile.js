@@ -29,6 +29,7 @@ function updateHeaderAvatar(relUrl) {
 
 async function api(path, { method = "GET", body = null, headers = {} } = {}) {
   const res = await fetch(`${API}${path}`, {
+    credentials: "include",
     method,
     headers: { "Content-Type": "application/json", ...headers },
     body: body ? JSON.stringify(body) : null,
@@ -69,27 +70,20 @@ function fill(p) {
 let profileId = null;
 let me = null;
 
-async function getMe() { me = await api("/auth/me", { headers: authHeader() }); return me; }
-
-async function findMyProfileId() {
-  let page = 1;
-  const pageSize = 100;
-  while (true) {
-    const list = await api(`/api/profiles?page=${page}&page_size=${pageSize}`, { headers: authHeader() });
-    for (const p of list.items || []) if (p.user_id === me.id) return p.id;
-    if (page * pageSize >= (list.total || 0)) break;
-    page++;
-  }
-  return null;
+async function loadDashboard() {
+  // Utilisateur + profil (par user_id) en un seul appel
+  const dash = await api("/api/me/dashboard", { headers: authHeader() });
+  me = dash.user;
+  return dash;
 }
 
 async function loadProfile() {
   if (!token()) { setGuard("Tu n’es pas connecté. Retourne à l’accueil pour te connecter."); return; }
   setGuard("Chargement du profil…");
-  const meData = await getMe();
+  const dash = await loadDashboard();
+  const meData = dash.user;
 
-  profileId = await findMyProfileId();
-  if (!profileId) {
+  if (!dash.profile) {
     const email = meData?.email || "user@example.com";
     const guess = email.split("@")[0] || "User";
     const defaults = {
@@ -106,9 +100,8 @@ async function loadProfile() {
     return;
   }
 
-  const list = await api(`/api/profiles?page=1&page_size=1000`, { headers: authHeader() });
-  const mine = (list.items || []).find((p) => p.id === profileId);
-  if (mine) fill(mine);
+  profileId = dash.profile.id;
+  fill(dash.profile);
 }
 
 async function saveProfile() {
@@ -151,7 +144,7 @@ async function uploadAvatar() {
   btn.disabled = true;
 
   try {
-    const res = await fetch(`${API}/upload/image`, { method: "POST", headers: { ...authHeader() }, body: fd });
+    const res = await fetch(`${API}/upload/image`, { credentials: "include", method: "POST", headers: { ...authHeader() }, body: fd });
     let data = {}; try { data = await res.json(); } catch {}
     if (!res.ok) {
       const msg = data?.detail || `Upload échoué (HTTP ${res.status}).` + (res.status === 413 ? " Image trop lourde." : "");
@@ -173,6 +166,69 @@ async function uploadAvatar() {
   }
 }
 
+// CV : envoi par morceaux reprenable (session mémorisée par fichier, seuls les morceaux manquants repartent)
+const CV_SESSION_PREFIX = "jb_cv_upload:";
+
+async function sha256Hex(buffer) {
+  const digest = await crypto.subtle.digest("SHA-256", buffer);
+  return [...new Uint8Array(digest)].map(b => b.toString(16).padStart(2, "0")).join("");
+}
+
+async function cvSession(f) {
+  const key = `${CV_SESSION_PREFIX}${f.name}:${f.size}:${f.lastModified}`;
+  const saved = localStorage.getItem(key);
+  if (saved) {
+    const res = await fetch(`${API}/upload/cv/sessions/${saved}`, { credentials: "include", headers: authHeader() });
+    if (res.ok) return { key, session: await res.json() };
+    localStorage.removeItem(key);
+  }
+  const session = await api("/upload/cv/sessions", { method: "POST", headers: authHeader(), body: { size: f.size } });
+  localStorage.setItem(key, session.id);
+  return { key, session };
+}
+
+async function uploadCv() {
+  const f = $("cvFile").files[0];
+  if (!f) return alert("Choisis un fichier PDF.");
+  const btn = $("btnCvUpload");
+  btn.disabled = true;
+  try {
+    const { key, session } = await cvSession(f);
+    let done = session.received.length;
+    for (const index of session.missing) {
+      const start = index * session.chunk_size;
+      const end = Math.min(start + session.chunk_size, f.size);
+      const chunk = await f.slice(start, end).arrayBuffer();
+      const checksum = await sha256Hex(chunk);
+      for (let attempt = 1; ; attempt++) {
+        try {
+          const res = await fetch(`${API}/upload/cv/sessions/${session.id}`, {
+            credentials: "include",
+            method: "PUT",
+            headers: { ...authHeader(), "Content-Range": `bytes ${start}-${end - 1}/${f.size}`, "X-Chunk-Sha256": checksum },
+            body: chunk,
+          });
+          if (res.ok) break;
+          if (res.status < 500 || attempt >= 3) throw await res.json().catch(() => ({}));
+        } catch (e) {
+          if (attempt >= 3 || e?.detail) throw e;
+        }
+        await new Promise(r => setTimeout(r, 500 * attempt));
+      }
+      done += 1;
+      setMsg(`CV : ${Math.round((done / session.chunks) * 100)} %`, true);
+    }
+    const data = await api(`/upload/cv/sessions/${session.id}/finalize`, { method: "POST", headers: authHeader() });
+    localStorage.removeItem(key);
+    $("cv_url").value = data.url;
+    setMsg("CV téléversé ✅ — pense à enregistrer ton profil.", true);
+  } catch (e) {
+    setMsg(e?.detail || e?.message || "Téléversement interrompu : relance pour reprendre.");
+  } finally {
+    btn.disabled = false;
+  }
+}
+
 async function deleteProfile() {
   if (!profileId) {
     setMsg("Aucun profil à supprimer.", false); return;
@@ -198,6 +254,7 @@ async function deleteProfile() {
 document.addEventListener("DOMContentLoaded", async () => {
   $("btnSave").onclick = saveProfile;
   $("btnUpload").onclick = uploadAvatar;
+  $("btnCvUpload").onclick = uploadCv;
   $("btnBack").onclick = () => history.back();
   $("btnDelete").onclick = deleteProfile;
 
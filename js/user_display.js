@@ -53,7 +53,7 @@ async function loadProfiles(page = 1, pageSize = PAGE_SIZE, search = "", city =
     const qs = new URLSearchParams({page, page_size: pageSize});
     if (search) qs.set("q", search);
     if (city) qs.set("city", city);
-    const res = await fetch(`${API_BASE}/api/profiles?${qs}`);
+    const res = await fetch(`${API_BASE}/api/profiles?${qs}`, { credentials: "include" });
     if (!res.ok) throw new Error(await res.text());
     const data = await res.json();
     if (!data.items.length && page > 1 && !data.total) {
@@ -99,7 +99,7 @@ document.addEventListener("click", async (e) => {
     if (!btn) return;
     const id = btn.dataset.id;
     try {
-        const res = await fetch(`${API_BASE}/api/profiles/${id}`);
+        const res = await fetch(`${API_BASE}/api/profiles/${id}`, { credentials: "include" });
         const profile = await res.json();
         alert(`${profile.first_name} ${profile.last_name}\n\n` +
               `📍 ${profile.city || "Ville non renseignée"}\n\n` +
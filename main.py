@@ -1,17 +1,19 @@
 import os
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timedelta
-from pathlib import Path
 import secrets
 import imghdr
+import time
 
-from fastapi import FastAPI, Depends, HTTPException, status, Response, UploadFile, File
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, status, Response, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
 
 from dotenv import load_dotenv
-import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import InterfaceError, OperationalError
 
 from passlib.context import CryptContext
 from jose import jwt, JWTError
@@ -20,20 +22,71 @@ from admin_routes import create_admin_router
 from applications_routes import create_applications_router
 from company_applications_routes import create_company_applications_router
 from notifications_routes import create_notifications_router
+from saved_searches_routes import create_saved_searches_router
+from cv_uploads_routes import create_cv_uploads_router
+import observability
+import query_log
+import db_routing
+import invalidation
+import admission
+import singleflight
+import purge
+import retention
+import company_stats
+import job_cards
+import saved_searches
+from ownership import OWNERSHIP
+import static_assets
+import upload_storage
+import warmup
+from bulkheads import bulkhead_route, size_threadpool
+from db import InstrumentedConnection, pool_from_env, replica_pool_from_env
 
 # --------------------------------------------------------------------
 # Boot
 # --------------------------------------------------------------------
+_BOOT_STARTED = time.perf_counter()
 load_dotenv()
-app = FastAPI(title="Jobboard API")
+observability.configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Les threads de fond démarrent ici (par worker), jamais à l'import
+    warmup.WARMUP.record("boot", time.perf_counter() - _BOOT_STARTED)
+    size_threadpool()
+    invalidation.BUS.start(db_pool)
+    purge.WORKER.start(db_pool)
+    retention.WORKER.start(db_pool)
+    company_stats.REFRESHER.start(db_pool)
+    upload_storage.GC.start(db_pool)
+    warmup.WARMUP.start()
+    try:
+        yield
+    finally:
+        upload_storage.GC.stop()
+        company_stats.REFRESHER.stop()
+        retention.WORKER.stop()
+        purge.WORKER.stop()
+        invalidation.BUS.stop()
+
+app = FastAPI(title="Jobboard API", lifespan=lifespan)
 
 # --------------------------------------------------------------------
 # Static / Uploads
 # --------------------------------------------------------------------
-UPLOAD_DIR = Path("uploads")
+# Fichiers rangés en sous-répertoires ab/cd/ (upload_storage.py)
+UPLOAD_DIR = upload_storage.UPLOAD_DIR
 UPLOAD_DIR.mkdir(exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR), html=False), name="uploads")
 
+# Front compilé par `python static_assets.py` : noms empreintés en cache immuable, variantes .br/.gz négociées
+if static_assets.BUILD_DIR.is_dir():
+    app.mount(
+        static_assets.PREFIX,
+        static_assets.PrecompressedStaticFiles(directory=str(static_assets.BUILD_DIR), html=True),
+        name="site",
+    )
+
 ALLOWED_KINDS = {"jpeg", "png", "webp"}
 MAX_BYTES = 8 * 1024 * 1024  # 8MB
 
@@ -47,32 +100,74 @@ def _safe_image_name(prefix="img", ext="jpg") -> str:
 # --------------------------------------------------------------------
 # DB
 # --------------------------------------------------------------------
+db_pool = pool_from_env("primary")
+replica_pool = replica_pool_from_env()
+observability.REGISTRY.register(
+    observability.Gauge(
+        "db_pool_connections",
+        "Connexions du pool par état.",
+        ("pool", "state"),
+        lambda: [
+            ((pool.name, state), value)
+            for pool in (db_pool, replica_pool) if pool is not None
+            for state, value in pool.stats().items()
+        ],
+    )
+)
+
+def _db_session(pool, conn, track_gtid: bool = False):
+    db = InstrumentedConnection(conn)
+    broken = False
+    try:
+        yield db
+        db.commit()
+        for callback in db.after_commit:
+            callback()
+        if track_gtid:
+            db_routing.capture_write_gtid(db)
+    except Exception as e:
+        # Transaction annulée : rien à appliquer localement
+        db.after_commit.clear()
+        # Erreur de connexion, éventuellement enveloppée par la route (HTTPException ... from e)
+        broken = isinstance(e, (InterfaceError, OperationalError)) or isinstance(
+            e.__cause__, (InterfaceError, OperationalError)
+        )
+        try:
+            db.rollback()
+        except Error:
+            broken = True
+        raise
+    finally:
+        pool.release(conn, discard=broken)
+
+# Même session que get_db, hors dépendance FastAPI (préchauffage, requêtes parallèles)
+pooled_session = contextmanager(_db_session)
+
 def get_db():
     """Connexion MySQL par requête (commit/rollback) + erreurs lisibles."""
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST", "127.0.0.1"),
-            port=int(os.getenv("DB_PORT", "3306")),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASS"),
-            database=os.getenv("DB_NAME", "jobboard"),
-            charset="utf8mb4",
-            autocommit=False,
-            raise_on_warnings=True,
-            connection_timeout=5,
-        )
-        conn.ping(reconnect=True, attempts=1, delay=0)
+        conn = db_pool.acquire()
     except Error as e:
         raise HTTPException(status_code=500, detail=f"DB connection failed: {e}") from e
-
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    # GTID de l'écriture renvoyés au client pour ses lectures suivantes sur la réplique
+    yield from _db_session(db_pool, conn, track_gtid=replica_pool is not None)
+
+def get_read_db():
+    """Connexion de lecture : réplique si configurée et à jour des écritures du client, primaire sinon."""
+    if replica_pool is not None and not db_routing.pinned_to_primary():
+        try:
+            conn = replica_pool.acquire()
+        except Error:
+            # Réplique indisponible : on retombe sur le primaire
+            pass
+        else:
+            gtid = db_routing.read_after_gtid()
+            if gtid is None or db_routing.wait_for_gtid(conn, gtid):
+                yield from _db_session(replica_pool, conn)
+                return
+            # Réplique en retard au-delà de DB_GTID_WAIT_SECONDS
+            replica_pool.release(conn)
+    yield from get_db()
 
 # --------------------------------------------------------------------
 # Sécurité / JWT
@@ -119,8 +214,8 @@ def get_current_user(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    with db.cursor(dictionary=True) as cur:
-        cur.execute("SELECT id, email, role FROM users WHERE email=%s", (email,))
+    with db.cursor(dictionary=True, prepared=True) as cur:
+        cur.execute("SELECT id, email, role FROM users WHERE email=%s AND deleted_at IS NULL", (email,))
         user = cur.fetchone()
 
     if not user:
@@ -140,6 +235,53 @@ def require_admin_or_recruiter(user=Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return user
 
+# --------------------------------------------------------------------
+# Routeurs par cloison (voir bulkheads.py)
+# --------------------------------------------------------------------
+public_router = APIRouter(route_class=bulkhead_route("public-read"))
+auth_router = APIRouter(route_class=bulkhead_route("auth"))
+user_router = APIRouter(route_class=bulkhead_route("user"))
+recruiter_router = APIRouter(route_class=bulkhead_route("recruiter"))
+uploads_router = APIRouter(route_class=bulkhead_route("uploads"))
+
+# --------------------------------------------------------------------
+# Lectures groupées / projection (?ids=..., ?fields=...)
+# --------------------------------------------------------------------
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+
+def _parse_ids(raw: str) -> list[int]:
+    """"3,1,3" -> [3, 1] : ordre de la requête, doublons retirés."""
+    ids: list[int] = []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit():
+            raise HTTPException(status_code=400, detail=f"Invalid id: {part}")
+        value = int(part)
+        if value not in ids:
+            ids.append(value)
+    if not ids:
+        raise HTTPException(status_code=400, detail="ids is required")
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Too many ids (max {BATCH_MAX_IDS})")
+    return ids
+
+def _projection(fields: str | None, columns: dict[str, str]) -> str:
+    """Liste SELECT des champs demandés (tous par défaut) ; `id` est toujours renvoyé."""
+    if not fields:
+        names = list(columns)
+    else:
+        names = ["id"] + [f.strip() for f in fields.split(",") if f.strip() and f.strip() != "id"]
+        unknown = [name for name in names if name not in columns]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ", ".join(f"{columns[name]} AS {name}" for name in names)
+
+def _in_request_order(ids: list[int], rows: list[dict]) -> list[dict]:
+    by_id = {row["id"]: row for row in rows}
+    return [by_id.get(i) or {"id": i, "error": "not_found"} for i in ids]
+
 # --------------------------------------------------------------------
 # Health
 # --------------------------------------------------------------------
@@ -157,10 +299,24 @@ def db_ping(db=Depends(get_db)):
 def health():
     return {"status": "ok"}
 
+@app.get("/ready")
+def ready(response: Response):
+    # 503 tant que le préchauffage du worker n'est pas terminé (voir warmup.py)
+    if not warmup.WARMUP.ready:
+        response.status_code = 503
+    return warmup.WARMUP.status()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        observability.render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
 # --------------------------------------------------------------------
 # Upload Image
 # --------------------------------------------------------------------
-@app.post("/upload/image", status_code=201)
+@uploads_router.post("/upload/image", status_code=201)
 def upload_image(file: UploadFile = File(...), current_user=Depends(require_user)):
     raw = file.file.read(MAX_BYTES + 1)
     if len(raw) > MAX_BYTES:
@@ -171,43 +327,75 @@ def upload_image(file: UploadFile = File(...), current_user=Depends(require_user
 
     ext = "jpg" if kind == "jpeg" else kind
     name = _safe_image_name(prefix=str(current_user["id"]), ext=ext)
-    dest = UPLOAD_DIR / name
+    dest, url = upload_storage.target(name, UPLOAD_DIR)
     with open(dest, "wb") as f:
         f.write(raw)
 
-    url = f"/uploads/{name}"
     return {"url": url}
 
 # --------------------------------------------------------------------
 # Companies
 # --------------------------------------------------------------------
-@app.get("/api/companies")
-def list_companies(db=Depends(get_db)):
+@public_router.get("/api/companies")
+def list_companies(
+    q: str | None = None,
+    sector: str | None = None,
+    city: str | None = None,
+    cursor: int | None = None,
+    limit: int = 50,
+    db=Depends(get_read_db),
+):
+    """Annuaire paginé par curseur (id décroissant) : renvoyer `next_cursor` pour la page suivante."""
     try:
+        limit = max(1, min(100, int(limit)))
+        where = ["c.deleted_at IS NULL"]
+        params: list = []
+        if q:
+            where.append("c.name LIKE %s")
+            params.append(f"%{q}%")
+        if sector:
+            where.append("c.sector = %s")
+            params.append(sector)
+        if city:
+            where.append("c.hq_city = %s")
+            params.append(city)
+        if cursor is not None:
+            where.append("c.id < %s")
+            params.append(int(cursor))
+        where_sql = " AND ".join(where)
+
+        # Compteurs lus dans company_stats (tenus à jour à l'écriture), pas de GROUP BY sur jobs/applications
         with db.cursor(dictionary=True) as cur:
             cur.execute(
-                """
+                f"""
                 SELECT
-                    id,
-                    name,
-                    hq_city,
-                    sector,
-                    description,
-                    website,
-                    social_links,
-                    headcount,
-                    banner_url
-                FROM companies
-                ORDER BY id DESC
-                LIMIT 50
-                """
+                    c.id,
+                    c.name,
+                    c.hq_city,
+                    c.sector,
+                    c.description,
+                    c.website,
+                    c.social_links,
+                    c.headcount,
+                    c.banner_url,
+                    COALESCE(s.open_jobs, 0) AS open_jobs,
+                    COALESCE(s.applications, 0) AS applications
+                FROM companies c
+                LEFT JOIN company_stats s ON s.company_id = c.id
+                WHERE {where_sql}
+                ORDER BY c.id DESC
+                LIMIT %s
+                """,
+                tuple(params + [limit + 1]),
             )
             rows = cur.fetchall()
-        return {"items": rows}
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {"items": rows, "next_cursor": rows[-1]["id"] if has_more else None}
     except Error as e:
         raise HTTPException(status_code=500, detail=f"Query failed: {e}")
 
-@app.post("/api/companies", status_code=201)
+@recruiter_router.post("/api/companies", status_code=201)
 def create_company(
     payload: dict,
     db=Depends(get_db),
@@ -246,6 +434,7 @@ def create_company(
                 (*values,),
             )
             new_id = cur.lastrowid
+        invalidation.publish(db, invalidation.COMPANY_CHANGED, new_id)
         with db.cursor(dictionary=True) as cur:
             cur.execute(
                 """
@@ -261,7 +450,7 @@ def create_company(
     except Error as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
-@app.get("/api/my/company")
+@recruiter_router.get("/api/my/company")
 def get_my_company(
     db=Depends(get_db),
     current_user: dict = Depends(require_admin_or_recruiter),
@@ -282,7 +471,7 @@ def get_my_company(
                 created_at,
                 created_by
             FROM companies
-            WHERE created_by = %s
+            WHERE created_by = %s AND deleted_at IS NULL
             ORDER BY id DESC
             LIMIT 1
             """,
@@ -291,10 +480,10 @@ def get_my_company(
         company = cur.fetchone()
     return company or None
 
-@app.get("/api/companies/{company_id}")
+@public_router.get("/api/companies/{company_id}")
 def get_company(
     company_id: int,
-    db=Depends(get_db),
+    db=Depends(get_read_db),
     _: dict = Depends(require_admin_or_recruiter),
 ):
     with db.cursor(dictionary=True) as cur:
@@ -303,7 +492,7 @@ def get_company(
             SELECT id, name, hq_city, sector, description, website,
                    social_links, headcount, banner_url, created_at
             FROM companies
-            WHERE id=%s
+            WHERE id=%s AND deleted_at IS NULL
             """,
             (company_id,),
         )
@@ -312,7 +501,7 @@ def get_company(
         raise HTTPException(status_code=404, detail="Company not found")
     return company
 
-@app.put("/api/companies/{company_id}", status_code=200)
+@recruiter_router.put("/api/companies/{company_id}", status_code=200)
 def update_company(
     company_id: int,
     payload: dict,
@@ -330,12 +519,10 @@ def update_company(
     if not data:
         raise HTTPException(status_code=400, detail="no valid fields to update")
     # Ownership check (admin can edit all, recruiter only own company)
-    with db.cursor(dictionary=True) as cur:
-        cur.execute("SELECT id, created_by FROM companies WHERE id=%s", (company_id,))
-        company_row = cur.fetchone()
-    if not company_row:
+    owner_id = OWNERSHIP.company_owner(db, company_id)
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Company not found")
-    if current_user["role"] != "admin" and company_row["created_by"] != current_user["id"]:
+    if current_user["role"] != "admin" and owner_id != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     set_clause = ", ".join(f"{k}=%s" for k in data.keys())
     values = list(data.values())
@@ -346,6 +533,9 @@ def update_company(
                 cur.execute("SELECT 1 FROM companies WHERE id=%s", (company_id,))
                 if cur.fetchone() is None:
                     raise HTTPException(status_code=404, detail="Company not found")
+        if "name" in data or "banner_url" in data:
+            job_cards.sync_company(db, company_id)
+        invalidation.publish(db, invalidation.COMPANY_CHANGED, company_id)
         with db.cursor(dictionary=True) as cur:
             cur.execute(
                 """
@@ -360,106 +550,123 @@ def update_company(
     except Error as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
-@app.delete("/api/companies/{company_id}", status_code=204)
+@recruiter_router.delete("/api/companies/{company_id}", status_code=202)
 def delete_company(
     company_id: int,
     db=Depends(get_db),
     current_user: dict = Depends(require_admin_or_recruiter),
 ):
-    with db.cursor(dictionary=True) as cur:
-        cur.execute("SELECT id, created_by FROM companies WHERE id=%s", (company_id,))
-        company = cur.fetchone()
-    if not company:
+    owner_id = OWNERSHIP.company_owner(db, company_id)
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Entreprise introuvable.")
-    if current_user["role"] != "admin" and company["created_by"] != current_user["id"]:
+    if current_user["role"] != "admin" and owner_id != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    with db.cursor() as cur:
-        # Supprimer les notifications liées aux jobs de cette entreprise pour éviter des notifs orphelines
-        cur.execute(
-            """
-            DELETE n FROM notifications n
-            WHERE n.job_id IN (SELECT id FROM jobs WHERE company_id=%s)
-               OR n.application_id IN (
-                    SELECT a.id FROM applications a
-                    JOIN jobs j ON j.id = a.job_id
-                    WHERE j.company_id = %s
-               )
-            """,
-            (company_id, company_id),
-        )
-        cur.execute("DELETE FROM jobs WHERE company_id=%s", (company_id,))
-        cur.execute("DELETE FROM companies WHERE id=%s", (company_id,))
-    return Response(status_code=204)
+    # Masquée tout de suite ; offres, candidatures et notifications purgées par lots (purge.py)
+    purge_id = purge.soft_delete_company(db, company_id)
+    return {"purge_id": purge_id, "status": "pending"}
 
 # --------------------------------------------------------------------
 # Jobs
 # --------------------------------------------------------------------
-@app.get("/api/jobs/{job_id}")
-def get_job(job_id: int, db=Depends(get_db)):
-    with db.cursor(dictionary=True) as cur:
-        cur.execute(
-            """
-            SELECT j.*,
-                   c.name AS company_name,
-                   c.website AS company_website,
-                   c.banner_url AS company_banner_url
-            FROM jobs j
-            JOIN companies c ON c.id = j.company_id
-            WHERE j.id = %s
-            """,
-            (job_id,),
-        )
+JOB_FIELDS = {
+    "id": "j.id",
+    "company_id": "j.company_id",
+    "title": "j.title",
+    "short_desc": "j.short_desc",
+    "full_desc": "j.full_desc",
+    "location": "j.location",
+    "profile_sought": "j.profile_sought",
+    "contract_type": "j.contract_type",
+    "work_mode": "j.work_mode",
+    "salary_min": "j.salary_min",
+    "salary_max": "j.salary_max",
+    "currency": "j.currency",
+    "tags": "j.tags",
+    "created_at": "j.created_at",
+    "company_name": "c.name",
+    "company_website": "c.website",
+    "company_banner_url": "c.banner_url",
+}
+
+def _job_query(fields: str | None, where: str) -> str:
+    """SELECT d'offres visibles ; lu dans `job_cards` quand tous les champs demandés sont ceux de la carte."""
+    names = {f.strip() for f in (fields or "").split(",") if f.strip()}
+    if names and names <= job_cards.FIELDS.keys():
+        return f"SELECT {_projection(fields, job_cards.FIELDS)} FROM job_cards jc WHERE {where.format(id='jc.job_id')}"
+    return f"""
+        SELECT {_projection(fields, JOB_FIELDS)}
+        FROM jobs j
+        JOIN companies c ON c.id = j.company_id
+        WHERE {where.format(id='j.id')} AND c.deleted_at IS NULL
+    """
+
+# Déclarée avant /api/jobs/{job_id}, sinon "batch" serait lu comme un id
+@public_router.get("/api/jobs/batch")
+def get_jobs_batch(ids: str, fields: str | None = None, db=Depends(get_read_db)):
+    job_ids = _parse_ids(ids)
+    query = _job_query(fields, f"{{id}} IN ({', '.join(['%s'] * len(job_ids))})")
+    try:
+        with db.cursor(dictionary=True) as cur:
+            cur.execute(query, tuple(job_ids))
+            rows = cur.fetchall()
+    except Error as e:
+        raise HTTPException(status_code=500, detail=f"Query failed: {e}")
+    return {"items": _in_request_order(job_ids, rows)}
+
+@public_router.get("/api/jobs/{job_id}")
+def get_job(job_id: int, fields: str | None = None, db=Depends(get_read_db)):
+    query = _job_query(fields, "{id} = %s")
+    # Forme par défaut seulement : chaque combinaison de `fields` serait une instruction de plus par connexion
+    with db.cursor(dictionary=True, prepared=fields is None) as cur:
+        cur.execute(query, (job_id,))
         row = cur.fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Job not found")
     return row
 
-@app.get("/api/jobs")
+@public_router.get("/api/jobs")
 def list_jobs(
     q: str | None = None,
     company_id: int | None = None,
     page: int = 1,
     page_size: int = 10,
-    db=Depends(get_db),
+    db=Depends(get_read_db),
 ):
     try:
         page = max(1, int(page))
         page_size = max(1, min(100, int(page_size)))
         offset = (page - 1) * page_size
 
+        # job_cards ne contient que les offres d'entreprises visibles
         where = []
         params = []
         if q:
-            where.append("(j.title LIKE %s OR j.short_desc LIKE %s)")
+            where.append("(jc.title LIKE %s OR jc.short_desc LIKE %s)")
             params += [f"%{q}%", f"%{q}%"]
         if company_id is not None:
-            where.append("j.company_id = %s")
+            where.append("jc.company_id = %s")
             params.append(int(company_id))
         where_sql = "WHERE " + " AND ".join(where) if where else ""
 
-        with db.cursor(dictionary=True) as cur:
+        with db.cursor(dictionary=True, prepared=True) as cur:
             cur.execute(
                 f"""
                 SELECT COUNT(*) AS total
-                FROM jobs j
-                JOIN companies c ON c.id = j.company_id
+                FROM job_cards jc
                 {where_sql}
                 """,
                 tuple(params),
             )
             total = cur.fetchone()["total"]
 
-        with db.cursor(dictionary=True) as cur:
+        with db.cursor(dictionary=True, prepared=True) as cur:
             cur.execute(
                 f"""
-                SELECT j.id, j.company_id, j.title, j.short_desc, j.location,
-                        j.contract_type, j.work_mode,
-                       c.name AS company_name,
-                       c.banner_url AS company_banner_url
-                FROM jobs j
-                JOIN companies c ON c.id = j.company_id
+                SELECT jc.job_id AS id, jc.company_id, jc.title, jc.short_desc, jc.location,
+                       jc.contract_type, jc.work_mode, jc.company_name, jc.company_banner_url
+                FROM job_cards jc
                 {where_sql}
-                ORDER BY j.created_at DESC, j.id DESC
+                ORDER BY jc.created_at DESC, jc.job_id DESC
                 LIMIT %s OFFSET %s
                 """,
                 tuple(params + [page_size, offset]),
@@ -470,7 +677,7 @@ def list_jobs(
     except Error as e:
         raise HTTPException(status_code=500, detail=f"Query failed: {e}")
 
-@app.post("/api/jobs", status_code=201)
+@recruiter_router.post("/api/jobs", status_code=201)
 def create_job(
     payload: dict,
     db=Depends(get_db),
@@ -496,12 +703,10 @@ def create_job(
         )
 
     # Vérifier que la company existe et l'ownership
-    with db.cursor(dictionary=True) as cur:
-        cur.execute("SELECT id, created_by FROM companies WHERE id=%s", (company_id,))
-        company = cur.fetchone()
-    if not company:
+    owner_id = OWNERSHIP.company_owner(db, company_id)
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Company not found")
-    if current_user["role"] != "admin" and company["created_by"] != current_user["id"]:
+    if current_user["role"] != "admin" and owner_id != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     try:
@@ -529,6 +734,11 @@ def create_job(
                 ),
             )
             new_id = cur.lastrowid
+        company_stats.bump(db, company_id, open_jobs=1)
+        job_cards.sync_jobs(db, [new_id])
+        # Alertes des recherches enregistrées, dans la même transaction
+        saved_searches.percolate(db, {"id": new_id, "company_id": company_id, "title": title, "short_desc": short_desc})
+        invalidation.publish(db, invalidation.JOB_CHANGED, new_id)
         return {
             "id": new_id,
             "company_id": company_id,
@@ -547,7 +757,7 @@ def create_job(
     except Error as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
-@app.patch("/api/jobs/{job_id}")
+@recruiter_router.patch("/api/jobs/{job_id}")
 def patch_job(
     job_id: int,
     payload: dict,
@@ -557,20 +767,11 @@ def patch_job(
     if not payload:
         raise HTTPException(status_code=400, detail="empty payload")
     # Ownership check
-    with db.cursor(dictionary=True) as cur:
-        cur.execute(
-            """
-            SELECT c.created_by
-            FROM jobs j
-            JOIN companies c ON c.id = j.company_id
-            WHERE j.id = %s
-            """,
-            (job_id,),
-        )
-        owner = cur.fetchone()
-    if not owner:
+    owner = OWNERSHIP.job_owner(db, job_id)
+    if owner is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    if current_user["role"] != "admin" and owner["created_by"] != current_user["id"]:
+    company_id, owner_id = owner
+    if current_user["role"] != "admin" and owner_id != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     cols, vals = zip(*payload.items())
     set_clause = ", ".join([f"{c}=%s" for c in cols])
@@ -578,47 +779,49 @@ def patch_job(
         cur.execute(f"UPDATE jobs SET {set_clause} WHERE id=%s", (*vals, job_id))
         if cur.rowcount == 0:
             raise HTTPException(status_code=404, detail="Job not found")
+    if "company_id" in payload:
+        # Offre déplacée : les deux entreprises changent de compteurs
+        company_stats.refresh(db, [company_id, payload["company_id"]])
+    job_cards.sync_jobs(db, [job_id])
+    invalidation.publish(db, invalidation.JOB_CHANGED, job_id)
     return {"id": job_id, **payload}
 
-@app.delete("/api/jobs/{job_id}", status_code=204)
+@recruiter_router.delete("/api/jobs/{job_id}", status_code=204)
 def delete_job(
     job_id: int,
     db=Depends(get_db),
     current_user: dict = Depends(require_admin_or_recruiter),
 ):
     # Ownership check
-    with db.cursor(dictionary=True) as cur:
-        cur.execute(
-            """
-            SELECT c.created_by
-            FROM jobs j
-            JOIN companies c ON c.id = j.company_id
-            WHERE j.id = %s
-            """,
-            (job_id,),
-        )
-        owner = cur.fetchone()
-    if not owner:
+    owner = OWNERSHIP.job_owner(db, job_id)
+    if owner is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    if current_user["role"] != "admin" and owner["created_by"] != current_user["id"]:
+    company_id, owner_id = owner
+    if current_user["role"] != "admin" and owner_id != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     with db.cursor() as cur:
         cur.execute("DELETE FROM jobs WHERE id=%s", (job_id,))
         if cur.rowcount == 0:
             raise HTTPException(status_code=404, detail="Job not found")
+    # Candidatures supprimées en cascade : recalcul plutôt que décrément
+    company_stats.refresh(db, [company_id])
+    invalidation.publish(db, invalidation.JOB_DELETED, job_id)
     return Response(status_code=204)
 
 # --------------------------------------------------------------------
 # Profiles
 # --------------------------------------------------------------------
-@app.get("/api/profiles")
+# Comptes supprimés : profils masqués jusqu'à leur purge (jointure plutôt que NOT IN sur une sous-requête)
+VISIBLE_PROFILES = "profiles p JOIN users u ON u.id = p.user_id AND u.deleted_at IS NULL"
+
+@public_router.get("/api/profiles")
 def list_profiles(
     q: str | None = None,
     city: str | None = None,
     skills: str | None = None,
     page: int = 1,
     page_size: int = 10,
-    db=Depends(get_db),
+    db=Depends(get_read_db),
 ):
     try:
         page = max(1, int(page))
@@ -636,13 +839,13 @@ def list_profiles(
         if skills:
             where.append("p.skills LIKE %s")
             params.append(f"%{skills}%")
-        where_sql = "WHERE " + " AND ".join(where) if where else ""
+        where_sql = ("WHERE " + " AND ".join(where)) if where else ""
 
         with db.cursor(dictionary=True) as cur:
             cur.execute(
                 f"""
                 SELECT COUNT(*) AS total
-                FROM profiles p
+                FROM {VISIBLE_PROFILES}
                 {where_sql}
                 """,
                 tuple(params),
@@ -676,8 +879,7 @@ def list_profiles(
                     p.cv_url,
                     p.created_at,
                     p.updated_at
-                FROM profiles p
-                LEFT JOIN users u ON u.id = p.user_id
+                FROM {VISIBLE_PROFILES}
                 {where_sql}
                 ORDER BY p.created_at DESC, p.id DESC
                 LIMIT %s OFFSET %s
@@ -690,7 +892,7 @@ def list_profiles(
     except Error as e:
         raise HTTPException(status_code=500, detail=f"Query failed: {e}")
 
-@app.post("/api/profiles", status_code=201)
+@user_router.post("/api/profiles", status_code=201)
 def create_profile(payload: dict, db=Depends(get_db), current_user=Depends(get_current_user)):
     first_name = payload.get("first_name")
     last_name = payload.get("last_name")
@@ -709,6 +911,7 @@ def create_profile(payload: dict, db=Depends(get_db), current_user=Depends(get_c
             (current_user["id"], first_name, last_name, city, contact_email, cv_url),
         )
         new_id = cur.lastrowid
+    invalidation.publish(db, invalidation.PROFILE_CHANGED, new_id)
     with db.cursor(dictionary=True) as cur:
         cur.execute(
             "SELECT id, user_id, first_name, last_name, city, contact_email, cv_url, created_at FROM profiles WHERE id=%s",
@@ -717,16 +920,45 @@ def create_profile(payload: dict, db=Depends(get_db), current_user=Depends(get_c
         prof = cur.fetchone()
     return prof
 
-@app.get("/api/profiles/{profile_id}")
-def get_profile(profile_id: int, db=Depends(get_db)):
+PROFILE_FIELDS = {
+    name: f"p.{name}"
+    for name in (
+        "id", "user_id", "first_name", "last_name", "date_birth", "city", "phone",
+        "diplomas", "experiences", "skills", "languages", "qualities", "interests",
+        "job_target", "motivation", "links", "avatar_url", "contact_email", "cv_url",
+        "created_at", "updated_at",
+    )
+}
+
+# Déclarée avant /api/profiles/{profile_id}, sinon "batch" serait lu comme un id
+@public_router.get("/api/profiles/batch")
+def get_profiles_batch(ids: str, fields: str | None = None, db=Depends(get_read_db)):
+    profile_ids = _parse_ids(ids)
+    columns = _projection(fields, PROFILE_FIELDS)
+    try:
+        with db.cursor(dictionary=True) as cur:
+            cur.execute(
+                f"""
+                SELECT {columns}
+                FROM {VISIBLE_PROFILES}
+                WHERE p.id IN ({", ".join(["%s"] * len(profile_ids))})
+                """,
+                tuple(profile_ids),
+            )
+            rows = cur.fetchall()
+    except Error as e:
+        raise HTTPException(status_code=500, detail=f"Query failed: {e}")
+    return {"items": _in_request_order(profile_ids, rows)}
+
+@public_router.get("/api/profiles/{profile_id}")
+def get_profile(profile_id: int, fields: str | None = None, db=Depends(get_read_db)):
+    columns = _projection(fields, PROFILE_FIELDS)
     with db.cursor(dictionary=True) as cur:
         cur.execute(
-            """
-            SELECT id, user_id, first_name, last_name, date_birth, city, phone,
-                   diplomas, experiences, skills, languages, qualities, interests,
-                   job_target, motivation, links, avatar_url, contact_email, cv_url,
-                   created_at, updated_at
-            FROM profiles WHERE id=%s
+            f"""
+            SELECT {columns}
+            FROM {VISIBLE_PROFILES}
+            WHERE p.id=%s
             """,
             (profile_id,),
         )
@@ -735,7 +967,7 @@ def get_profile(profile_id: int, db=Depends(get_db)):
         raise HTTPException(status_code=404, detail="Profile not found")
     return row
 
-@app.put("/api/profiles/{profile_id}")
+@user_router.put("/api/profiles/{profile_id}")
 def update_profile(profile_id: int, payload: dict, db=Depends(get_db), current_user=Depends(get_current_user)):
     with db.cursor(dictionary=True) as cur:
         cur.execute("SELECT id, user_id FROM profiles WHERE id=%s", (profile_id,))
@@ -763,6 +995,7 @@ def update_profile(profile_id: int, payload: dict, db=Depends(get_db), current_u
             )
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Profile not found")
+        invalidation.publish(db, invalidation.PROFILE_CHANGED, profile_id)
         with db.cursor(dictionary=True) as cur:
             cur.execute(
                 """
@@ -779,7 +1012,7 @@ def update_profile(profile_id: int, payload: dict, db=Depends(get_db), current_u
     except Error as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
-@app.delete("/api/profiles/{profile_id}", status_code=204)
+@user_router.delete("/api/profiles/{profile_id}", status_code=204)
 def delete_profile(profile_id: int, db=Depends(get_db), current_user=Depends(get_current_user)):
     with db.cursor(dictionary=True) as cur:
         cur.execute("SELECT id, user_id FROM profiles WHERE id=%s", (profile_id,))
@@ -788,16 +1021,24 @@ def delete_profile(profile_id: int, db=Depends(get_db), current_user=Depends(get
         raise HTTPException(status_code=404, detail="Profil introuvable.")
     if current_user["role"] != "admin" and prof["user_id"] != current_user["id"]:
         raise HTTPException(status_code=403, detail="Vous n'êtes pas autorisés à supprimer ce profil.")
+    company_ids = []
     with db.cursor() as cur:
         if prof["user_id"]:
+            cur.execute(
+                "SELECT DISTINCT j.company_id FROM applications a JOIN jobs j ON j.id = a.job_id WHERE a.user_id=%s",
+                (prof["user_id"],),
+            )
+            company_ids = [row[0] for row in cur.fetchall()]
             cur.execute("DELETE FROM applications WHERE user_id=%s", (prof["user_id"],))
         cur.execute("DELETE FROM profiles WHERE id=%s", (profile_id,))
+    company_stats.refresh(db, company_ids)
+    invalidation.publish(db, invalidation.PROFILE_DELETED, profile_id)
     return Response(status_code=204)
 
 # --------------------------------------------------------------------
 # Auth
 # --------------------------------------------------------------------
-@app.post("/auth/signup", status_code=201)
+@auth_router.post("/auth/signup", status_code=201)
 def auth_signup(payload: dict, db=Depends(get_db)):
     email = (payload.get("email") or "").strip().lower()
     password = payload.get("password")
@@ -820,7 +1061,7 @@ def auth_signup(payload: dict, db=Depends(get_db)):
             raise HTTPException(status_code=409, detail="email already exists")
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
-@app.post("/auth/login")
+@auth_router.post("/auth/login")
 def auth_login(payload: dict, db=Depends(get_db)):
     email = (payload.get("email") or "").strip().lower()
     password = payload.get("password")
@@ -831,7 +1072,7 @@ def auth_login(payload: dict, db=Depends(get_db)):
     try:
         with db.cursor(dictionary=True) as cur:
             cur.execute(
-                "SELECT id, email, password_hash, role FROM users WHERE email=%s",
+                "SELECT id, email, password_hash, role FROM users WHERE email=%s AND deleted_at IS NULL",
                 (email,),
             )
             user = cur.fetchone()
@@ -844,42 +1085,130 @@ def auth_login(payload: dict, db=Depends(get_db)):
     token = create_access_token({"sub": user["email"], "role": user["role"]})
     return {"access_token": token, "token_type": "bearer"}
 
-@app.get("/auth/me")
+@auth_router.get("/auth/me")
 def auth_me(current_user=Depends(get_current_user)):
     return current_user
 
-@app.delete("/auth/me", status_code=204)
+@auth_router.delete("/auth/me", status_code=202)
 def delete_me(current_user=Depends(get_current_user), db=Depends(get_db)):
-    with db.cursor() as cur:
-        # Notifications liées à mes candidatures
-        # Toujours consommer le résultat d'un SELECT pour éviter
-        # mysql.connector.errors.InternalError: Unread result found
-        cur.execute("SELECT id FROM applications WHERE user_id=%s", (current_user["id"],))
-        app_ids = [row[0] for row in cur.fetchall()]
-        if app_ids:
-            ids_tuple = tuple(app_ids)
-            in_clause = ",".join(["%s"] * len(ids_tuple))
-            cur.execute(f"DELETE FROM notifications WHERE application_id IN ({in_clause})", ids_tuple)
-
-        # Notifications liées aux jobs de mes entreprises (si recruteur)
-        cur.execute(
+    # Compte masqué et email libéré tout de suite ; données liées purgées par lots (purge.py)
+    purge_id = purge.soft_delete_user(db, current_user["id"])
+    return {"purge_id": purge_id, "status": "pending"}
+
+# --------------------------------------------------------------------
+# Tableau de bord (/api/me/dashboard)
+# --------------------------------------------------------------------
+DASHBOARD_RECENT_APPLICATIONS = 5
+
+def _fetch(db, sql: str, params: tuple, many: bool):
+    with db.cursor(dictionary=True) as cur:
+        cur.execute(sql, params)
+        return cur.fetchall() if many else cur.fetchone()
+
+@user_router.get("/api/me/dashboard")
+def me_dashboard(current_user: dict = Depends(require_user), db=Depends(get_db)):
+    """Utilisateur, profil, dernières candidatures et notifications non lues en un seul appel."""
+    # Authentification + 3 lectures indexées, en série sur la connexion de la requête :
+    # une place de cloison = un thread et une connexion
+    query_log.set_budget(4)
+    user_id = current_user["id"]
+    queries = [
+        (
+            f"SELECT {_projection(None, PROFILE_FIELDS)} FROM profiles p WHERE p.user_id = %s LIMIT 1",
+            (user_id,),
+            False,
+        ),
+        (
             """
-            DELETE n FROM notifications n
-            WHERE n.job_id IN (
-                SELECT j.id FROM jobs j
-                JOIN companies c ON c.id = j.company_id
-                WHERE c.created_by = %s
-            )
+            SELECT
+                a.id,
+                a.job_id,
+                a.status,
+                a.matched_at,
+                a.created_at,
+                jc.title AS job_title,
+                jc.location AS job_location,
+                jc.company_name
+            FROM applications a
+            JOIN job_cards jc ON jc.job_id = a.job_id
+            WHERE a.user_id = %s
+            ORDER BY a.created_at DESC, a.id DESC
+            LIMIT %s
             """,
-            (current_user["id"],),
-        )
+            (user_id, DASHBOARD_RECENT_APPLICATIONS),
+            True,
+        ),
+        (
+            "SELECT COUNT(*) AS unread FROM notifications WHERE recipient_user_id = %s AND is_read = 0",
+            (user_id,),
+            False,
+        ),
+    ]
+    try:
+        results = [_fetch(db, *query) for query in queries]
+    except Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
+
+    profile, recent_applications, unread = results
+    return {
+        "user": current_user,
+        "profile": profile,
+        "recent_applications": recent_applications,
+        "unread_notifications": unread["unread"],
+    }
 
-        # Données directes
-        cur.execute("DELETE FROM profiles WHERE user_id=%s", (current_user["id"],))
-        cur.execute("DELETE FROM applications WHERE user_id=%s", (current_user["id"],))
-        # La suppression du user cascade sur companies/jobs et leurs candidatures
-        cur.execute("DELETE FROM users WHERE id=%s", (current_user["id"],))
-    return Response(status_code=204)
+# --------------------------------------------------------------------
+# Préchauffage (voir warmup.py)
+# --------------------------------------------------------------------
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "4"))
+
+def _warm_connections():
+    for pool in (db_pool, replica_pool):
+        if pool is not None:
+            pool.prewarm(WARMUP_DB_CONNECTIONS)
+
+def _warm_password_hashing():
+    # passlib charge chaque backend (bcrypt surtout) au premier hash
+    for scheme in pwd_context.schemes():
+        pwd_context.verify("warmup", pwd_context.hash("warmup", scheme=scheme))
+
+def _warm_hot_reads():
+    # Mêmes lectures que les pages d'accueil : pages d'index InnoDB en mémoire, empreintes SQL en cache
+    for pool in (db_pool, replica_pool):
+        if pool is None:
+            continue
+        with pooled_session(pool, pool.acquire()) as db:
+            list_jobs(page=1, page_size=12, db=db)
+            list_companies(db=db)
+
+warmup.WARMUP.step("db_connections", _warm_connections)
+warmup.WARMUP.step("password_hashing", _warm_password_hashing)
+warmup.WARMUP.step("openapi", app.openapi)
+warmup.WARMUP.step("hot_reads", _warm_hot_reads)
+
+# --------------------------------------------------------------------
+# Admission (limitation de débit / délestage)
+# --------------------------------------------------------------------
+def _rate_limit_identity(scope):
+    """Email du jeton Bearer s'il est valide (vérification HMAC, sans requête SQL)."""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO]).get("sub")
+            except JWTError:
+                return None
+    return None
+
+# Lectures publiques identiques simultanées : une seule exécution partagée
+app.add_middleware(
+    singleflight.SingleFlightMiddleware,
+    prefixes=("/api/jobs", "/api/companies", "/api/profiles"),
+)
+# Ajouté avant CORS pour que les 429/503 portent les en-têtes CORS
+app.add_middleware(admission.AdmissionMiddleware, identify=_rate_limit_identity)
 
 # --------------------------------------------------------------------
 # CORS
@@ -899,7 +1228,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(db_routing.ReadYourWritesMiddleware)
+app.add_middleware(query_log.QueryTraceMiddleware)
+app.add_middleware(observability.MetricsMiddleware)
+
+app.include_router(public_router)
+app.include_router(auth_router)
+app.include_router(user_router)
+app.include_router(recruiter_router)
+app.include_router(uploads_router)
+app.include_router(create_cv_uploads_router(require_user, UPLOAD_DIR))
 app.include_router(create_applications_router(get_db, require_user))
 app.include_router(create_company_applications_router(get_db, require_admin_or_recruiter))
 app.include_router(create_notifications_router(get_db, require_user))
+app.include_router(create_saved_searches_router(get_db, require_user))
 app.include_router(create_admin_router(get_db, require_admin, hash_password))
@@ -0,0 +1,49 @@
+"""Regroupement des notifications en rafale (une ligne par offre et par fenêtre).
+
+Une offre populaire générait une notification `application:new` par
+candidature. Les notifications groupées portent une clé
+`type:offre:fenêtre` ; tant qu'une notification non lue existe pour
+(destinataire, clé), chaque nouvel événement incrémente `event_count` et
+réécrit le message au lieu d'insérer une ligne. L'unicité est portée par
+la colonne générée `open_group_key` (la clé tant que la notification est
+non lue, NULL ensuite) : l'insertion et l'incrément sont un seul
+`INSERT ... ON DUPLICATE KEY UPDATE`, sans lecture préalable. Une fois
+lue, ou à la fenêtre suivante (`NOTIFICATION_DIGEST_WINDOW_SECONDS`), le
+prochain événement ouvre une nouvelle ligne.
+
+Une ligne groupée représente plusieurs candidatures : son `application_id`
+reste NULL (le contexte est `job_id`), sinon la suppression d'une seule
+candidature effacerait tout le résumé par `ON DELETE CASCADE`.
+"""
+import os
+from datetime import datetime
+
+WINDOW_SECONDS = int(os.getenv("NOTIFICATION_DIGEST_WINDOW_SECONDS", "86400"))
+
+# Utilisable tel quel dans le lot SQL de apply_to_job.
+# Les affectations s'appliquent dans l'ordre : `message` voit le compteur déjà incrémenté.
+APPLICATION_SQL = """
+    INSERT INTO notifications
+        (recipient_user_id, type, message, job_id, application_id, group_key, event_count, created_at)
+    VALUES
+        (%s, 'application:new', %s, %s, NULL, %s, 1, %s) AS fresh
+    ON DUPLICATE KEY UPDATE
+        event_count = event_count + 1,
+        message = CONCAT(event_count, %s),
+        created_at = fresh.created_at
+"""
+
+
+def group_key(kind: str, job_id: int, at: datetime) -> str:
+    return f"{kind}:{job_id}:{int(at.timestamp()) // max(1, WINDOW_SECONDS)}"
+
+
+def application_params(owner_id: int, job_id: int, job_title: str, candidate: str, at: datetime) -> list:
+    return [
+        owner_id,
+        f"{candidate} a postulé à {job_title}.",
+        job_id,
+        group_key("application:new", job_id, at),
+        at,
+        f" candidatures pour {job_title} (dernière : {candidate}).",
+    ]
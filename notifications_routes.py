@@ -1,13 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from mysql.connector import Error
 
+from bulkheads import bulkhead_route
+
 
 def create_notifications_router(get_db, require_user):
-    router = APIRouter()
+    router = APIRouter(route_class=bulkhead_route("user"))
 
     @router.get("/api/me/notifications")
     def list_notifications(
         only_unread: bool | None = None,
+        archived: bool = False,
         limit: int = 20,
         current_user: dict = Depends(require_user),
         db=Depends(get_db),
@@ -20,7 +23,25 @@ def create_notifications_router(get_db, require_user):
                 where.append("n.is_read = 0")
             where_sql = " AND ".join(where)
 
-            with db.cursor(dictionary=True) as cur:
+            # Par défaut, seules les notifications chaudes ; archived=true lit l'archive (retention.py),
+            # dont les candidatures liées peuvent elles-mêmes être archivées
+            if archived:
+                source_sql = """
+                    FROM notifications_archive n
+                    LEFT JOIN applications a ON a.id = n.application_id
+                    LEFT JOIN applications_archive aa ON aa.id = n.application_id
+                """
+                applicant = "COALESCE(a.user_id, aa.user_id)"
+                application_job = "COALESCE(a.job_id, aa.job_id)"
+            else:
+                source_sql = """
+                    FROM notifications n
+                    LEFT JOIN applications a ON a.id = n.application_id
+                """
+                applicant = "a.user_id"
+                application_job = "a.job_id"
+
+            with db.cursor(dictionary=True, prepared=True) as cur:
                 cur.execute(
                     f"""
                     SELECT
@@ -30,16 +51,17 @@ def create_notifications_router(get_db, require_user):
                         n.job_id,
                         n.application_id,
                         n.is_read,
+                        n.event_count AS count,
                         n.created_at,
                         CASE
-                            WHEN n.type = 'application:matched' AND n.recipient_user_id = a.user_id
+                            WHEN n.type = 'application:matched' AND n.recipient_user_id = {applicant}
                                 THEN uc.email
                             WHEN n.type = 'application:matched' AND n.recipient_user_id = c.created_by
                                 THEN p.contact_email
                             ELSE NULL
                         END AS contact_email,
                         CASE
-                            WHEN n.type = 'application:matched' AND n.recipient_user_id = a.user_id
+                            WHEN n.type = 'application:matched' AND n.recipient_user_id = {applicant}
                                 THEN c.name
                             WHEN n.type = 'application:matched' AND n.recipient_user_id = c.created_by
                                 THEN CONCAT_WS(' ', p.first_name, p.last_name)
@@ -47,17 +69,16 @@ def create_notifications_router(get_db, require_user):
                         END AS contact_name,
                         CASE
                             -- Quand le destinataire est le candidat, le contact attendu est l'entreprise
-                            WHEN n.type = 'application:matched' AND n.recipient_user_id = a.user_id
+                            WHEN n.type = 'application:matched' AND n.recipient_user_id = {applicant}
                                 THEN 'company'
                             -- Quand le destinataire est l'entreprise, le contact attendu est le candidat
                             WHEN n.type = 'application:matched' AND n.recipient_user_id = c.created_by
                                 THEN 'candidate'
                             ELSE NULL
                         END AS contact_role
-                    FROM notifications n
-                    LEFT JOIN applications a ON a.id = n.application_id
-                    LEFT JOIN profiles p ON p.user_id = a.user_id
-                    LEFT JOIN jobs j ON j.id = a.job_id
+                    {source_sql}
+                    LEFT JOIN profiles p ON p.user_id = {applicant}
+                    LEFT JOIN jobs j ON j.id = {application_job}
                     LEFT JOIN companies c ON c.id = j.company_id
                     LEFT JOIN users uc ON uc.id = c.created_by
                     WHERE {where_sql}
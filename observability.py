@@ -0,0 +1,282 @@
+"""Métriques par requête (format Prometheus) et identifiant de corrélation.
+
+Le middleware ouvre un `RequestStats` par requête HTTP, stocké dans une
+ContextVar : le curseur instrumenté de `db.py` y ajoute temps SQL, nombre
+de requêtes et de lignes, le pool y ajoute l'attente de connexion.
+"""
+import bisect
+import logging
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [compteurs par bucket (+Inf inclus), somme, total]
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(s[0]), s[1], s[2]) for labels, s in self._series.items()]
+        for labels, counts, total_sum, total_count in snapshot:
+            base = _labels(self.labelnames, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _merge(base, 'le="%s"' % _fmt(bound))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _merge(base, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {total_count}")
+            lines.append(f"{self.name}_sum{_wrap(base)} {total_sum}")
+            lines.append(f"{self.name}_count{_wrap(base)} {total_count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = list(self._values.items())
+        for labels, value in snapshot:
+            lines.append(f"{self.name}{_wrap(_labels(self.labelnames, labels))} {value}")
+        return lines
+
+
+class Gauge:
+    """Jauge calculée à la lecture (ex. état du pool)."""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple, collect):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.collect():
+            lines.append(f"{self.name}{_wrap(_labels(self.labelnames, labels))} {value}")
+        return lines
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+def _wrap(inner: str) -> str:
+    return "{" + inner + "}" if inner else ""
+
+
+def _merge(inner: str, extra: str) -> str:
+    return "{" + (f"{inner},{extra}" if inner else extra) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests_total = REGISTRY.register(
+    Counter("http_requests_total", "Requêtes HTTP traitées.", ("method", "route", "status"))
+)
+http_request_duration = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "Latence des requêtes HTTP.", ("method", "route"))
+)
+db_request_seconds = REGISTRY.register(
+    Histogram("db_time_per_request_seconds", "Temps passé en base par requête HTTP.", ("route",))
+)
+db_queries_per_request = REGISTRY.register(
+    Histogram("db_queries_per_request", "Requêtes SQL par requête HTTP.", ("route",), COUNT_BUCKETS)
+)
+db_rows_per_request = REGISTRY.register(
+    Histogram("db_rows_per_request", "Lignes lues ou modifiées par requête HTTP.", ("route",), ROW_BUCKETS)
+)
+db_pool_wait = REGISTRY.register(
+    Histogram("db_pool_wait_seconds", "Attente d'une connexion libre dans le pool.", ("pool",))
+)
+
+
+# --------------------------------------------------------------------
+# Contexte par requête
+# --------------------------------------------------------------------
+class RequestStats:
+    __slots__ = ("request_id", "db_seconds", "queries", "rows", "pool_wait")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.pool_wait = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+
+def record_query(seconds: float, rows: int = 0):
+    stats = _current.get()
+    if stats is not None:
+        stats.db_seconds += seconds
+        stats.queries += 1
+        stats.rows += rows
+
+
+def record_db_time(seconds: float, rows: int = 0):
+    """Temps SQL hors `execute` (fetch, commit) : compte le temps, pas la requête."""
+    stats = _current.get()
+    if stats is not None:
+        stats.db_seconds += seconds
+        stats.rows += rows
+
+
+def record_pool_wait(pool: str, seconds: float):
+    db_pool_wait.observe(seconds, pool)
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait += seconds
+
+
+# --------------------------------------------------------------------
+# Logs corrélés
+# --------------------------------------------------------------------
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+access_log = logging.getLogger("jobboard.access")
+
+_base_factory = logging.getLogRecordFactory()
+
+
+def _record_factory(*args, **kwargs):
+    record = _base_factory(*args, **kwargs)
+    stats = _current.get()
+    record.request_id = stats.request_id if stats is not None else "-"
+    return record
+
+
+def configure_logging(level: int = logging.INFO):
+    """Ajoute `request_id` à chaque LogRecord et un format qui l'affiche."""
+    logging.setLogRecordFactory(_record_factory)
+    logger = logging.getLogger("jobboard")
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
+
+
+# --------------------------------------------------------------------
+# Middleware ASGI
+# --------------------------------------------------------------------
+class MetricsMiddleware:
+    """Mesure chaque requête HTTP et propage/génère `X-Request-ID`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        stats = RequestStats(request_id or uuid.uuid4().hex[:16])
+        token = _current.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", stats.request_id)
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_requests_total.inc(method, route, str(status_code))
+            http_request_duration.observe(elapsed, method, route)
+            db_request_seconds.observe(stats.db_seconds, route)
+            db_queries_per_request.observe(stats.queries, route)
+            db_rows_per_request.observe(stats.rows, route)
+            access_log.info(
+                "%s %s %s %.1fms db=%.1fms queries=%d rows=%d pool_wait=%.1fms",
+                method,
+                scope["path"],
+                status_code,
+                elapsed * 1000,
+                stats.db_seconds * 1000,
+                stats.queries,
+                stats.rows,
+                stats.pool_wait * 1000,
+            )
+            _current.reset(token)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,168 @@
+"""Cache mémoire des propriétaires (entreprise -> recruteur, offre -> entreprise).
+
+Les écritures recruteur (modifier/supprimer une entreprise, créer/modifier/
+supprimer une offre) commencent par vérifier la propriété. Le cache est
+rempli au premier accès, borné en LRU (`OWNERSHIP_CACHE_SIZE` entrées par
+table) et vidé par les événements du bus d'invalidation : suppression
+d'entreprise, d'offre ou de compte, déplacement d'une offre. Les absences
+ne sont pas mises en cache : une entreprise créée sur un autre worker est
+trouvée tout de suite.
+
+Un compteur de génération évite de remettre en cache une valeur lue avant
+une invalidation arrivée pendant la lecture.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import invalidation
+import observability
+
+MAX_ENTRIES = int(os.getenv("OWNERSHIP_CACHE_SIZE", "10000"))
+
+ownership_lookups = observability.REGISTRY.register(
+    observability.Counter(
+        "ownership_cache_requests_total",
+        "Vérifications de propriété servies par le cache (hit) ou la base (miss).",
+        ("kind", "result"),
+    )
+)
+
+
+class OwnershipCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._company_owner: OrderedDict = OrderedDict()
+        self._job_company: OrderedDict = OrderedDict()
+        self._generation = 0
+
+    # ----------------------------------------------------------------
+    # Lecture
+    # ----------------------------------------------------------------
+    def company_owner(self, db, company_id: int) -> int | None:
+        """Propriétaire d'une entreprise visible, None si elle n'existe pas (ou plus)."""
+        with self._lock:
+            owner = self._company_owner.get(company_id)
+            if owner is not None:
+                self._company_owner.move_to_end(company_id)
+            generation = self._generation
+        if owner is not None:
+            ownership_lookups.inc("company", "hit")
+            return owner
+        ownership_lookups.inc("company", "miss")
+        with db.cursor() as cur:
+            cur.execute("SELECT created_by FROM companies WHERE id=%s AND deleted_at IS NULL", (company_id,))
+            row = cur.fetchone()
+        if row is None:
+            return None
+        self._store(generation, companies={company_id: row[0]})
+        return row[0]
+
+    def job_owner(self, db, job_id: int) -> tuple[int, int] | None:
+        """(entreprise, propriétaire) d'une offre visible, None si elle n'existe pas (ou plus)."""
+        with self._lock:
+            company_id = self._job_company.get(job_id)
+            owner = self._company_owner.get(company_id) if company_id is not None else None
+            if owner is not None:
+                self._job_company.move_to_end(job_id)
+                self._company_owner.move_to_end(company_id)
+            generation = self._generation
+        if owner is not None:
+            ownership_lookups.inc("job", "hit")
+            return company_id, owner
+        ownership_lookups.inc("job", "miss")
+        with db.cursor() as cur:
+            cur.execute(
+                """
+                SELECT j.company_id, c.created_by
+                FROM jobs j
+                JOIN companies c ON c.id = j.company_id
+                WHERE j.id = %s AND c.deleted_at IS NULL
+                """,
+                (job_id,),
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None
+        self._store(generation, companies={row[0]: row[1]}, jobs={job_id: row[0]})
+        return row[0], row[1]
+
+    def _store(self, generation: int, companies: dict | None = None, jobs: dict | None = None):
+        with self._lock:
+            if generation != self._generation:
+                return
+            for table, values in ((self._company_owner, companies), (self._job_company, jobs)):
+                for key, value in (values or {}).items():
+                    table[key] = value
+                    table.move_to_end(key)
+                while len(table) > self.max_entries:
+                    table.popitem(last=False)
+
+    # ----------------------------------------------------------------
+    # Invalidation
+    # ----------------------------------------------------------------
+    def forget_company(self, company_id: int):
+        with self._lock:
+            self._generation += 1
+            self._company_owner.pop(company_id, None)
+            for job_id in [j for j, c in self._job_company.items() if c == company_id]:
+                del self._job_company[job_id]
+
+    def forget_job(self, job_id: int):
+        with self._lock:
+            self._generation += 1
+            self._job_company.pop(job_id, None)
+
+    def forget_owner(self, user_id: int):
+        with self._lock:
+            self._generation += 1
+            companies = {c for c, owner in self._company_owner.items() if owner == user_id}
+            for company_id in companies:
+                del self._company_owner[company_id]
+            for job_id in [j for j, c in self._job_company.items() if c in companies]:
+                del self._job_company[job_id]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._company_owner.clear()
+            self._job_company.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"companies": len(self._company_owner), "jobs": len(self._job_company)}
+
+
+OWNERSHIP = OwnershipCache()
+
+
+def _on_event(event: invalidation.Invalidation):
+    if event.entity_id is None:
+        OWNERSHIP.clear()
+    elif event.kind in (invalidation.COMPANY_CHANGED, invalidation.COMPANY_DELETED):
+        OWNERSHIP.forget_company(event.entity_id)
+    elif event.kind in (invalidation.JOB_CHANGED, invalidation.JOB_DELETED):
+        # JOB_CHANGED : l'offre a pu changer d'entreprise
+        OWNERSHIP.forget_job(event.entity_id)
+    elif event.kind == invalidation.USER_DELETED:
+        OWNERSHIP.forget_owner(event.entity_id)
+
+
+for _kind in (
+    invalidation.COMPANY_CHANGED,
+    invalidation.COMPANY_DELETED,
+    invalidation.JOB_CHANGED,
+    invalidation.JOB_DELETED,
+    invalidation.USER_DELETED,
+):
+    invalidation.BUS.subscribe(_kind, _on_event)
+
+observability.REGISTRY.register(
+    observability.Gauge(
+        "ownership_cache_entries",
+        "Entrées du cache de propriété.",
+        ("table",),
+        lambda: [((table,), count) for table, count in OWNERSHIP.stats().items()],
+    )
+)
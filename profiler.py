@@ -0,0 +1,82 @@
+"""Profileur par échantillonnage des piles de tous les threads.
+
+Rien ne tourne en dehors d'une session : `sample()` relève les piles via
+`sys._current_frames()` à la fréquence demandée pendant N secondes, sur
+le trafic réel, puis renvoie le format « collapsed stacks » attendu par
+flamegraph.pl / speedscope (`thread;f1;f2;f3 <nb échantillons>`).
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Feuilles de pile d'un thread qui attend (pool de threads, boucle d'événements...)
+IDLE_LEAVES = {
+    "wait", "select", "poll", "epoll", "_worker", "get", "accept", "sleep",
+    "_wait_for_tstate_lock", "run_forever", "_run_once",
+}
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._running = threading.Lock()
+        self._labels: dict = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def sample(self, seconds: float, hz: int = 100, include_idle: bool = False) -> str:
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy("a profiling session is already running")
+        try:
+            return self._sample(seconds, hz, include_idle)
+        finally:
+            self._running.release()
+
+    def _sample(self, seconds: float, hz: int, include_idle: bool) -> str:
+        counts: Counter = Counter()
+        interval = 1.0 / hz
+        me = threading.get_ident()
+        deadline = time.perf_counter() + seconds
+        names = {t.ident: t.name for t in threading.enumerate()}
+        next_tick = time.perf_counter()
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                if not include_idle and frame.f_code.co_name in IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                thread_name = names.get(tid)
+                if thread_name is None:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                    thread_name = names.get(tid, f"thread-{tid}")
+                stack.append(thread_name)
+                counts[";".join(reversed(stack))] += 1
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+
+        return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+PROFILER = SamplingProfiler()
@@ -0,0 +1,290 @@
+"""Purge par lots des entreprises et comptes supprimés.
+
+La requête HTTP masque l'entité (`deleted_at`), enregistre une tâche dans
+`purge_jobs` et répond tout de suite. Un thread par worker traite ensuite
+les tâches : chaque lot sélectionne au plus `PURGE_BATCH_SIZE` clés
+primaires d'une étape du plan (notifications, candidatures, offres...),
+les supprime et enregistre l'avancement dans la même transaction. Les
+verrous ne portent que sur le lot en cours et une tâche interrompue
+reprend à son étape. `FOR UPDATE SKIP LOCKED` répartit les tâches entre
+workers sans double traitement. Une tâche en échec n'est reprise qu'après
+`next_attempt_at` (attente doublée à chaque tentative, plafonnée à
+`PURGE_RETRY_MAX_SECONDS`) ; au bout de `PURGE_MAX_ATTEMPTS`, elle passe
+en `failed`.
+"""
+import logging
+import os
+import threading
+
+from mysql.connector import Error
+
+import invalidation
+import job_cards
+import observability
+
+BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "500"))
+POLL_SECONDS = float(os.getenv("PURGE_POLL_SECONDS", "2"))
+# Pause entre deux lots pour laisser passer le trafic
+PAUSE_SECONDS = float(os.getenv("PURGE_PAUSE_MS", "50")) / 1000
+MAX_ATTEMPTS = int(os.getenv("PURGE_MAX_ATTEMPTS", "5"))
+# Attente avant nouvelle tentative : RETRY_BASE_SECONDS * 2^(tentatives - 1), plafonnée
+RETRY_BASE_SECONDS = float(os.getenv("PURGE_RETRY_BASE_SECONDS", "30"))
+RETRY_MAX_SECONDS = float(os.getenv("PURGE_RETRY_MAX_SECONDS", "3600"))
+
+log = logging.getLogger("jobboard.purge")
+
+purge_rows_deleted = observability.REGISTRY.register(
+    observability.Counter("purge_rows_deleted_total", "Lignes supprimées par la purge.", ("table",))
+)
+
+_COMPANY_JOBS = "SELECT id FROM jobs WHERE company_id = %s"
+_OWNED_JOBS = "SELECT j.id FROM jobs j JOIN companies c ON c.id = j.company_id WHERE c.created_by = %s"
+
+# entité -> étapes (nom, table, sélection des clés du prochain lot)
+PLANS = {
+    "company": [
+        (
+            "archived_notifications",
+            "notifications_archive",
+            f"SELECT id FROM notifications_archive WHERE job_id IN ({_COMPANY_JOBS}) LIMIT %s",
+        ),
+        (
+            "archived_applications",
+            "applications_archive",
+            f"SELECT id FROM applications_archive WHERE job_id IN ({_COMPANY_JOBS}) LIMIT %s",
+        ),
+        ("notifications", "notifications", f"SELECT id FROM notifications WHERE job_id IN ({_COMPANY_JOBS}) LIMIT %s"),
+        ("applications", "applications", f"SELECT id FROM applications WHERE job_id IN ({_COMPANY_JOBS}) LIMIT %s"),
+        ("jobs", "jobs", "SELECT id FROM jobs WHERE company_id = %s LIMIT %s"),
+        ("company", "companies", "SELECT id FROM companies WHERE id = %s LIMIT %s"),
+    ],
+    "user": [
+        ("notifications", "notifications", "SELECT id FROM notifications WHERE recipient_user_id = %s LIMIT %s"),
+        (
+            "application_notifications",
+            "notifications",
+            "SELECT n.id FROM notifications n JOIN applications a ON a.id = n.application_id WHERE a.user_id = %s LIMIT %s",
+        ),
+        ("applications", "applications", "SELECT id FROM applications WHERE user_id = %s LIMIT %s"),
+        (
+            "archived_notifications",
+            "notifications_archive",
+            "SELECT id FROM notifications_archive WHERE recipient_user_id = %s LIMIT %s",
+        ),
+        (
+            "archived_applications",
+            "applications_archive",
+            "SELECT id FROM applications_archive WHERE user_id = %s LIMIT %s",
+        ),
+        (
+            "company_archived_notifications",
+            "notifications_archive",
+            f"SELECT id FROM notifications_archive WHERE job_id IN ({_OWNED_JOBS}) LIMIT %s",
+        ),
+        (
+            "company_archived_applications",
+            "applications_archive",
+            f"SELECT id FROM applications_archive WHERE job_id IN ({_OWNED_JOBS}) LIMIT %s",
+        ),
+        ("company_notifications", "notifications", f"SELECT id FROM notifications WHERE job_id IN ({_OWNED_JOBS}) LIMIT %s"),
+        ("company_applications", "applications", f"SELECT id FROM applications WHERE job_id IN ({_OWNED_JOBS}) LIMIT %s"),
+        (
+            "company_jobs",
+            "jobs",
+            "SELECT id FROM jobs WHERE company_id IN (SELECT id FROM companies WHERE created_by = %s) LIMIT %s",
+        ),
+        ("companies", "companies", "SELECT id FROM companies WHERE created_by = %s LIMIT %s"),
+        ("profile", "profiles", "SELECT id FROM profiles WHERE user_id = %s LIMIT %s"),
+        ("user", "users", "SELECT id FROM users WHERE id = %s LIMIT %s"),
+    ],
+}
+
+# Plus ancienne tâche libre dont l'attente après échec est écoulée
+CLAIM_SQL = """
+    SELECT id, entity, entity_id, step, attempts
+    FROM purge_jobs
+    WHERE status IN ('pending', 'running')
+      AND (next_attempt_at IS NULL OR next_attempt_at <= NOW())
+    ORDER BY id
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+"""
+
+_DELETED_EVENTS = {"company": invalidation.COMPANY_DELETED, "user": invalidation.USER_DELETED}
+
+
+def enqueue(db, entity: str, entity_id: int) -> int:
+    """Enregistre la tâche de purge (idempotent) ; renvoie son id."""
+    with db.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO purge_jobs (entity, entity_id, status, created_at, updated_at)
+            VALUES (%s, %s, 'pending', NOW(), NOW())
+            ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)
+            """,
+            (entity, entity_id),
+        )
+        return cur.lastrowid
+
+
+def soft_delete_company(db, company_id: int) -> int:
+    with db.cursor() as cur:
+        cur.execute("UPDATE companies SET deleted_at = NOW() WHERE id = %s AND deleted_at IS NULL", (company_id,))
+    job_cards.drop_company(db, company_id)
+    invalidation.publish(db, invalidation.COMPANY_DELETED, company_id)
+    return enqueue(db, "company", company_id)
+
+
+def soft_delete_user(db, user_id: int) -> int:
+    """Masque le compte et ses entreprises ; l'email est libéré tout de suite."""
+    with db.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE users
+            SET deleted_at = NOW(), email = CONCAT('deleted+', id, '@purge.invalid')
+            WHERE id = %s AND deleted_at IS NULL
+            """,
+            (user_id,),
+        )
+        if cur.rowcount == 0:
+            return 0
+        cur.execute("UPDATE companies SET deleted_at = NOW() WHERE created_by = %s AND deleted_at IS NULL", (user_id,))
+    job_cards.drop_owner(db, user_id)
+    invalidation.publish(db, invalidation.USER_DELETED, user_id)
+    return enqueue(db, "user", user_id)
+
+
+def retry_delay(attempts: int) -> float:
+    """Secondes d'attente après la tentative `attempts` (1, 2, ...) en échec."""
+    return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+def status_row(row: dict) -> dict:
+    steps = [name for name, _, _ in PLANS.get(row["entity"], [])]
+    done = len(steps) if row["status"] == "done" else (steps.index(row["step"]) if row["step"] in steps else 0)
+    return {**row, "steps": steps, "steps_done": done}
+
+
+class PurgeWorker:
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, pool):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(pool,), name="purge-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, pool):
+        while not self._stop.is_set():
+            try:
+                conn = pool.acquire()
+            except Error as e:
+                log.warning("purge: no connection (%s)", e)
+                self._stop.wait(POLL_SECONDS)
+                continue
+            broken = False
+            worked = False
+            try:
+                worked = self.run_batch(conn)
+            except Exception as e:
+                broken = True
+                log.warning("purge batch failed: %s", e)
+            finally:
+                pool.release(conn, discard=broken)
+            self._stop.wait(PAUSE_SECONDS if worked else POLL_SECONDS)
+
+    def run_batch(self, conn) -> bool:
+        """Traite un lot de la plus ancienne tâche libre ; False s'il n'y a rien à faire."""
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(CLAIM_SQL)
+            job = cur.fetchone()
+        if job is None:
+            conn.commit()
+            return False
+        try:
+            self._advance(conn, job)
+            conn.commit()
+        except Error as e:
+            conn.rollback()
+            self._record_failure(conn, job, e)
+        return True
+
+    def _advance(self, conn, job: dict):
+        plan = PLANS[job["entity"]]
+        names = [name for name, _, _ in plan]
+        index = names.index(job["step"]) if job["step"] in names else 0
+        name, table, select_sql = plan[index]
+
+        with conn.cursor() as cur:
+            cur.execute(select_sql, (job["entity_id"], self.batch_size))
+            ids = [row[0] for row in cur.fetchall()]
+            deleted = 0
+            if ids:
+                cur.execute(f"DELETE FROM {table} WHERE id IN ({','.join(['%s'] * len(ids))})", ids)
+                deleted = cur.rowcount
+                purge_rows_deleted.inc(table, amount=deleted)
+
+            if len(ids) == self.batch_size:
+                # Étape pas finie : on y reviendra au prochain lot
+                cur.execute(
+                    """
+                    UPDATE purge_jobs
+                    SET status = 'running', step = %s, deleted_rows = deleted_rows + %s, updated_at = NOW()
+                    WHERE id = %s
+                    """,
+                    (name, deleted, job["id"]),
+                )
+            elif index + 1 < len(plan):
+                cur.execute(
+                    """
+                    UPDATE purge_jobs
+                    SET status = 'running', step = %s, deleted_rows = deleted_rows + %s, updated_at = NOW()
+                    WHERE id = %s
+                    """,
+                    (plan[index + 1][0], deleted, job["id"]),
+                )
+            else:
+                cur.execute(
+                    """
+                    UPDATE purge_jobs
+                    SET status = 'done', step = NULL, deleted_rows = deleted_rows + %s,
+                        updated_at = NOW(), finished_at = NOW()
+                    WHERE id = %s
+                    """,
+                    (deleted, job["id"]),
+                )
+                cur.execute(invalidation.INSERT_SQL, (_DELETED_EVENTS[job["entity"]], job["entity_id"]))
+                log.info("purge %s %s done", job["entity"], job["entity_id"])
+
+    def _record_failure(self, conn, job: dict, error: Exception):
+        attempts = job["attempts"] + 1
+        status = "failed" if attempts >= MAX_ATTEMPTS else "running"
+        delay = retry_delay(attempts)
+        log.warning(
+            "purge %s %s failed (attempt %d, retry in %.0fs): %s",
+            job["entity"], job["entity_id"], attempts, delay, error,
+        )
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE purge_jobs
+                SET status = %s, attempts = %s, last_error = %s, updated_at = NOW(),
+                    next_attempt_at = NOW() + INTERVAL %s SECOND
+                WHERE id = %s
+                """,
+                (status, attempts, str(error)[:2000], delay, job["id"]),
+            )
+        conn.commit()
+
+
+WORKER = PurgeWorker()
@@ -0,0 +1,294 @@
+"""Journal des requêtes SQL lentes, empreintes SQL et détection N+1.
+
+Chaque requête SQL exécutée via le curseur instrumenté est normalisée en
+empreinte (littéraux et paramètres remplacés par `?`) puis rattachée à la
+requête HTTP courante. En fin de requête HTTP, on signale :
+- les requêtes SQL plus lentes que `SLOW_QUERY_MS` ;
+- les requêtes HTTP qui dépassent leur budget de requêtes SQL ;
+- les requêtes HTTP qui répètent la même empreinte (motif N+1).
+Les pires cas sont conservés dans des tampons circulaires consultables
+par un admin (`/api/admin/slow-queries`).
+
+`rows` compte les lignes renvoyées ou modifiées, vues du client. Les lignes
+examinées par le serveur (`rows_examined`) ne sont relevées qu'avec
+`QUERY_LOG_ROWS_EXAMINED=1` : un aller-retour de plus par requête, vers
+`performance_schema.events_statements_history` de la session.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import lru_cache
+
+from mysql.connector import Error, errorcode
+from mysql.connector.errors import InterfaceError, OperationalError
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "10"))
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "3"))
+QUERY_LOG_SIZE = int(os.getenv("QUERY_LOG_SIZE", "100"))
+ROWS_EXAMINED = os.getenv("QUERY_LOG_ROWS_EXAMINED", "0") == "1"
+
+log = logging.getLogger("jobboard.sql")
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_PARAMS = re.compile(r"%\(\w+\)s|%s")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """Forme normalisée d'une requête : mêmes empreintes = même requête à des valeurs près."""
+    text = _COMMENTS.sub(" ", sql)
+    text = _STRINGS.sub("?", text)
+    text = _PARAMS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _LISTS.sub("(?+)", text)
+    text = _REPEATED_LISTS.sub("(?+)", text)
+    return _SPACES.sub(" ", text).strip().lower()
+
+
+class QueryEntry:
+    __slots__ = ("fingerprint", "seconds", "rows", "rows_examined")
+
+    def __init__(self, fp: str, seconds: float, rows: int):
+        self.fingerprint = fp
+        self.seconds = seconds
+        self.rows = rows
+        self.rows_examined: int | None = None
+
+
+class RequestTrace:
+    __slots__ = ("entries", "budget")
+
+    def __init__(self):
+        self.entries: list[QueryEntry] = []
+        self.budget: int | None = None
+
+
+_trace: ContextVar[RequestTrace | None] = ContextVar("query_trace", default=None)
+
+
+def record(sql, seconds: float, rows: int) -> QueryEntry:
+    """Appelé par le curseur après chaque `execute` ; les lignes lues s'ajoutent ensuite."""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    entry = QueryEntry(fingerprint(sql), seconds, rows)
+    trace = _trace.get()
+    if trace is not None:
+        trace.entries.append(entry)
+    elif seconds * 1000 >= SLOW_QUERY_MS:
+        # Hors requête HTTP (tâches de fond) : pas de fin de requête pour évaluer plus tard
+        QUERY_LOG.add_slow(entry, "-")
+    return entry
+
+
+# Instructions de la session terminées depuis la sonde précédente (lot multi-requêtes compris) ;
+# la sonde en cours n'est pas encore dans l'historique
+_EXAMINED_MARK = "/* query_log:rows_examined */"
+ROWS_EXAMINED_SQL = f"""
+    {_EXAMINED_MARK}
+    SELECT COALESCE(SUM(h.ROWS_EXAMINED), 0)
+    FROM performance_schema.events_statements_history h
+    WHERE h.THREAD_ID = PS_CURRENT_THREAD_ID()
+      AND h.EVENT_ID > COALESCE((
+          SELECT MAX(p.EVENT_ID)
+          FROM performance_schema.events_statements_history p
+          WHERE p.THREAD_ID = PS_CURRENT_THREAD_ID() AND p.SQL_TEXT LIKE '%{_EXAMINED_MARK}%'
+      ), 0)
+"""
+
+
+_NO_PERFORMANCE_SCHEMA = {
+    errorcode.ER_TABLEACCESS_DENIED_ERROR,
+    errorcode.ER_NO_SUCH_TABLE,
+    errorcode.ER_BAD_DB_ERROR,
+    # PS_CURRENT_THREAD_ID() : MySQL 8.0.16 et plus
+    errorcode.ER_SP_DOES_NOT_EXIST,
+}
+
+
+# Échecs ponctuels de la sonde : un avertissement au plus par intervalle
+EXAMINE_WARN_SECONDS = 60
+_examine_lock = threading.Lock()
+_examine_warned_at = float("-inf")
+_examine_failures = 0
+
+
+def _examine_failed(error: Error):
+    global _examine_warned_at, _examine_failures
+    with _examine_lock:
+        _examine_failures += 1
+        now = time.monotonic()
+        if now - _examine_warned_at < EXAMINE_WARN_SECONDS:
+            return
+        _examine_warned_at = now
+        failures, _examine_failures = _examine_failures, 0
+    log.warning("rows examined probe failed (%d in the last %ds): %s", failures, EXAMINE_WARN_SECONDS, error)
+
+
+def examine(conn, entry: QueryEntry):
+    """Relève les lignes examinées par la dernière requête de `conn` (résultats déjà lus)."""
+    global ROWS_EXAMINED
+    try:
+        cur = conn.cursor()
+        try:
+            cur.execute(ROWS_EXAMINED_SQL)
+            (examined,) = cur.fetchone()
+        finally:
+            cur.close()
+    except Error as e:
+        if e.errno in _NO_PERFORMANCE_SCHEMA:
+            # performance_schema absent ou non lisible : on n'insiste pas
+            ROWS_EXAMINED = False
+            log.warning("rows examined unavailable, disabled: %s", e)
+        elif isinstance(e, (InterfaceError, OperationalError)):
+            # Connexion perdue : la requête échoue, la session l'annule et le pool écarte la connexion
+            raise
+        else:
+            _examine_failed(e)
+        return
+    entry.rows_examined = int(examined)
+
+
+def set_budget(budget: int):
+    """Fixe le budget de requêtes SQL de la requête HTTP courante."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.budget = budget
+
+
+def current_query_count() -> int:
+    trace = _trace.get()
+    return len(trace.entries) if trace is not None else 0
+
+
+class QueryLog:
+    """Tampons circulaires des requêtes lentes / requêtes HTTP signalées + agrégats par empreinte."""
+
+    def __init__(self, size: int = QUERY_LOG_SIZE, max_fingerprints: int = 500):
+        self.slow_queries: deque = deque(maxlen=size)
+        self.flagged_requests: deque = deque(maxlen=size)
+        self.max_fingerprints = max_fingerprints
+        self._by_fingerprint: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def add_slow(self, entry: QueryEntry, route: str):
+        item = {
+            "at": time.time(),
+            "route": route,
+            "fingerprint": entry.fingerprint,
+            "ms": round(entry.seconds * 1000, 2),
+            "rows": entry.rows,
+            "rows_examined": entry.rows_examined,
+        }
+        with self._lock:
+            self.slow_queries.append(item)
+        log.warning(
+            "slow query %.1fms rows=%d examined=%s route=%s: %s",
+            item["ms"], entry.rows, entry.rows_examined, route, entry.fingerprint,
+        )
+
+    def observe(self, route: str, method: str, trace: RequestTrace):
+        per_fp: dict[str, list] = {}
+        for entry in trace.entries:
+            if entry.seconds * 1000 >= SLOW_QUERY_MS:
+                self.add_slow(entry, route)
+            agg = per_fp.setdefault(entry.fingerprint, [0, 0.0, 0, 0.0, None])
+            agg[0] += 1
+            agg[1] += entry.seconds
+            agg[2] += entry.rows
+            agg[3] = max(agg[3], entry.seconds)
+            if entry.rows_examined is not None:
+                agg[4] = (agg[4] or 0) + entry.rows_examined
+
+        budget = trace.budget if trace.budget is not None else QUERY_BUDGET
+        repeated = {fp: agg[0] for fp, agg in per_fp.items() if agg[0] >= QUERY_REPEAT_THRESHOLD}
+        over_budget = len(trace.entries) > budget
+
+        with self._lock:
+            for fp, (count, seconds, rows, slowest, examined) in per_fp.items():
+                stats = self._by_fingerprint.get(fp)
+                if stats is None:
+                    if len(self._by_fingerprint) >= self.max_fingerprints:
+                        self._evict()
+                    stats = self._by_fingerprint[fp] = {
+                        "fingerprint": fp, "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                        "rows_examined": None, "routes": set(),
+                    }
+                stats["calls"] += count
+                stats["total_ms"] += seconds * 1000
+                stats["max_ms"] = max(stats["max_ms"], slowest * 1000)
+                stats["rows"] += rows
+                if examined is not None:
+                    stats["rows_examined"] = (stats["rows_examined"] or 0) + examined
+                if len(stats["routes"]) < 10:
+                    stats["routes"].add(route)
+            if over_budget or repeated:
+                self.flagged_requests.append({
+                    "at": time.time(),
+                    "method": method,
+                    "route": route,
+                    "queries": len(trace.entries),
+                    "budget": budget,
+                    "db_ms": round(sum(e.seconds for e in trace.entries) * 1000, 2),
+                    "repeated": repeated,
+                })
+
+        if over_budget:
+            log.warning("query budget exceeded %s %s: %d queries (budget %d)", method, route, len(trace.entries), budget)
+        for fp, count in repeated.items():
+            log.warning("N+1 suspect %s %s: %dx %s", method, route, count, fp)
+
+    def _evict(self):
+        # On garde les empreintes les plus coûteuses
+        cheapest = min(self._by_fingerprint.values(), key=lambda s: s["total_ms"])
+        del self._by_fingerprint[cheapest["fingerprint"]]
+
+    def snapshot(self, limit: int = 20) -> dict:
+        with self._lock:
+            slow = sorted(self.slow_queries, key=lambda i: i["ms"], reverse=True)
+            flagged = list(self.flagged_requests)[::-1]
+            top = sorted(self._by_fingerprint.values(), key=lambda s: s["total_ms"], reverse=True)[:limit]
+            top = [{**s, "total_ms": round(s["total_ms"], 2), "max_ms": round(s["max_ms"], 2), "routes": sorted(s["routes"])} for s in top]
+        return {
+            "thresholds": {
+                "slow_query_ms": SLOW_QUERY_MS,
+                "query_budget": QUERY_BUDGET,
+                "repeat_threshold": QUERY_REPEAT_THRESHOLD,
+            },
+            "slow_queries": slow[:limit],
+            "flagged_requests": flagged[:limit],
+            "top_fingerprints": top,
+        }
+
+
+QUERY_LOG = QueryLog()
+
+
+class QueryTraceMiddleware:
+    """Ouvre une trace SQL par requête HTTP et l'évalue à la fin."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = RequestTrace()
+        token = _trace.set(trace)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _trace.reset(token)
+            if trace.entries:
+                route = getattr(scope.get("route"), "path", "unmatched")
+                QUERY_LOG.observe(route, scope["method"], trace)
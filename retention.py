@@ -0,0 +1,183 @@
+"""Rétention des notifications et des vieilles candidatures.
+
+Les notifications lues (TTL par type), les notifications jamais lues trop
+anciennes et les candidatures de plus de `APPLICATION_ARCHIVE_DAYS` jours
+sont déplacées par lots vers `notifications_archive` et
+`applications_archive`. Les tables chaudes ne gardent que ce que les
+boîtes de réception et les widgets lisent réellement, donc des index
+compacts. Chaque lot (copie + suppression) est une transaction ; les
+lignes sont prises avec `FOR UPDATE SKIP LOCKED`, plusieurs workers
+peuvent tourner sans se gêner.
+"""
+import logging
+import os
+import threading
+
+from mysql.connector import Error
+
+import observability
+
+
+def _parse_ttls(raw: str) -> dict[str, int]:
+    """`"application:new=30,*=90"` -> {"application:new": 30, "*": 90} ; 0 = jamais archivé."""
+    ttls = {}
+    for item in raw.split(","):
+        if "=" in item:
+            kind, days = item.rsplit("=", 1)
+            ttls[kind.strip()] = int(days)
+    return ttls
+
+
+ENABLED = os.getenv("RETENTION_ENABLED", "1") not in ("0", "false", "no")
+# Notifications lues : TTL en jours par type, "*" pour les autres types
+NOTIFICATION_TTL_DAYS = _parse_ttls(
+    os.getenv("NOTIFICATION_TTL_DAYS", "application:new=30,application:matched=180,*=90")
+)
+UNREAD_TTL_DAYS = int(os.getenv("NOTIFICATION_UNREAD_TTL_DAYS", "365"))
+APPLICATION_TTL_DAYS = int(os.getenv("APPLICATION_ARCHIVE_DAYS", "730"))
+BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+PAUSE_SECONDS = float(os.getenv("RETENTION_PAUSE_MS", "50")) / 1000
+
+COLUMNS = {
+    "notifications": "id, recipient_user_id, type, message, job_id, application_id, event_count, is_read, read_at, created_at",
+    "applications": "id, job_id, user_id, name, email, phone, message, cv_url, status, matched_at, created_at",
+}
+
+log = logging.getLogger("jobboard.retention")
+
+rows_archived = observability.REGISTRY.register(
+    observability.Counter("retention_rows_archived_total", "Lignes déplacées vers les tables d'archive.", ("table",))
+)
+
+
+def policies() -> list[tuple[str, str, str, tuple]]:
+    """Règles actives : (nom, table, condition, paramètres), dans l'ordre d'exécution."""
+    rules = []
+    typed = {kind: days for kind, days in NOTIFICATION_TTL_DAYS.items() if kind != "*"}
+    for kind, days in typed.items():
+        if days > 0:
+            rules.append((
+                f"notifications:{kind}",
+                "notifications",
+                "type = %s AND is_read = 1 AND created_at < NOW() - INTERVAL %s DAY",
+                (kind, days),
+            ))
+    default_days = NOTIFICATION_TTL_DAYS.get("*", 0)
+    if default_days > 0:
+        if typed:
+            cond = f"type NOT IN ({','.join(['%s'] * len(typed))}) AND "
+        else:
+            cond = ""
+        rules.append((
+            "notifications:*",
+            "notifications",
+            cond + "is_read = 1 AND created_at < NOW() - INTERVAL %s DAY",
+            (*typed, default_days),
+        ))
+    if UNREAD_TTL_DAYS > 0:
+        rules.append((
+            "notifications:unread",
+            "notifications",
+            "is_read = 0 AND created_at < NOW() - INTERVAL %s DAY",
+            (UNREAD_TTL_DAYS,),
+        ))
+    if APPLICATION_TTL_DAYS > 0:
+        rules.append((
+            "applications",
+            "applications",
+            "created_at < NOW() - INTERVAL %s DAY",
+            (APPLICATION_TTL_DAYS,),
+        ))
+    return rules
+
+
+def _move(cur, table: str, ids: list[int]):
+    if not ids:
+        return
+    in_sql = ",".join(["%s"] * len(ids))
+    columns = COLUMNS[table]
+    cur.execute(
+        f"INSERT INTO {table}_archive ({columns}) SELECT {columns} FROM {table} WHERE id IN ({in_sql})",
+        ids,
+    )
+    cur.execute(f"DELETE FROM {table} WHERE id IN ({in_sql})", ids)
+    rows_archived.inc(table, amount=len(ids))
+
+
+class RetentionWorker:
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, pool):
+        if self._thread is not None or not ENABLED:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(pool,), name="retention-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, pool):
+        while not self._stop.is_set():
+            try:
+                conn = pool.acquire()
+            except Error as e:
+                log.warning("retention: no connection (%s)", e)
+                self._stop.wait(INTERVAL_SECONDS)
+                continue
+            broken = False
+            try:
+                moved = self.run_once(conn)
+                if any(moved.values()):
+                    log.info("retention: %s", moved)
+            except Exception as e:
+                broken = True
+                log.warning("retention pass failed: %s", e)
+            finally:
+                pool.release(conn, discard=broken)
+            self._stop.wait(INTERVAL_SECONDS)
+
+    def run_once(self, conn) -> dict[str, int]:
+        """Applique toutes les règles jusqu'à épuisement ; renvoie le nombre de lignes par règle."""
+        moved = {}
+        for name, table, condition, params in policies():
+            moved[name] = 0
+            while not self._stop.is_set():
+                count = self.archive_batch(conn, table, condition, params)
+                moved[name] += count
+                if count < self.batch_size:
+                    break
+                self._stop.wait(PAUSE_SECONDS)
+        return moved
+
+    def archive_batch(self, conn, table: str, condition: str, params: tuple) -> int:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"SELECT id FROM {table} WHERE {condition} LIMIT %s FOR UPDATE SKIP LOCKED",
+                    (*params, self.batch_size),
+                )
+                ids = [row[0] for row in cur.fetchall()]
+                if ids and table == "applications":
+                    # Les notifications liées partiraient en cascade : elles suivent la candidature
+                    cur.execute(
+                        f"SELECT id FROM notifications WHERE application_id IN ({','.join(['%s'] * len(ids))}) FOR UPDATE",
+                        ids,
+                    )
+                    _move(cur, "notifications", [row[0] for row in cur.fetchall()])
+                _move(cur, table, ids)
+            conn.commit()
+        except Error:
+            conn.rollback()
+            raise
+        return len(ids)
+
+
+WORKER = RetentionWorker()
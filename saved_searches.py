@@ -0,0 +1,124 @@
+"""Recherches enregistrées et alertes sur les nouvelles offres.
+
+Un candidat enregistre une recherche (texte `q` et/ou entreprise) ; chaque
+offre créée est confrontée aux recherches enregistrées (« percolation ») et
+les candidats concernés reçoivent une notification `job:alert`.
+
+Correspondance : chaque mot de `q` doit être le début d'un mot du titre ou
+du résumé de l'offre (sans casse ni accents), et l'entreprise doit être la
+bonne si elle est précisée.
+
+Index inverse : chaque recherche est rangée sous une seule clé `anchor` —
+les `ANCHOR_LENGTH` premières lettres de son mot le plus long,
+`@company:<id>` si elle filtre sur une entreprise, `@all` sinon. Une offre
+produit ses clés (préfixes de ses mots, son entreprise, `@all`) et ne lit
+que les recherches rangées sous ces clés, vérifiées ensuite en Python :
+le coût suit le nombre de recherches candidates, pas le nombre total de
+recherches enregistrées.
+"""
+import os
+import re
+import unicodedata
+
+import observability
+
+ANCHOR_LENGTH = 4
+NOTIFY_BATCH_SIZE = int(os.getenv("JOB_ALERTS_BATCH_SIZE", "500"))
+MAX_PER_USER = int(os.getenv("SAVED_SEARCHES_MAX_PER_USER", "20"))
+
+_WORD = re.compile(r"\w+")
+
+alerts_sent = observability.REGISTRY.register(
+    observability.Counter("job_alerts_sent_total", "Notifications d'alerte créées pour de nouvelles offres.")
+)
+alert_candidates = observability.REGISTRY.register(
+    observability.Counter(
+        "job_alert_candidates_total",
+        "Recherches enregistrées lues par l'index inverse à la création d'offres.",
+        ("result",),
+    )
+)
+
+
+def words(text: str | None) -> list[str]:
+    """Mots en minuscules et sans accents, sans doublons."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return list(dict.fromkeys(_WORD.findall(text)))
+
+
+def anchor(q: str | None, company_id: int | None) -> str:
+    if company_id is not None:
+        return f"@company:{company_id}"
+    terms = words(q)
+    if not terms:
+        return "@all"
+    return max(terms, key=len)[:ANCHOR_LENGTH]
+
+
+def job_keys(job: dict) -> list[str]:
+    keys = {"@all", f"@company:{job['company_id']}"}
+    for word in words(f"{job.get('title') or ''} {job.get('short_desc') or ''}"):
+        for n in range(1, min(len(word), ANCHOR_LENGTH) + 1):
+            keys.add(word[:n])
+    return sorted(keys)
+
+
+def matches(search: dict, job: dict, job_words: list[str] | None = None) -> bool:
+    if search.get("company_id") is not None and search["company_id"] != job["company_id"]:
+        return False
+    if job_words is None:
+        job_words = words(f"{job.get('title') or ''} {job.get('short_desc') or ''}")
+    return all(any(w.startswith(term) for w in job_words) for term in words(search.get("q")))
+
+
+def find_matches(db, job: dict) -> tuple[int, list[dict]]:
+    """(recherches candidates lues, recherches qui correspondent) pour une offre."""
+    keys = job_keys(job)
+    with db.cursor(dictionary=True) as cur:
+        cur.execute(
+            f"""
+            SELECT s.id, s.user_id, s.name, s.q, s.company_id
+            FROM saved_searches s
+            JOIN users u ON u.id = s.user_id
+            WHERE s.anchor IN ({",".join(["%s"] * len(keys))}) AND u.deleted_at IS NULL
+            """,
+            keys,
+        )
+        candidates = cur.fetchall()
+    job_words = words(f"{job.get('title') or ''} {job.get('short_desc') or ''}")
+    found = [s for s in candidates if matches(s, job, job_words)]
+    alert_candidates.inc("match", amount=len(found))
+    alert_candidates.inc("miss", amount=len(candidates) - len(found))
+    return len(candidates), found
+
+
+def notify(db, job: dict, searches: list[dict]) -> int:
+    """Une notification par candidat (même si plusieurs de ses recherches correspondent), par lots."""
+    rows = {}
+    for search in searches:
+        rows.setdefault(
+            search["user_id"],
+            f"Nouvelle offre pour « {search.get('name') or search.get('q') or 'vos alertes'} » : {job['title']}",
+        )
+    rows = list(rows.items())
+    with db.cursor() as cur:
+        for start in range(0, len(rows), NOTIFY_BATCH_SIZE):
+            batch = rows[start:start + NOTIFY_BATCH_SIZE]
+            cur.execute(
+                f"""
+                INSERT INTO notifications (recipient_user_id, type, message, job_id, created_at)
+                VALUES {",".join(["(%s, 'job:alert', %s, %s, NOW())"] * len(batch))}
+                """,
+                [value for user_id, message in batch for value in (user_id, message, job["id"])],
+            )
+    alerts_sent.inc(amount=len(rows))
+    return len(rows)
+
+
+def percolate(db, job: dict) -> int:
+    """Notifie les candidats dont une recherche enregistrée correspond à l'offre ; renvoie leur nombre."""
+    _, found = find_matches(db, job)
+    return notify(db, job, found) if found else 0
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from mysql.connector import Error
+
+from bulkheads import bulkhead_route
+from ownership import OWNERSHIP
+import saved_searches
+
+
+def create_saved_searches_router(get_db, require_user):
+    router = APIRouter(route_class=bulkhead_route("user"))
+
+    @router.get("/api/me/saved-searches")
+    def list_saved_searches(
+        current_user: dict = Depends(require_user),
+        db=Depends(get_db),
+    ):
+        try:
+            with db.cursor(dictionary=True) as cur:
+                cur.execute(
+                    """
+                    SELECT id, name, q, company_id, created_at
+                    FROM saved_searches
+                    WHERE user_id = %s
+                    ORDER BY id DESC
+                    """,
+                    (current_user["id"],),
+                )
+                items = cur.fetchall()
+            return {"items": items}
+        except Error as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {e}")
+
+    @router.post("/api/me/saved-searches", status_code=201)
+    def create_saved_search(
+        payload: dict,
+        current_user: dict = Depends(require_user),
+        db=Depends(get_db),
+    ):
+        name = (payload.get("name") or "").strip()[:100] or None
+        q = (payload.get("q") or "").strip() or None
+        company_id = payload.get("company_id")
+        if q is not None and len(q) > 255:
+            raise HTTPException(status_code=400, detail="q is too long (255 max)")
+        if not saved_searches.words(q) and company_id is None:
+            raise HTTPException(status_code=400, detail="q or company_id is required")
+        if company_id is not None:
+            try:
+                company_id = int(company_id)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="company_id must be an integer")
+            if OWNERSHIP.company_owner(db, company_id) is None:
+                raise HTTPException(status_code=404, detail="Company not found")
+        try:
+            with db.cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM saved_searches WHERE user_id = %s", (current_user["id"],))
+                if cur.fetchone()[0] >= saved_searches.MAX_PER_USER:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Too many saved searches ({saved_searches.MAX_PER_USER} max)",
+                    )
+                cur.execute(
+                    """
+                    INSERT INTO saved_searches (user_id, name, q, company_id, anchor, created_at)
+                    VALUES (%s, %s, %s, %s, %s, NOW())
+                    """,
+                    (current_user["id"], name, q, company_id, saved_searches.anchor(q, company_id)),
+                )
+                new_id = cur.lastrowid
+            return {"id": new_id, "name": name, "q": q, "company_id": company_id}
+        except Error as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {e}")
+
+    @router.delete("/api/me/saved-searches/{search_id}", status_code=204)
+    def delete_saved_search(
+        search_id: int,
+        current_user: dict = Depends(require_user),
+        db=Depends(get_db),
+    ):
+        try:
+            with db.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM saved_searches WHERE id = %s AND user_id = %s",
+                    (search_id, current_user["id"]),
+                )
+                if cur.rowcount == 0:
+                    raise HTTPException(status_code=404, detail="Saved search not found")
+            return Response(status_code=204)
+        except Error as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {e}")
+
+    return router
@@ -0,0 +1,228 @@
+"""Point d'entrée de production : superviseur préfork pour `main.app`.
+
+Le maître importe `main` une seule fois (préchargement : le code et les
+modules sont partagés en copie sur écriture), ouvre la socket d'écoute
+puis forke N workers uvicorn qui acceptent tous sur cette socket. Les
+threads de fond et les connexions MySQL naissent dans le lifespan de
+chaque worker, jamais dans le maître.
+
+- boucle uvloop et parseur httptools (repli sur "auto" s'ils manquent) ;
+- un worker est recyclé après `--max-requests` requêtes (+ gigue) ou si
+  sa mémoire résidente dépasse `--max-rss-mb` : le remplaçant démarre
+  avant que l'ancien ne termine ses requêtes en cours ;
+- SIGTERM/SIGINT : chaque worker cesse d'accepter, termine ses requêtes
+  (au plus `--graceful-timeout` secondes) et exécute son lifespan de
+  fermeture ; les retardataires sont tués.
+
+Exemple:
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+log = logging.getLogger("jobboard.serve")
+
+# Un worker qui meurt avant ce délai compte comme un échec de démarrage (relance différée)
+MIN_UPTIME_SECONDS = 5.0
+CHECK_SECONDS = 2.0
+
+
+def rss_bytes(pid: int) -> int | None:
+    """Mémoire résidente d'un processus (Linux), None si illisible."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _implementation(module: str) -> str:
+    if importlib.util.find_spec(module) is None:
+        log.warning("%s is not installed, falling back to uvicorn's default", module)
+        return "auto"
+    return module
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    def __init__(self, app, sock: socket.socket, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.loop = _implementation("uvloop")
+        self.http = _implementation("httptools")
+        # pid -> {"started": monotonic, "retiring": bool}
+        self.workers: dict[int, dict] = {}
+        self._stopping = False
+        self._wake = threading.Event()
+        self._failures = 0
+        self._next_spawn = 0.0
+
+    # ----------------------------------------------------------------
+    # Worker
+    # ----------------------------------------------------------------
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._serve()
+            except BaseException:
+                log.exception("worker %s crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = {"started": time.monotonic(), "retiring": False}
+        log.info("worker %s started", pid)
+
+    def _serve(self):
+        import uvicorn
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        # uvicorn 0.37 n'a pas de gigue : chaque worker tire la sienne (random est réensemencé au fork)
+        max_requests = None
+        if self.args.max_requests:
+            max_requests = self.args.max_requests + random.randint(0, max(0, self.args.max_requests_jitter))
+        config = uvicorn.Config(
+            self.app,
+            loop=self.loop,
+            http=self.http,
+            lifespan="on",
+            limit_max_requests=max_requests,
+            timeout_graceful_shutdown=self.args.graceful_timeout,
+            # jobboard.access (observability) journalise déjà chaque requête
+            access_log=False,
+            log_config=None,
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    # ----------------------------------------------------------------
+    # Maître
+    # ----------------------------------------------------------------
+    def _on_stop(self, signum, frame):
+        self._stopping = True
+        self._wake.set()
+
+    def _active(self) -> int:
+        return sum(1 for w in self.workers.values() if not w["retiring"])
+
+    def _reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if worker["retiring"] or self._stopping:
+                log.info("worker %s exited (%s)", pid, code)
+                continue
+            if code == 0:
+                # Fin normale après --max-requests
+                log.info("worker %s recycled after max requests", pid)
+                self._failures = 0
+            elif time.monotonic() - worker["started"] < MIN_UPTIME_SECONDS:
+                self._failures += 1
+                self._next_spawn = time.monotonic() + min(30.0, 0.5 * 2 ** self._failures)
+                log.error("worker %s died at startup (%s), retry in %.1fs", pid, code,
+                          self._next_spawn - time.monotonic())
+            else:
+                log.error("worker %s died (%s)", pid, code)
+
+    def _check_memory(self):
+        limit = self.args.max_rss_mb * 1024 * 1024
+        if limit <= 0:
+            return
+        for pid, worker in self.workers.items():
+            rss = rss_bytes(pid)
+            if worker["retiring"] or rss is None or rss <= limit:
+                continue
+            log.warning("worker %s uses %.0f MB (> %s MB), recycling", pid, rss / 1048576, self.args.max_rss_mb)
+            worker["retiring"] = True
+            os.kill(pid, signal.SIGTERM)
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        log.info(
+            "serving on %s:%s with %s workers (loop=%s, http=%s)",
+            self.args.host, self.args.port, self.args.workers, self.loop, self.http,
+        )
+        while not self._stopping:
+            self._reap()
+            self._check_memory()
+            while self._active() < self.args.workers and time.monotonic() >= self._next_spawn:
+                self.spawn()
+            self._wake.wait(CHECK_SECONDS)
+        self._shutdown()
+        return 0
+
+    def _shutdown(self):
+        log.info("draining %s workers", len(self.workers))
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            log.warning("worker %s did not stop in time, killing", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.workers.clear()
+        self.sock.close()
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("SERVE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVE_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--backlog", type=int, default=int(os.getenv("SERVE_BACKLOG", "2048")))
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("SERVE_MAX_REQUESTS", "10000")),
+                        help="requêtes avant recyclage d'un worker (0 = jamais)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("SERVE_MAX_REQUESTS_JITTER", "1000")))
+    parser.add_argument("--max-rss-mb", type=int, default=int(os.getenv("SERVE_MAX_RSS_MB", "512")),
+                        help="mémoire résidente au-delà de laquelle un worker est recyclé (0 = jamais)")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("SERVE_GRACEFUL_TIMEOUT", "30")))
+    args = parser.parse_args(argv)
+
+    # Préchargement : importé une fois dans le maître, hérité par chaque worker
+    import main as application
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    return Supervisor(application.app, sock, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
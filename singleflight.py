@@ -0,0 +1,89 @@
+"""Coalescence des lectures identiques simultanées (single-flight).
+
+Quand plusieurs clients demandent en même temps la même ressource
+publique (`GET` même chemin, même query string, même jeton), seule la
+première requête (« meneuse ») descend jusqu'au handler et à la base ;
+les suivantes attendent sa réponse, sans thread ni connexion, et en
+reçoivent une copie. Rien n'est gardé une fois la réponse envoyée : ce
+n'est pas un cache, seulement le partage d'une exécution en cours.
+
+Un client épinglé au primaire (il vient d'écrire) ne rejoint jamais une
+exécution en cours, qui a pu commencer avant son écriture.
+"""
+import asyncio
+import os
+
+import db_routing
+import observability
+
+ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "1") not in ("0", "false", "no")
+
+singleflight_requests = observability.REGISTRY.register(
+    observability.Counter(
+        "singleflight_requests_total", "Lectures coalescées par rôle (leader/follower).", ("role",)
+    )
+)
+
+
+def _copy(message: dict) -> dict:
+    # Les middlewares externes ajoutent leurs en-têtes en place : chaque envoi a sa copie
+    if "headers" in message:
+        return {**message, "headers": list(message["headers"])}
+    return dict(message)
+
+
+def _auth_scope(scope) -> bytes:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            return value
+    return b""
+
+
+class SingleFlightMiddleware:
+    def __init__(self, app, prefixes: tuple = ("/api/",)):
+        self.app = app
+        self.prefixes = tuple(prefixes)
+        self._flights: dict[tuple, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not ENABLED
+            or scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(self.prefixes)
+            or db_routing.reads_own_writes()
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["path"], scope.get("query_string", b""), _auth_scope(scope))
+        flight = self._flights.get(key)
+        if flight is not None:
+            result = await asyncio.shield(flight)
+            if result is not None:
+                singleflight_requests.inc("follower")
+                messages, route = result
+                if route is not None:
+                    scope["route"] = route
+                for message in messages:
+                    await send(_copy(message))
+                return
+            # La meneuse a échoué sans réponse complète : on exécute soi-même
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        messages: list[dict] = []
+
+        async def send_wrapper(message):
+            messages.append(_copy(message))
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, receive, send_wrapper)
+            completed = bool(messages) and not messages[-1].get("more_body", False)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            singleflight_requests.inc("leader")
+            flight.set_result((messages, scope.get("route")) if completed else None)
@@ -0,0 +1,502 @@
+"""Compilation du front statique et montage qui le sert.
+
+`python static_assets.py` lit les pages `*.html` de la racine et tout ce
+qu'elles référencent (feuilles de style, scripts et leurs `import`,
+images), puis écrit dans `STATIC_BUILD_DIR` (défaut `dist/`) :
+
+- CSS et JS minifiés (commentaires et blancs ; les sauts de ligne du JS
+  sont conservés, l'insertion automatique de `;` reste inchangée) ; les
+  `@import` CSS sans media sont intégrés à la feuille qui les importe ;
+- chaque fichier sous un nom empreinté (`style.3f9c0a1b2d.css`, empreinte
+  du contenu final, imports compris) et sous son nom d'origine, pour les
+  URL construites à l'exécution (`assets/company_logo_default.png`) ;
+- les références des pages, des `import` et des `url()` réécrites vers
+  les noms empreintés, plus un `<link rel="modulepreload">` par dépendance
+  des scripts modules (plus de cascade de requêtes) ;
+- des variantes `.gz` et `.br` (si le module `brotli` est installé) des
+  fichiers texte, gardées seulement si elles sont plus petites ;
+- `manifest.json` : nom d'origine -> nom empreinté.
+
+Le répertoire est reconstruit à côté puis échangé. `PrecompressedStaticFiles`
+sert les noms empreintés en cache immuable (un an), le reste en `no-cache`
+(revalidation par ETag), et choisit la variante compressée d'après
+`Accept-Encoding`.
+"""
+import argparse
+import gzip
+import hashlib
+import importlib.util
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import stat
+import sys
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+log = logging.getLogger("jobboard.static_assets")
+
+SOURCE_DIR = Path(__file__).resolve().parent
+BUILD_DIR = Path(os.getenv("STATIC_BUILD_DIR", "dist"))
+PREFIX = os.getenv("STATIC_PREFIX", "/site")
+ASSET_DIRS = ("assets",)
+HASH_LENGTH = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+COMPRESSIBLE = {".html", ".css", ".js", ".svg", ".json", ".txt"}
+# Ordre de préférence à q égal
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class BuildError(Exception):
+    pass
+
+
+# --------------------------------------------------------------------
+# Minification
+# --------------------------------------------------------------------
+# Après ces caractères ou mots, `/` ouvre une expression régulière et non une division
+_REGEX_AFTER_CHARS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_AFTER_WORDS = {
+    "return", "typeof", "case", "do", "else", "in", "of", "new", "delete",
+    "void", "throw", "instanceof", "yield", "await",
+}
+_WORD_TAIL = re.compile(r"[A-Za-z_$][\w$]*$")
+
+
+def _squeeze(code: str) -> str:
+    """Blancs de code : une ligne vide ou indentée devient un seul saut de ligne."""
+    return re.sub(r"\s+", lambda m: "\n" if "\n" in m.group() else " ", code)
+
+
+def minify_js(source: str) -> str:
+    """Retire commentaires et blancs sans toucher aux chaînes, gabarits ni expressions régulières."""
+    out: list[str] = []
+    code: list[str] = []
+    # Profondeur d'accolades de chaque `${` ouvert dans un gabarit
+    templates: list[int] = []
+    i, n = 0, len(source)
+
+    def fail(message: str, at: int):
+        raise BuildError(f"{message} (line {source.count(chr(10), 0, at) + 1})")
+
+    def flush():
+        if code:
+            out.append(_squeeze("".join(code)))
+            code.clear()
+
+    def previous_significant() -> str:
+        return ("".join(out[-3:]) + "".join(code)).rstrip()
+
+    def scan_template(start: int) -> int:
+        """Copie un morceau de gabarit (depuis '`' ou '}') jusqu'à '`' ou `${` inclus ; renvoie la position suivante."""
+        j = start + 1
+        while j < n:
+            c = source[j]
+            if c == "\\":
+                j += 2
+                continue
+            if c == "`":
+                out.append(source[start:j + 1])
+                return j + 1
+            if c == "$" and source.startswith("${", j):
+                out.append(source[start:j + 2])
+                templates.append(0)
+                return j + 2
+            j += 1
+        fail("unterminated template literal", start)
+
+    while i < n:
+        c = source[i]
+        if c in "\"'":
+            flush()
+            j = i + 1
+            while j < n and source[j] != c:
+                if source[j] == "\n":
+                    fail("unterminated string literal", i)
+                j += 2 if source[j] == "\\" else 1
+            out.append(source[i:j + 1])
+            i = j + 1
+        elif c == "`":
+            flush()
+            i = scan_template(i)
+        elif templates and c == "{":
+            templates[-1] += 1
+            code.append(c)
+            i += 1
+        elif templates and c == "}":
+            if templates[-1] == 0:
+                templates.pop()
+                flush()
+                i = scan_template(i)
+            else:
+                templates[-1] -= 1
+                code.append(c)
+                i += 1
+        elif source.startswith("//", i):
+            j = source.find("\n", i)
+            i = n if j < 0 else j
+        elif source.startswith("/*", i):
+            j = source.find("*/", i + 2)
+            if j < 0:
+                fail("unterminated comment", i)
+            code.append(" ")
+            i = j + 2
+        elif c == "/":
+            before = previous_significant()
+            word = _WORD_TAIL.search(before)
+            if not before or before[-1] in _REGEX_AFTER_CHARS or (word and word.group() in _REGEX_AFTER_WORDS):
+                flush()
+                j, in_class = i + 1, False
+                while j < n and (in_class or source[j] != "/"):
+                    if source[j] == "\n":
+                        fail("unterminated regular expression", i)
+                    if source[j] == "\\":
+                        j += 1
+                    elif source[j] == "[":
+                        in_class = True
+                    elif source[j] == "]":
+                        in_class = False
+                    j += 1
+                j += 1
+                while j < n and (source[j].isalnum() or source[j] == "_"):
+                    j += 1
+                out.append(source[i:j])
+                i = j
+            else:
+                code.append(c)
+                i += 1
+        else:
+            code.append(c)
+            i += 1
+    flush()
+    return "".join(out).strip() + "\n"
+
+
+def minify_css(source: str) -> str:
+    parts: list[str] = []
+    for token in re.split(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|/\*.*?\*/)", source, flags=re.S):
+        if token.startswith("/*"):
+            parts.append(" ")
+        elif token[:1] in ("'", '"'):
+            parts.append(token)
+        else:
+            # Pas de retrait autour de `:` : `a :hover` et `a:hover` ne désignent pas la même chose
+            token = re.sub(r"\s+", " ", token)
+            token = re.sub(r"\s*([{};,>])\s*", r"\1", token)
+            token = re.sub(r":\s+", ":", token)
+            parts.append(token.replace(";}", "}"))
+    return "".join(parts).strip() + "\n"
+
+
+# --------------------------------------------------------------------
+# Références
+# --------------------------------------------------------------------
+_HTML_RAW = re.compile(r"(<(script|style|pre|textarea)\b[^>]*>.*?</\2\s*>)", re.S | re.I)
+_HTML_ATTR = re.compile(r"""(\b(?:src|href)\s*=\s*)(["'])([^"']+)\2""", re.I)
+_HTML_MODULE = re.compile(r"""<script\b[^>]*\btype\s*=\s*["']module["'][^>]*\bsrc\s*=\s*["']([^"']+)["']""", re.I)
+_HTML_MODULE_ALT = re.compile(r"""<script\b[^>]*\bsrc\s*=\s*["']([^"']+)["'][^>]*\btype\s*=\s*["']module["']""", re.I)
+_JS_IMPORT = re.compile(r"""(\b(?:import|export)\b[^'";]*?\bfrom\s*|\bimport\s*\(?\s*)(["'])(\.{1,2}/[^"']+)\2""")
+_CSS_IMPORT = re.compile(r"""@import\s+(?:url\(\s*)?(["']?)([^"')\s]+)\1\s*\)?\s*;""")
+_CSS_URL = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""")
+
+
+def _is_local(url: str) -> bool:
+    return not re.match(r"^(?:[a-z][a-z0-9+.-]*:|//|#|/)", url, re.I) and "${" not in url
+
+
+def _resolve(from_rel: str, url: str) -> str:
+    """Chemin (relatif à la racine du site) d'une référence relative, sans requête ni fragment."""
+    path = re.split(r"[?#]", url, maxsplit=1)[0]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(from_rel), path))
+
+
+def _relative(from_rel: str, target_rel: str, module: bool = False) -> str:
+    rel = posixpath.relpath(target_rel, posixpath.dirname(from_rel) or ".")
+    # Un spécifiant d'import ES relatif doit commencer par ./ ou ../
+    if module and not rel.startswith("../"):
+        rel = "./" + rel
+    return rel
+
+
+def fingerprint(rel: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    root, ext = posixpath.splitext(rel)
+    return f"{root}.{digest}{ext}"
+
+
+class Builder:
+    def __init__(self, source_dir: Path = SOURCE_DIR):
+        self.source_dir = source_dir
+        # nom d'origine -> (nom empreinté, contenu)
+        self.outputs: dict[str, tuple[str, bytes]] = {}
+        # script -> scripts importés (nom d'origine)
+        self.imports: dict[str, set[str]] = {}
+        self._building: set[str] = set()
+
+    def exists(self, rel: str) -> bool:
+        return not rel.startswith("../") and (self.source_dir / rel).is_file()
+
+    def read(self, rel: str) -> str:
+        return (self.source_dir / rel).read_text(encoding="utf-8")
+
+    def asset(self, rel: str) -> str:
+        """Compile `rel` (et ses dépendances) ; renvoie son nom empreinté."""
+        if rel in self.outputs:
+            return self.outputs[rel][0]
+        if rel in self._building:
+            raise BuildError(f"circular reference through {rel}")
+        self._building.add(rel)
+        try:
+            ext = posixpath.splitext(rel)[1].lower()
+            if ext == ".js":
+                content = self.script(rel).encode()
+            elif ext == ".css":
+                content = minify_css(self.stylesheet(rel, rel, set())).encode()
+            else:
+                content = (self.source_dir / rel).read_bytes()
+        except (BuildError, UnicodeDecodeError) as e:
+            raise BuildError(f"{rel}: {e}") from e
+        finally:
+            self._building.discard(rel)
+        hashed = fingerprint(rel, content)
+        self.outputs[rel] = (hashed, content)
+        return hashed
+
+    def script(self, rel: str) -> str:
+        deps = self.imports.setdefault(rel, set())
+
+        def rewrite(m):
+            target = _resolve(rel, m.group(3))
+            if not self.exists(target):
+                return m.group()
+            deps.add(target)
+            return f"{m.group(1)}{m.group(2)}{_relative(rel, self.asset(target), module=True)}{m.group(2)}"
+
+        return _JS_IMPORT.sub(rewrite, minify_js(self.read(rel)))
+
+    def stylesheet(self, rel: str, out_rel: str, seen: set[str]) -> str:
+        """Feuille `rel` avec ses `@import` intégrés ; les `url()` sont relatives à `out_rel`."""
+        if rel in seen:
+            raise BuildError(f"circular @import through {rel}")
+        seen = seen | {rel}
+        source = self.read(rel)
+
+        def inline(m):
+            target = _resolve(rel, m.group(2))
+            if not _is_local(m.group(2)) or not self.exists(target) or not target.endswith(".css"):
+                return m.group()
+            return self.stylesheet(target, out_rel, seen)
+
+        def url(m):
+            target = _resolve(rel, m.group(2))
+            if not _is_local(m.group(2)) or not self.exists(target):
+                return m.group()
+            return f'url("{_relative(out_rel, self.asset(target))}")'
+
+        # Seuls les @import sans liste de media sont intégrés ; les autres restent des url() réécrites
+        source = _CSS_IMPORT.sub(inline, source)
+        return _CSS_URL.sub(url, source)
+
+    def page(self, rel: str) -> str:
+        html = self.read(rel)
+        entries: list[str] = []
+
+        def attr(m):
+            target = _resolve(rel, m.group(3))
+            if not _is_local(m.group(3)) or not self.exists(target) or target.endswith(".html"):
+                return m.group()
+            return f"{m.group(1)}{m.group(2)}{_relative(rel, self.asset(target))}{m.group(2)}"
+
+        parts = _HTML_RAW.split(html)
+        # split avec deux groupes : texte, bloc brut, nom de balise, texte, ...
+        for k in range(0, len(parts), 3):
+            text = re.sub(r"<!--(?!\[if).*?-->", "", parts[k], flags=re.S)
+            text = re.sub(r"\n[ \t]+", "\n", text)
+            parts[k] = _HTML_ATTR.sub(attr, text)
+        for k in range(1, len(parts), 3):
+            block = parts[k]
+            opening = block[:block.index(">") + 1]
+            parts[k] = _HTML_ATTR.sub(attr, opening) + block[len(opening):]
+            parts[k + 1] = ""
+        html = "".join(parts)
+
+        for pattern in (_HTML_MODULE, _HTML_MODULE_ALT):
+            entries.extend(_resolve(rel, src) for src in pattern.findall(self.read(rel)) if _is_local(src))
+        preload = []
+        for dep in self.module_graph(entries):
+            if dep not in entries and dep in self.outputs:
+                preload.append(f'<link rel="modulepreload" href="{_relative(rel, self.outputs[dep][0])}">')
+        if preload and "</head>" in html:
+            html = html.replace("</head>", "\n".join(preload) + "\n</head>", 1)
+        return html
+
+    def module_graph(self, entries: list[str]) -> list[str]:
+        seen: list[str] = []
+        stack = [e for e in entries if e in self.imports]
+        while stack:
+            current = stack.pop()
+            for dep in sorted(self.imports.get(current, ())):
+                if dep not in seen:
+                    seen.append(dep)
+                    stack.append(dep)
+        return seen
+
+
+# --------------------------------------------------------------------
+# Écriture
+# --------------------------------------------------------------------
+def _brotli():
+    if importlib.util.find_spec("brotli") is None:
+        log.warning("brotli is not installed, only .gz variants are written")
+        return None
+    import brotli
+
+    return brotli
+
+
+def _write(path: Path, content: bytes, brotli) -> dict:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    sizes = {"raw": len(content)}
+    if path.suffix.lower() not in COMPRESSIBLE:
+        return sizes
+    variants = [("gz", gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(("br", brotli.compress(content, quality=11)))
+    for suffix, data in variants:
+        if len(data) < len(content):
+            path.with_name(path.name + "." + suffix).write_bytes(data)
+            sizes[suffix] = len(data)
+    return sizes
+
+
+def build(out_dir: Path = BUILD_DIR, source_dir: Path = SOURCE_DIR) -> dict:
+    builder = Builder(source_dir)
+    pages = {p.name: builder.page(p.name) for p in sorted(source_dir.glob("*.html"))}
+    for directory in ASSET_DIRS:
+        for path in sorted((source_dir / directory).rglob("*")):
+            if path.is_file() and ":" not in path.name:
+                builder.asset(path.relative_to(source_dir).as_posix())
+
+    brotli = _brotli()
+    staging = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    totals = {"pages": len(pages), "assets": len(builder.outputs), "raw": 0, "gz": 0, "br": 0}
+
+    def account(sizes: dict):
+        totals["raw"] += sizes["raw"]
+        for key in ("gz", "br"):
+            totals[key] += sizes.get(key, sizes["raw"])
+
+    for name, html in pages.items():
+        account(_write(staging / name, html.encode(), brotli))
+    manifest = {}
+    for rel, (hashed, content) in sorted(builder.outputs.items()):
+        account(_write(staging / hashed, content, brotli))
+        _write(staging / rel, content, brotli)
+        manifest[rel] = hashed
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+    # Échange : l'ancien répertoire n'est retiré qu'une fois le nouveau en place
+    previous = out_dir.with_name(out_dir.name + ".old")
+    shutil.rmtree(previous, ignore_errors=True)
+    if out_dir.exists():
+        out_dir.rename(previous)
+    staging.rename(out_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+    if brotli is None:
+        totals.pop("br")
+    return totals
+
+
+# --------------------------------------------------------------------
+# Montage
+# --------------------------------------------------------------------
+def accepted_encodings(header: str | None) -> list[str]:
+    """Encodages acceptés par le client, du préféré au moins préféré (q=0 exclus)."""
+    weights = {}
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        m = re.search(r"q\s*=\s*([0-9.]+)", params)
+        if m:
+            try:
+                q = float(m.group(1))
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+    order = [name for name, _ in ENCODINGS]
+    candidates = [
+        name for name in order
+        if weights.get(name, weights.get("*", 0.0)) > 0
+    ]
+    return sorted(candidates, key=lambda name: (-weights.get(name, weights.get("*", 0.0)), order.index(name)))
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles qui sert les variantes `.br`/`.gz` compilées et pose les en-têtes de cache."""
+
+    def __init__(self, *, directory: str, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        try:
+            with open(Path(directory) / "manifest.json") as f:
+                self.immutable = set(json.load(f).values())
+        except (OSError, ValueError):
+            self.immutable = set()
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        full_path = str(full_path)
+        rel = Path(full_path).relative_to(Path(self.directory).resolve()).as_posix()
+        headers = {
+            "Cache-Control": IMMUTABLE if rel in self.immutable else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        request_headers = Headers(scope=scope)
+        path, encoding = full_path, None
+        if Path(full_path).suffix.lower() in COMPRESSIBLE:
+            for name in accepted_encodings(request_headers.get("accept-encoding")):
+                suffix = dict(ENCODINGS)[name]
+                try:
+                    variant_stat = os.stat(full_path + suffix)
+                except OSError:
+                    continue
+                if stat.S_ISREG(variant_stat.st_mode):
+                    path, stat_result, encoding = full_path + suffix, variant_stat, name
+                    break
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        response = FileResponse(
+            path, status_code=status_code, stat_result=stat_result, media_type=media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, default=BUILD_DIR, help="répertoire de sortie")
+    args = parser.parse_args(argv)
+    try:
+        totals = build(args.out)
+    except BuildError as e:
+        print(f"build failed: {e}", file=sys.stderr)
+        return 1
+    for key, value in totals.items():
+        print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Fixtures communes.
+
+`mysql_conn` ouvre une connexion sur la base décrite par `.env` (`DB_*`) ;
+les tests qui l'utilisent sont ignorés sans base joignable. Tout ce qu'ils
+écrivent est annulé (rollback) à la fin.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mysql.connector  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+from mysql.connector import Error  # noqa: E402
+
+from db import db_config_from_env  # noqa: E402
+
+
+@pytest.fixture
+def db_config():
+    load_dotenv()
+    config = db_config_from_env()
+    try:
+        conn = mysql.connector.connect(**config)
+    except (Error, TypeError) as e:
+        pytest.skip(f"MySQL indisponible: {e}")
+    conn.close()
+    return config
+
+
+@pytest.fixture
+def mysql_conn(db_config):
+    conn = mysql.connector.connect(**db_config)
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        conn.close()
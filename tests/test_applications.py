@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mysql.connector.constants import ClientFlag
+
+import query_log
+from applications_routes import create_applications_router
+from db import InstrumentedConnection, db_config_from_env
+
+CONTEXT = {
+    "id": 5,
+    "title": "Testeur",
+    "location": "Lyon",
+    "company_id": 2,
+    "company_name": "Digest SA",
+    "company_owner_id": 9,
+    "profile_user_id": 1,
+    "first_name": "Ada",
+    "last_name": "Lovelace",
+    "contact_email": "ada@test",
+    "phone": None,
+    "cv_url": "/uploads/cv.pdf",
+    "now": datetime(2026, 1, 1),
+}
+
+
+class FakeCursor:
+    """Curseur sans serveur : chaque `execute` compte pour un aller-retour."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.with_rows = False
+        self.rowcount = 1
+        self.lastrowid = 42
+
+    def execute(self, operation, params=None, **kwargs):
+        self.conn.round_trips.append(operation)
+        self.with_rows = operation.lstrip().upper().startswith("SELECT")
+
+    def fetchone(self):
+        return dict(CONTEXT)
+
+    def nextset(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.round_trips = []
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+
+def test_multi_statements_flag_is_explicit():
+    assert ClientFlag.MULTI_STATEMENTS in db_config_from_env()["client_flags"]
+
+
+def test_apply_stays_within_two_round_trips(monkeypatch):
+    conn = FakeConnection()
+    traces = []
+    monkeypatch.setattr(query_log.QUERY_LOG, "observe", lambda route, method, trace: traces.append(trace))
+
+    app = FastAPI()
+    app.include_router(
+        create_applications_router(lambda: InstrumentedConnection(conn), lambda: {"id": 1, "role": "user"})
+    )
+    client = TestClient(query_log.QueryTraceMiddleware(app))
+    response = client.post("/api/applications", json={"job_id": 5, "message": "Bonjour"})
+
+    assert response.status_code == 201, response.text
+    assert response.json()["id"] == 42
+    assert len(conn.round_trips) == 2
+    # Candidature, notification, compteur et invalidation dans le même lot
+    assert conn.round_trips[1].count(";") == 4
+    # Authentification comprise (hors de ce test), le budget de la route tient
+    (trace,) = traces
+    assert len(trace.entries) + 1 <= trace.budget == 3
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+
+import bulkheads
+
+
+def test_slow_dependency_exit_keeps_its_slot(monkeypatch):
+    monkeypatch.setitem(bulkheads.BULKHEADS, "recruiter", bulkheads.Bulkhead("recruiter", 2, 16))
+    busy = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def slow_db():
+        # Comme get_db : connexion prise à l'entrée, commit lent à la sortie, après la réponse
+        with lock:
+            busy["now"] += 1
+            busy["max"] = max(busy["max"], busy["now"])
+        try:
+            yield None
+            time.sleep(0.1)
+        finally:
+            with lock:
+                busy["now"] -= 1
+
+    router = APIRouter(route_class=bulkheads.bulkhead_route("recruiter"))
+
+    @router.delete("/api/companies/{company_id}")
+    def delete_company(company_id: int, db=Depends(slow_db)):
+        return {"id": company_id}
+
+    app = FastAPI()
+    app.include_router(router)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.delete(f"/api/companies/{i}") for i in range(6)))
+
+    responses = asyncio.run(burst())
+    assert [r.status_code for r in responses] == [200] * 6
+    # Jamais plus de threads/connexions que de places dans la cloison
+    assert busy["max"] == 2
+
+
+def test_full_queue_is_rejected_with_503(monkeypatch):
+    monkeypatch.setitem(bulkheads.BULKHEADS, "admin", bulkheads.Bulkhead("admin", 1, 0))
+    router = APIRouter(route_class=bulkheads.bulkhead_route("admin"))
+
+    @router.get("/api/admin/slow")
+    def slow():
+        time.sleep(0.2)
+        return {}
+
+    app = FastAPI()
+    app.include_router(router)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.ensure_future(client.get("/api/admin/slow"))
+            # Le premier tient la place
+            await asyncio.sleep(0.05)
+            return [await client.get("/api/admin/slow"), await first]
+
+    statuses = sorted(r.status_code for r in asyncio.run(burst()))
+    assert statuses == [200, 503]
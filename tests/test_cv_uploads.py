@@ -0,0 +1,36 @@
+import threading
+import time
+
+import cv_uploads
+
+
+def test_concurrent_creates_never_exceed_the_session_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(cv_uploads, "TMP_DIR", tmp_path)
+    monkeypatch.setattr(cv_uploads, "MAX_SESSIONS", 3)
+    expired = cv_uploads._expired
+
+    def slow_expired(path, now):
+        # Élargit la fenêtre entre le comptage et la création
+        time.sleep(0.01)
+        return expired(path, now)
+
+    monkeypatch.setattr(cv_uploads, "_expired", slow_expired)
+    start = threading.Barrier(12)
+    results = []
+
+    def create():
+        start.wait()
+        try:
+            cv_uploads.create(7, 1024)
+            results.append(201)
+        except cv_uploads.UploadError as e:
+            results.append(e.status_code)
+
+    threads = [threading.Thread(target=create) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [201] * 3 + [429] * 9
+    assert len(list((tmp_path / "7").iterdir())) == 3
@@ -0,0 +1,140 @@
+"""Routage de main.app entre un primaire et sa réplique réels.
+
+Ignorés sans `DB_REPLICA_HOST` dans `.env` ou si l'un des deux serveurs est
+injoignable ; la réplique doit répliquer le primaire avec `gtid_mode=ON`.
+"""
+import os
+import queue
+from urllib.parse import quote, unquote
+
+import mysql.connector
+import pytest
+from fastapi.testclient import TestClient
+from mysql.connector import Error
+
+import db
+import db_routing
+
+
+def _record(monkeypatch, pool, served):
+    acquire = pool.acquire
+
+    def recorded(*args, **kwargs):
+        conn = acquire(*args, **kwargs)
+        served.append(pool.name)
+        return conn
+
+    monkeypatch.setattr(pool, "acquire", recorded)
+
+
+@pytest.fixture
+def routed(db_config, monkeypatch):
+    """main.app avec les pools de `DB_*` et `DB_REPLICA_*` ; `served` liste les pools utilisés."""
+    if not os.getenv("DB_REPLICA_HOST"):
+        pytest.skip("DB_REPLICA_HOST non défini")
+    try:
+        mysql.connector.connect(**db.db_config_from_env("DB_REPLICA_")).close()
+    except (Error, TypeError) as e:
+        pytest.skip(f"Réplique MySQL indisponible: {e}")
+
+    import main
+
+    primary, replica = db.pool_from_env("primary"), db.replica_pool_from_env()
+    monkeypatch.setattr(main, "db_pool", primary)
+    monkeypatch.setattr(main, "replica_pool", replica)
+    served = []
+    _record(monkeypatch, primary, served)
+    _record(monkeypatch, replica, served)
+
+    conn = mysql.connector.connect(**db_config)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT email FROM users WHERE role = 'admin' AND deleted_at IS NULL LIMIT 1")
+            admin = cur.fetchone()
+            cur.execute(
+                """
+                SELECT j.id, j.title
+                FROM jobs j
+                JOIN companies c ON c.id = j.company_id AND c.deleted_at IS NULL
+                ORDER BY j.id
+                LIMIT 1
+                """
+            )
+            job = cur.fetchone()
+            cur.execute("SELECT @@server_uuid")
+            (server_uuid,) = cur.fetchone()
+    finally:
+        conn.close()
+    if admin is None or job is None:
+        pytest.skip("base sans admin ni offre (charger data/jobboard_demo.sql)")
+
+    client = TestClient(main.app)
+    token = main.create_access_token({"sub": admin[0]})
+    try:
+        yield {
+            "client": client,
+            "auth": {"Authorization": f"Bearer {token}"},
+            "job": job,
+            "server_uuid": server_uuid,
+            "primary": primary,
+            "replica": replica,
+            "served": served,
+        }
+    finally:
+        for pool in (primary, replica):
+            while True:
+                try:
+                    conn, _ = pool._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+
+
+def test_write_then_read_waits_for_its_gtid_on_the_replica(routed):
+    client, served = routed["client"], routed["served"]
+    job_id, title = routed["job"]
+    try:
+        response = client.patch(f"/api/jobs/{job_id}", json={"title": f"{title} *"}, headers=routed["auth"])
+        assert response.status_code == 200
+        # get_db ne lit pas la réplique et capture les GTID du primaire après son commit
+        assert served == ["primary"]
+        gtid = unquote(client.cookies[db_routing.GTID_COOKIE_NAME])
+        assert routed["server_uuid"] in gtid
+        assert db_routing.COOKIE_NAME not in client.cookies
+
+        served.clear()
+        response = client.get(f"/api/jobs/{job_id}")
+        assert response.json()["title"] == f"{title} *"
+        assert served == ["replica"]
+    finally:
+        client.patch(f"/api/jobs/{job_id}", json={"title": title}, headers=routed["auth"])
+    assert routed["primary"].stats()["in_use"] == routed["replica"].stats()["in_use"] == 0
+
+
+def test_lagging_replica_is_released_and_the_primary_answers(routed, monkeypatch):
+    client, served = routed["client"], routed["served"]
+    monkeypatch.setattr(db_routing, "GTID_WAIT_SECONDS", 0.2)
+    # Transaction que la réplique n'appliquera jamais dans le délai
+    client.cookies.set(db_routing.GTID_COOKIE_NAME, quote(f"{routed['server_uuid']}:1-{2 ** 62}", safe=""))
+
+    response = client.get(f"/api/jobs/{routed['job'][0]}")
+    assert response.status_code == 200
+    assert served == ["replica", "primary"]
+    replica = routed["replica"].stats()
+    # Rendue au pool, pas gardée ni fermée
+    assert (replica["in_use"], replica["idle"]) == (0, 1)
+
+
+def test_exhausted_replica_pool_falls_back_to_the_primary(routed, monkeypatch):
+    client, served, replica = routed["client"], routed["served"], routed["replica"]
+    held = [replica.acquire() for _ in range(replica.size)]
+    monkeypatch.setattr(replica, "timeout", 0.1)
+    served.clear()
+    try:
+        response = client.get(f"/api/jobs/{routed['job'][0]}")
+    finally:
+        for conn in held:
+            replica.release(conn)
+    assert response.status_code == 200
+    # PoolError à l'acquisition : la requête passe sur le primaire
+    assert served == ["primary"]
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+
+import invalidation
+from db import ConnectionPool
+
+MARKER = "test:ping"
+WORKERS = 4
+EVENTS = 50
+# Un poll pour voir l'événement, un autre de marge, plus la latence des requêtes
+MAX_DELAY_MS = invalidation.POLL_SECONDS * 1000 * 2 + 250
+
+
+def test_every_worker_applies_every_event_within_the_bound(db_config):
+    # Un bus et un pool par worker, comme N workers uvicorn qui relisent chacun la table
+    received: dict[tuple[int, int], float] = {}
+    lock = threading.Lock()
+    buses = []
+    for index in range(WORKERS):
+        bus = invalidation.InvalidationBus()
+
+        def on_event(event, index=index):
+            with lock:
+                received.setdefault((index, event.entity_id), time.time())
+
+        bus.subscribe(MARKER, on_event)
+        bus.start(ConnectionPool(f"worker-{index}", db_config, size=1))
+        buses.append(bus)
+
+    conn = mysql.connector.connect(**db_config)
+    base = os.getpid() * 1000
+    published: dict[int, float] = {}
+    try:
+        # Laisse chaque poller lire son point de départ
+        time.sleep(invalidation.POLL_SECONDS * 2)
+        with conn.cursor() as cur:
+            for i in range(EVENTS):
+                cur.execute(invalidation.INSERT_SQL, (MARKER, base + i))
+                conn.commit()
+                published[base + i] = time.time()
+                time.sleep(0.01)
+
+        expected = {(index, entity_id) for index in range(WORKERS) for entity_id in published}
+        deadline = time.time() + MAX_DELAY_MS / 1000 + 5
+        while time.time() < deadline:
+            with lock:
+                if expected <= received.keys():
+                    break
+            time.sleep(0.05)
+    finally:
+        for bus in buses:
+            bus.stop()
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM cache_invalidations WHERE kind = %s", (MARKER,))
+        conn.commit()
+        conn.close()
+
+    assert expected - received.keys() == set()
+    worst = max((received[key] - published[key[1]]) * 1000 for key in expected)
+    assert worst <= MAX_DELAY_MS
+
+
+class FakeCursor:
+    with_rows = False
+    rowcount = 1
+
+    def execute(self, operation, params=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.committed = False
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor()
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self, timeout=None):
+        return self.conn
+
+    def release(self, conn, discard=False):
+        pass
+
+
+def test_writer_applies_its_event_only_after_commit(monkeypatch):
+    import main
+
+    bus = invalidation.InvalidationBus()
+    monkeypatch.setattr(invalidation, "BUS", bus)
+    conn = FakeConnection()
+    seen = []
+    bus.subscribe(MARKER, lambda event: seen.append((conn.committed, event.entity_id)))
+    session = contextmanager(main.get_db)
+
+    monkeypatch.setattr(main, "db_pool", FakePool(conn))
+    with session() as db:
+        invalidation.publish(db, MARKER, 1)
+        assert seen == []
+    assert seen == [(True, 1)]
+
+    seen.clear()
+    monkeypatch.setattr(main, "db_pool", FakePool(FakeConnection()))
+    try:
+        with session() as db:
+            invalidation.publish(db, MARKER, 2)
+            raise RuntimeError("rollback")
+    except RuntimeError:
+        pass
+    assert seen == []
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import notification_digests
+
+
+def _insert(cur, sql: str, params=()) -> int:
+    cur.execute(sql, params)
+    return cur.lastrowid
+
+
+def test_grouped_row_is_not_tied_to_one_application():
+    assert "@application_id" not in notification_digests.APPLICATION_SQL
+    assert "application_id = " not in notification_digests.APPLICATION_SQL
+
+
+def test_deleting_one_application_keeps_the_digest(mysql_conn):
+    now = datetime.now().replace(microsecond=0)
+    cur = mysql_conn.cursor()
+    owner = _insert(cur, "INSERT INTO users (email, password_hash, role) VALUES ('digest.owner@test', 'x', 'recruiter')")
+    company = _insert(cur, "INSERT INTO companies (created_by, name) VALUES (%s, 'Digest SA')", (owner,))
+    job = _insert(cur, "INSERT INTO jobs (company_id, title) VALUES (%s, 'Testeur')", (company,))
+    applications = []
+    for i in range(3):
+        user = _insert(cur, "INSERT INTO users (email, password_hash) VALUES (%s, 'x')", (f"digest.{i}@test",))
+        applications.append(
+            _insert(cur, "INSERT INTO applications (job_id, user_id) VALUES (%s, %s)", (job, user))
+        )
+        cur.execute(
+            notification_digests.APPLICATION_SQL,
+            notification_digests.application_params(owner, job, "Testeur", f"Candidat {i}", now),
+        )
+
+    cur.execute("DELETE FROM applications WHERE id = %s", (applications[-1],))
+
+    cur.execute(
+        "SELECT event_count, application_id, job_id FROM notifications WHERE recipient_user_id = %s",
+        (owner,),
+    )
+    assert cur.fetchall() == [(3, None, job)]
@@ -0,0 +1,161 @@
+import pytest
+from mysql.connector.connection import MySQLConnection
+from mysql.connector.errors import ProgrammingError
+
+import db
+
+
+class FakeConnection(MySQLConnection):
+    """Connexion Python sans serveur : journalise les commandes d'instructions préparées."""
+
+    charset = "utf8mb4"
+    connection_id = 7
+
+    def __init__(self):
+        self._get_warnings = False
+        self._raise_on_warnings = False
+        self._unread_result = False
+        self._consume_results = False
+        self.commands = []
+
+    def is_connected(self):
+        return True
+
+    def cmd_stmt_prepare(self, statement, **kwargs):
+        self.commands.append("prepare")
+        return {"statement_id": 1, "parameters": [object()], "columns": []}
+
+    def cmd_stmt_reset(self, statement_id, **kwargs):
+        self.commands.append("reset")
+
+    def cmd_stmt_execute(self, statement_id, data=(), parameters=(), **kwargs):
+        self.commands.append("execute")
+        return {"status_flag": 0, "affected_rows": 1, "insert_id": 0, "warning_count": 0}
+
+    def cmd_stmt_close(self, statement_id, **kwargs):
+        self.commands.append("close")
+
+
+SQL = "UPDATE users SET role = role WHERE id = %s"
+
+
+def test_reexecution_skips_stmt_reset():
+    conn = FakeConnection()
+    cache = db.StatementCache()
+    for user_id in (1, 2, 3):
+        cache.execute(conn, SQL, (user_id,), False)
+    assert conn.commands == ["prepare", "reset", "execute", "execute", "execute"]
+
+
+def test_reexecution_checks_argument_count():
+    conn = FakeConnection()
+    cache = db.StatementCache()
+    cache.execute(conn, SQL, (1,), False)
+    with pytest.raises(ProgrammingError):
+        cache.execute(conn, SQL, (1, 2), False)
+
+
+def test_executemany_uses_a_plain_cursor(monkeypatch):
+    conn = FakeConnection()
+    batches = []
+
+    class PlainCursor:
+        def executemany(self, operation, seq_params):
+            batches.append((operation, list(seq_params)))
+
+        def close(self):
+            batches.append("closed")
+
+    monkeypatch.setattr(conn, "cursor", lambda dictionary=False: PlainCursor(), raising=False)
+    cur = db.PreparedCursor(conn, dictionary=False)
+    cur.executemany(SQL, [(1,), (2,)])
+    cur.close()
+    assert batches == [(SQL, [(1,), (2,)]), "closed"]
+    assert conn.commands == []
+
+
+# --------------------------------------------------------------------
+# Extension C (chemin de production), contre un vrai serveur
+# --------------------------------------------------------------------
+TABLE_SQL = "CREATE TEMPORARY TABLE prepared_probe (id INT AUTO_INCREMENT PRIMARY KEY, label VARCHAR(20))"
+INSERT_SQL = "INSERT INTO prepared_probe (label) VALUES (%s)"
+SELECT_SQL = "SELECT id, label FROM prepared_probe WHERE id <= %s ORDER BY id"
+
+
+@pytest.fixture
+def cext_conn(db_config):
+    import mysql.connector
+
+    if db.CMySQLConnection is None:
+        pytest.skip("extension C de mysql-connector indisponible")
+    conn = mysql.connector.connect(**db_config, use_pure=False)
+    assert isinstance(conn, db.CMySQLConnection)
+    with conn.cursor() as cur:
+        cur.execute(TABLE_SQL)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _run(conn, operation, params, dictionary=False):
+    cur = db.PreparedCursor(conn, dictionary)
+    cur.execute(operation, params)
+    rows = cur.fetchall() if cur.with_rows else None
+    result = (cur._cur, rows, cur.rowcount, cur.lastrowid)
+    cur.close()
+    return result
+
+
+def test_cext_statement_is_reused_with_rows_rowcount_and_lastrowid(cext_conn):
+    ids = []
+    for label in ("a", "b", "c"):
+        cur, rows, rowcount, lastrowid = _run(cext_conn, INSERT_SQL, (label,))
+        assert isinstance(cur, db.CReusedPreparedCursor)
+        assert (rows, rowcount) == (None, 1)
+        ids.append(lastrowid)
+    assert ids[1:] == [ids[0] + 1, ids[0] + 2]
+    # Une seule préparation par texte SQL : même curseur d'une exécution à l'autre
+    assert len(db.statement_cache(cext_conn)) == 1
+
+    for limit, dictionary in ((ids[1], False), (ids[2], False), (ids[2], True), (ids[0], True)):
+        cur, rows, rowcount, _ = _run(cext_conn, SELECT_SQL, (limit,), dictionary)
+        expected = [(i, label) for i, label in zip(ids, "abc") if i <= limit]
+        if dictionary:
+            assert isinstance(cur, db.CReusedPreparedDictCursor)
+            expected = [{"id": i, "label": label} for i, label in expected]
+        else:
+            assert isinstance(cur, db.CReusedPreparedCursor)
+        assert rows == expected
+        assert rowcount == len(expected)
+    assert len(db.statement_cache(cext_conn)) == 3
+
+
+def test_cext_statement_is_reprepared_after_kill_and_reconnect(cext_conn, db_config):
+    import mysql.connector
+
+    _run(cext_conn, INSERT_SQL, ("before",))
+    old_session = cext_conn.connection_id
+
+    killer = mysql.connector.connect(**db_config)
+    try:
+        with killer.cursor() as cur:
+            cur.execute(f"KILL {int(old_session)}")
+    finally:
+        killer.close()
+
+    # Session tuée : l'erreur de connexion remonte (le pool écarte la connexion)
+    with pytest.raises(db.Error):
+        _run(cext_conn, INSERT_SQL, ("killed",))
+
+    # Reconnexion (ping du pool) : nouvelle session, instructions et table temporaire perdues
+    cext_conn.reconnect()
+    assert cext_conn.connection_id != old_session
+    with cext_conn.cursor() as cur:
+        cur.execute(TABLE_SQL)
+    for label in ("after", "again"):
+        cur, rows, rowcount, lastrowid = _run(cext_conn, INSERT_SQL, (label,))
+        assert isinstance(cur, db.CReusedPreparedCursor)
+        assert (rowcount, lastrowid > 0) == (1, True)
+    _, rows, _, _ = _run(cext_conn, SELECT_SQL, (lastrowid,))
+    assert [label for _, label in rows] == ["after", "again"]
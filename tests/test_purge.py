@@ -0,0 +1,28 @@
+from mysql.connector import Error
+
+import purge
+
+
+def test_retry_delay_doubles_and_is_capped():
+    delays = [purge.retry_delay(attempt) for attempt in range(1, 5)]
+    assert delays == [purge.RETRY_BASE_SECONDS * 2 ** i for i in range(4)]
+    assert purge.retry_delay(100) == purge.RETRY_MAX_SECONDS
+
+
+def test_failed_batch_is_not_claimed_before_its_retry(mysql_conn):
+    cur = mysql_conn.cursor(dictionary=True)
+    cur.execute("INSERT INTO purge_jobs (entity, entity_id, status) VALUES ('company', 2147483000, 'pending')")
+    job_id = cur.lastrowid
+    # _record_failure valide sa transaction : la tâche de test est supprimée à la fin
+    try:
+        purge.PurgeWorker()._record_failure(
+            mysql_conn, {"id": job_id, "entity": "company", "entity_id": 2147483000, "attempts": 0}, Error("boom")
+        )
+        cur.execute("SELECT status, attempts, next_attempt_at > NOW() AS waiting FROM purge_jobs WHERE id = %s", (job_id,))
+        assert cur.fetchone() == {"status": "running", "attempts": 1, "waiting": 1}
+        cur.execute(purge.CLAIM_SQL.replace("LIMIT 1", ""))
+        assert job_id not in [row["id"] for row in cur.fetchall()]
+        mysql_conn.rollback()
+    finally:
+        cur.execute("DELETE FROM purge_jobs WHERE id = %s", (job_id,))
+        mysql_conn.commit()
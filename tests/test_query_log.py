@@ -0,0 +1,124 @@
+import logging
+from contextlib import contextmanager
+
+import pytest
+from mysql.connector import errorcode
+from mysql.connector.errors import DatabaseError, OperationalError, ProgrammingError
+
+import query_log
+from db import InstrumentedConnection
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.with_rows = False
+        self.rowcount = 1
+
+    def execute(self, operation, params=None):
+        if operation is query_log.ROWS_EXAMINED_SQL and self.conn.error is not None:
+            raise self.conn.error
+        self.conn.statements.append("probe" if operation is query_log.ROWS_EXAMINED_SQL else operation)
+
+    def fetchone(self):
+        return (self.conn.examined,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, examined=0, error=None):
+        self.examined = examined
+        self.error = error
+        self.statements = []
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+
+def test_rows_examined_is_read_once_the_cursor_is_done(monkeypatch):
+    monkeypatch.setattr(query_log, "ROWS_EXAMINED", True)
+    conn = FakeConnection(examined=1200)
+    db = InstrumentedConnection(conn)
+    with db.cursor() as cur:
+        cur.execute("UPDATE jobs SET title = %s WHERE id = %s", ("x", 1))
+        # Un lot multi-requêtes peut encore avoir des résultats en attente
+        assert conn.statements == ["UPDATE jobs SET title = %s WHERE id = %s"]
+        entry = cur._entry
+    assert conn.statements[-1] == "probe"
+    assert (entry.rows, entry.rows_examined) == (1, 1200)
+
+
+def test_rows_examined_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(query_log, "ROWS_EXAMINED", False)
+    conn = FakeConnection()
+    with InstrumentedConnection(conn).cursor() as cur:
+        cur.execute("DELETE FROM notifications WHERE id = %s", (1,))
+        entry = cur._entry
+    assert conn.statements == ["DELETE FROM notifications WHERE id = %s"]
+    assert entry.rows_examined is None
+
+
+def test_missing_performance_schema_disables_the_probe(monkeypatch):
+    monkeypatch.setattr(query_log, "ROWS_EXAMINED", True)
+    error = ProgrammingError(errno=errorcode.ER_TABLEACCESS_DENIED_ERROR, msg="denied")
+    with InstrumentedConnection(FakeConnection(error=error)).cursor() as cur:
+        cur.execute("SELECT 1")
+    assert query_log.ROWS_EXAMINED is False
+
+
+def test_other_probe_errors_are_logged_once_per_interval(monkeypatch, caplog):
+    monkeypatch.setattr(query_log, "ROWS_EXAMINED", True)
+    monkeypatch.setattr(query_log, "_examine_warned_at", float("-inf"))
+    monkeypatch.setattr(query_log, "_examine_failures", 0)
+    error = DatabaseError(errno=errorcode.ER_QUERY_TIMEOUT, msg="timeout")
+    db = InstrumentedConnection(FakeConnection(error=error))
+    with caplog.at_level(logging.WARNING, logger="jobboard.sql"):
+        for _ in range(3):
+            with db.cursor() as cur:
+                cur.execute("SELECT 1")
+    assert [r.getMessage() for r in caplog.records] == ["rows examined probe failed (1 in the last 60s): 3024: timeout"]
+    assert query_log.ROWS_EXAMINED is True
+    assert query_log._examine_failures == 2
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+        self.discarded = None
+
+    def acquire(self, timeout=None):
+        return self.conn
+
+    def release(self, conn, discard=False):
+        self.discarded = discard
+
+
+def test_lost_connection_during_the_probe_discards_it(monkeypatch):
+    import main
+
+    monkeypatch.setattr(query_log, "ROWS_EXAMINED", True)
+    error = OperationalError(errno=errorcode.CR_SERVER_LOST, msg="lost")
+    pool = FakePool(FakeConnection(error=error))
+    monkeypatch.setattr(main, "db_pool", pool)
+    with pytest.raises(OperationalError):
+        with contextmanager(main.get_db)() as db:
+            with db.cursor() as cur:
+                cur.execute("SELECT 1")
+    assert pool.discarded is True
+
+
+def test_fingerprint_stats_sum_rows_examined():
+    log = query_log.QueryLog()
+    trace = query_log.RequestTrace()
+    for examined in (10, 30):
+        entry = query_log.QueryEntry("select ? from jobs", 0.001, 1)
+        entry.rows_examined = examined
+        trace.entries.append(entry)
+    log.observe("/api/jobs", "GET", trace)
+    (stats,) = log.snapshot()["top_fingerprints"]
+    assert (stats["rows"], stats["rows_examined"]) == (2, 40)
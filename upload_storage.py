@@ -0,0 +1,272 @@
+"""Rangement des fichiers téléversés et ramassage des fichiers orphelins.
+
+Disposition : `uploads/ab/cd/<nom>`, où `abcd` sont les 4 premiers
+caractères hexadécimaux du SHA-1 du nom ; aucun répertoire ne dépasse
+quelques centaines d'entrées. Les URL (`/uploads/ab/cd/<nom>`) restent
+servies par le même montage statique.
+
+`python upload_storage.py migrate` range les fichiers de l'ancienne
+disposition plate : lien dur vers le nouvel emplacement, réécriture des
+URL en base par lots, puis suppression de l'ancien nom (relançable).
+
+Le ramasse-miettes parcourt les fichiers plus vieux que
+`UPLOAD_GC_MIN_AGE_HOURS` (un fichier tout juste téléversé n'est pas
+encore enregistré dans un profil), les compare aux URL référencées en
+base et supprime les orphelins par lots espacés. Un seul worker à la fois
+(verrou nommé MySQL). `UPLOAD_GC_DRY_RUN=1` (défaut) ne fait que le
+rapport : `GET /api/admin/uploads/orphans` ou
+`python upload_storage.py gc --dry-run`.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+from mysql.connector import Error
+
+import observability
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "uploads"))
+
+GC_ENABLED = os.getenv("UPLOAD_GC_ENABLED", "1") not in ("0", "false", "no")
+GC_DRY_RUN = os.getenv("UPLOAD_GC_DRY_RUN", "1") not in ("0", "false", "no")
+GC_INTERVAL_SECONDS = float(os.getenv("UPLOAD_GC_INTERVAL_SECONDS", "21600"))
+GC_MIN_AGE_SECONDS = float(os.getenv("UPLOAD_GC_MIN_AGE_HOURS", "24")) * 3600
+GC_BATCH_SIZE = int(os.getenv("UPLOAD_GC_BATCH_SIZE", "200"))
+GC_PAUSE_SECONDS = float(os.getenv("UPLOAD_GC_PAUSE_MS", "200")) / 1000
+LOCK_NAME = "jobboard.upload_gc"
+REPORT_SAMPLE = 20
+
+# Colonnes qui pointent vers des fichiers téléversés (les candidatures gardent une copie de cv_url)
+REFERENCES = [
+    ("profiles", "avatar_url"),
+    ("profiles", "cv_url"),
+    ("companies", "banner_url"),
+    ("applications", "cv_url"),
+    ("applications_archive", "cv_url"),
+]
+
+log = logging.getLogger("jobboard.upload_gc")
+
+gc_files = observability.REGISTRY.register(
+    observability.Counter("upload_gc_files_total", "Fichiers orphelins trouvés et supprimés.", ("result",))
+)
+
+
+# --------------------------------------------------------------------
+# Disposition
+# --------------------------------------------------------------------
+def shard(name: str) -> str:
+    """Chemin relatif (sous UPLOAD_DIR) d'un fichier dans la disposition répartie."""
+    digest = hashlib.sha1(name.encode()).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}/{name}"
+
+
+def target(name: str, upload_dir: Path = UPLOAD_DIR) -> tuple[Path, str]:
+    """(chemin sur disque, URL publique) d'un nouveau fichier ; crée les répertoires."""
+    rel = shard(name)
+    dest = upload_dir / rel
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    return dest, f"/uploads/{rel}"
+
+
+def relative_path(url: str | None) -> str | None:
+    """Chemin sous UPLOAD_DIR d'une URL stockée (`/uploads/...`, `uploads/...` ou absolue), None sinon."""
+    if not url:
+        return None
+    url = url.split("?", 1)[0].split("#", 1)[0]
+    if url.startswith("uploads/"):
+        return url[len("uploads/"):]
+    marker = url.find("/uploads/")
+    return url[marker + len("/uploads/"):] if marker >= 0 else None
+
+
+def referenced(conn) -> set[str]:
+    refs = set()
+    with conn.cursor() as cur:
+        for table, column in REFERENCES:
+            cur.execute(f"SELECT {column} FROM {table} WHERE {column} LIKE %s", ("%uploads/%",))
+            while rows := cur.fetchmany(5000):
+                refs.update(rel for (url,) in rows if (rel := relative_path(url)))
+    return refs
+
+
+# --------------------------------------------------------------------
+# Migration de la disposition plate
+# --------------------------------------------------------------------
+def migrate(conn, upload_dir: Path = UPLOAD_DIR, dry_run: bool = False, batch_size: int = 500) -> dict:
+    flat = sorted(p.name for p in upload_dir.iterdir() if p.is_file())
+    report = {"files": len(flat), "linked": 0, "urls_rewritten": 0, "removed": 0, "dry_run": dry_run}
+    if dry_run or not flat:
+        return report
+    # 1. Nouveau nom en lien dur : l'ancienne URL reste servie pendant la migration
+    for name in flat:
+        dest = upload_dir / shard(name)
+        if not dest.exists():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(upload_dir / name, dest)
+            except OSError:
+                shutil.copy2(upload_dir / name, dest)
+            report["linked"] += 1
+    # 2. URL en base, par lots
+    moved = set(flat)
+    for table, column in REFERENCES:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT id, {column} FROM {table} WHERE {column} LIKE %s", ("%uploads/%",))
+            rows = cur.fetchall()
+        updates = []
+        for row_id, url in rows:
+            rel = relative_path(url)
+            if rel in moved:
+                updates.append((url.replace(f"uploads/{rel}", f"uploads/{shard(rel)}", 1), row_id))
+        for start in range(0, len(updates), batch_size):
+            with conn.cursor() as cur:
+                cur.executemany(f"UPDATE {table} SET {column} = %s WHERE id = %s", updates[start:start + batch_size])
+            conn.commit()
+        report["urls_rewritten"] += len(updates)
+    # 3. Anciens noms
+    for name in flat:
+        (upload_dir / name).unlink(missing_ok=True)
+        report["removed"] += 1
+    return report
+
+
+# --------------------------------------------------------------------
+# Ramasse-miettes
+# --------------------------------------------------------------------
+def orphans(conn, upload_dir: Path = UPLOAD_DIR, min_age: float = GC_MIN_AGE_SECONDS):
+    """(fichiers examinés, références en base, [(chemin relatif, taille)] des orphelins)."""
+    refs = referenced(conn)
+    cutoff = time.time() - min_age
+    scanned = 0
+    found = []
+    for root, _, files in os.walk(upload_dir):
+        for filename in files:
+            path = Path(root) / filename
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            scanned += 1
+            rel = path.relative_to(upload_dir).as_posix()
+            if stat.st_mtime < cutoff and rel not in refs:
+                found.append((rel, stat.st_size))
+    return scanned, len(refs), found
+
+
+class UploadGC:
+    def __init__(self, batch_size: int = GC_BATCH_SIZE, dry_run: bool = GC_DRY_RUN):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, pool):
+        if self._thread is not None or not GC_ENABLED:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(pool,), name="upload-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, pool):
+        while not self._stop.wait(GC_INTERVAL_SECONDS):
+            try:
+                conn = pool.acquire()
+            except Error as e:
+                log.warning("upload gc: no connection (%s)", e)
+                continue
+            broken = False
+            try:
+                report = self.run_once(conn, self.dry_run)
+                if report.get("orphans"):
+                    log.info("upload gc: %s", {k: v for k, v in report.items() if k != "sample"})
+            except Exception as e:
+                broken = True
+                log.warning("upload gc failed: %s", e)
+            finally:
+                pool.release(conn, discard=broken)
+
+    def run_once(self, conn, dry_run: bool = True, upload_dir: Path = UPLOAD_DIR) -> dict:
+        """Rapport des orphelins ; les supprime par lots si `dry_run` est faux."""
+        if not dry_run:
+            with conn.cursor() as cur:
+                cur.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+                (locked,) = cur.fetchone()
+            if not locked:
+                conn.commit()
+                return {"dry_run": dry_run, "skipped": "another worker is collecting"}
+        try:
+            scanned, refs, found = orphans(conn, upload_dir)
+            conn.commit()
+            report = {
+                "dry_run": dry_run,
+                "scanned": scanned,
+                "referenced": refs,
+                "orphans": len(found),
+                "orphan_bytes": sum(size for _, size in found),
+                "deleted": 0,
+                "sample": [rel for rel, _ in found[:REPORT_SAMPLE]],
+            }
+            gc_files.inc("orphan", amount=len(found))
+            if dry_run:
+                return report
+            for start in range(0, len(found), self.batch_size):
+                if self._stop.is_set():
+                    break
+                for rel, _ in found[start:start + self.batch_size]:
+                    (upload_dir / rel).unlink(missing_ok=True)
+                    report["deleted"] += 1
+                gc_files.inc("deleted", amount=min(self.batch_size, len(found) - start))
+                self._stop.wait(GC_PAUSE_SECONDS)
+            return report
+        finally:
+            if not dry_run:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                    cur.fetchone()
+                conn.commit()
+
+
+GC = UploadGC()
+
+
+def main(argv=None) -> int:
+    from dotenv import load_dotenv
+
+    from db import pool_from_env
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["migrate", "gc"])
+    parser.add_argument("--dry-run", action="store_true", help="rapport seulement, aucun fichier modifié")
+    parser.add_argument("--upload-dir", type=Path, default=UPLOAD_DIR)
+    args = parser.parse_args(argv)
+
+    pool = pool_from_env("upload-storage")
+    conn = pool.acquire()
+    try:
+        if args.command == "migrate":
+            report = migrate(conn, args.upload_dir, dry_run=args.dry_run)
+        else:
+            report = GC.run_once(conn, dry_run=args.dry_run, upload_dir=args.upload_dir)
+    finally:
+        pool.release(conn)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Préchauffage au démarrage et état de disponibilité (`/ready`).
+
+Chaque module enregistre ses étapes (`WARMUP.step("nom", fn)`) : ouverture
+des connexions du pool, chargement des backends de hachage, lectures
+chaudes qui remplissent le buffer pool InnoDB et les caches applicatifs.
+Le lifespan lance les étapes dans un thread : le worker accepte déjà les
+connexions (`/health` répond), mais `/ready` reste en 503 tant que le
+préchauffage n'est pas terminé. Une étape en erreur est journalisée et
+reportée, elle ne bloque pas la disponibilité.
+"""
+import logging
+import os
+import threading
+import time
+
+import observability
+
+ENABLED = os.getenv("WARMUP_ENABLED", "1") not in ("0", "false", "no")
+
+log = logging.getLogger("jobboard.warmup")
+
+
+class Warmup:
+    def __init__(self):
+        self._steps: list[tuple[str, object]] = []
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.phases: dict[str, dict] = {}
+
+    def step(self, name: str, fn):
+        """Ajoute une étape `fn()` ; les étapes s'exécutent dans l'ordre d'enregistrement."""
+        self._steps.append((name, fn))
+
+    def record(self, name: str, seconds: float, error: str | None = None):
+        phase = {"seconds": round(seconds, 4), "ok": error is None}
+        if error is not None:
+            phase["error"] = error
+        with self._lock:
+            self.phases[name] = phase
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self):
+        if self._thread is not None or self.ready:
+            return
+        if not ENABLED:
+            self._ready.set()
+            return
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        started = time.perf_counter()
+        for name, fn in self._steps:
+            phase_started = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                log.warning("warmup %s failed: %s", name, e)
+                self.record(name, time.perf_counter() - phase_started, str(e))
+            else:
+                self.record(name, time.perf_counter() - phase_started)
+        self.record("warmup", time.perf_counter() - started)
+        self._ready.set()
+        log.info("warmup done in %.3fs", time.perf_counter() - started)
+
+    def status(self) -> dict:
+        with self._lock:
+            phases = dict(self.phases)
+        return {"status": "ready" if self.ready else "warming", "phases": phases}
+
+
+WARMUP = Warmup()
+
+observability.REGISTRY.register(
+    observability.Gauge(
+        "startup_phase_seconds",
+        "Durée des phases de démarrage du worker.",
+        ("phase",),
+        lambda: [((name,), phase["seconds"]) for name, phase in list(WARMUP.phases.items())],
+    )
+)
+observability.REGISTRY.register(
+    observability.Gauge("app_ready", "1 quand le préchauffage du worker est terminé.", (), lambda: [((), int(WARMUP.ready))])
+)